@@ -0,0 +1,431 @@
+import math
+from dataclasses import dataclass, field
+from simple_parser import ParsingTreeNode, DEC_STMT, ASSIGN_STMT, PRINT_STMT, IF_STMT, TERM
+from symbol_table import SymbolTable, SymbolTableEntry
+from tokens import *
+
+# Data types of the language.
+INT = "int"
+FLOAT = "float"
+
+# Operators grouped by precedence.
+MULTIPLICATIVE_OPERATORS = ("*", "/", "%")
+ADDITIVE_OPERATORS = ("+", "-")
+
+
+@dataclass
+class Num:
+    """A number literal."""
+    value: int | float
+    data_type: str
+
+
+@dataclass
+class Var:
+    """A variable reference."""
+    name: str
+    data_type: str
+    entry: SymbolTableEntry = field(repr=False)
+
+
+@dataclass
+class BinOp:
+    """An arithmetic operation."""
+    operator: str
+    left: "Expr"
+    right: "Expr"
+    data_type: str
+
+
+@dataclass
+class RelOp:
+    """A relational operation, its value is 1 or 0."""
+    operator: str
+    left: "Expr"
+    right: "Expr"
+    data_type: str = INT
+
+
+Expr = Num | Var | BinOp | RelOp
+
+
+@dataclass
+class Decl:
+    """A variable declaration with an optional initial value."""
+    target: Var
+    value: Expr | None
+
+
+@dataclass
+class Assign:
+    """An assignment statement."""
+    target: Var
+    value: Expr
+
+
+@dataclass
+class Print:
+    """A print statement."""
+    value: Var
+
+
+@dataclass
+class If:
+    """An if statement, the body is a list to allow folding it."""
+    condition: Expr
+    body: list["Stmt"]
+
+
+Stmt = Decl | Assign | Print | If
+
+
+@dataclass
+class Program:
+    """The whole program."""
+    body: list[Stmt]
+
+
+def result_type(left: str, right: str) -> str:
+    """Returns: the data type of an operation on the two types."""
+    return FLOAT if FLOAT in (left, right) else INT
+
+
+def cast(value: int | float, data_type: str) -> int | float:
+    """Convert the value to the data type, floats are truncated when
+    stored in an int like C does.
+
+    Raises:
+        OverflowError: If an infinite or NaN float is stored in an int, or
+        an int too large for a float is stored in a float.
+    """
+    if data_type == INT:
+        if value.__class__ is float and not math.isfinite(value): raise OverflowError(f"Can't store {value} in an int")
+        return int(value)
+    
+    return float(value)
+
+
+def int_div(left: int, right: int) -> int:
+    """Returns: the int division truncated toward zero like C does."""
+    quotient = abs(left) // abs(right)
+    return quotient if (left < 0) == (right < 0) else -quotient
+
+
+def int_mod(left: int, right: int) -> int:
+    """Returns: the int remainder with the sign of the left operand like C does."""
+    return left - right * int_div(left, right)
+
+
+def float_mod(left: float, right: float) -> float:
+    """Returns: the float remainder with the sign of the left operand like
+    C `fmod`, a zero divisor is a division by zero like for ints."""
+    if right == 0: raise ZeroDivisionError("float modulo by zero")
+    return math.fmod(left, right)
+
+
+def apply_operator(operator: str, left: int | float, right: int | float, data_type: str) -> int | float:
+    """Evaluate an arithmetic or relational operation with C like int and
+    float semantics, int division and remainder truncate toward zero.
+
+    Args:
+        operator (str): The operator lexeme.
+        left (int | float): The left operand.
+        right (int | float): The right operand.
+        data_type (str): The data type of the operation.
+
+    Raises:
+        ZeroDivisionError: If dividing by zero.
+
+    Returns:
+        int | float: The result.
+    """
+    if operator == "+": return left + right
+    if operator == "-": return left - right
+    if operator == "*": return left * right
+    if operator == "/": return left / right if data_type == FLOAT else int_div(left, right)
+    if operator == "%": return float_mod(left, right) if data_type == FLOAT else int_mod(left, right)
+    if operator == "<": return int(left < right)
+    if operator == ">": return int(left > right)
+    if operator == "<=": return int(left <= right)
+    if operator == ">=": return int(left >= right)
+    if operator == "==": return int(left == right)
+    if operator == "!=": return int(left != right)
+    raise ValueError(f"Unknown operator <{operator}>")
+
+
+class ASTBuilder:
+    def __init__(self, symbol_table: SymbolTable):
+        """Initialize the builder with the symbol table of the program,
+        it gives the data types of the variables.
+
+        Args:
+            symbol_table (SymbolTable): The program symbol table.
+        """
+        self.symbol_table: SymbolTable = symbol_table
+        self.scope_id: int = 0 # The scope of the lowered statement.
+        self.opened_scopes: int = 0 # The blocks lowered so far, in the same order their scope ids are given.
+
+
+    def build(self, tree: ParsingTreeNode) -> Program:
+        """Lower the parsing tree into the abstract syntax tree.
+
+        Args:
+            tree (ParsingTreeNode): The parsing tree root.
+
+        Returns:
+            Program: The program node.
+        """
+        return Program([self.lower_stmt(stmt) for stmt in tree.children])
+
+
+    def lower_stmt(self, node: ParsingTreeNode) -> Stmt:
+        """Lower a single statement node.
+
+        Args:
+            node (ParsingTreeNode): The statement node.
+
+        Returns:
+            Stmt: The statement.
+        """
+        children = node.children
+        
+        if node.kind == DEC_STMT:
+            value = self.lower_arth_expr(children[3]) if len(children) == 5 else None
+            return Decl(self.lower_var(children[1]), value)
+        elif node.kind == ASSIGN_STMT:
+            return Assign(self.lower_var(children[0]), self.lower_arth_expr(children[2]))
+        elif node.kind == PRINT_STMT:
+            return Print(self.lower_var(children[2]))
+        elif node.kind == IF_STMT:
+            condition = self.lower_rel_expr(children[2])
+            
+            # The body is a new scope inside the current one.
+            outer_scope = self.scope_id
+            self.opened_scopes += 1
+            self.scope_id = self.opened_scopes
+            body = [self.lower_stmt(children[5])]
+            self.scope_id = outer_scope
+            
+            return If(condition, body)
+        
+        raise ValueError(f"Not a statement node <{node.title}>")
+
+
+    def lower_var(self, node: ParsingTreeNode) -> Var:
+        """Returns: the variable of an ID token node, named by its key in
+        the symbol table so shadowing variables stay different."""
+        entry = self.symbol_table.lookup(node.token.lexeme, self.scope_id)
+        return Var(entry.key, entry.data_type, entry)
+
+
+    def lower_rel_expr(self, node: ParsingTreeNode) -> RelOp:
+        """Returns: the relational operation of a rel_expr node."""
+        left, operator, right = node.children
+        return RelOp(operator.token.lexeme, self.lower_arth_expr(left), self.lower_arth_expr(right))
+
+
+    def lower_arth_expr(self, node: ParsingTreeNode) -> Expr:
+        """Lower an arithmetic expression node. The expressions nested in
+        its parentheses are found with an explicit stack and lowered first,
+        the innermost ones before the ones around them, so deeply nested
+        expressions don't hit the recursion limit.
+
+        Args:
+            node (ParsingTreeNode): The arth_expr node.
+
+        Returns:
+            Expr: The expression.
+        """
+        # Each expression comes before the expressions in its parentheses.
+        expressions, stack = [], [node]
+        
+        while stack:
+            expression = stack.pop()
+            expressions.append(expression)
+            stack.extend(term.children[1] for term in expression.children[::2] if len(term.children) == 3)
+        
+        # The lowered expression of each node, by the node id.
+        lowered: dict[int, Expr] = {}
+        
+        for expression in reversed(expressions):
+            lowered[id(expression)] = self.lower_terms(expression, lowered)
+        
+        return lowered[id(node)]
+
+
+    def lower_terms(self, node: ParsingTreeNode, lowered: dict[int, Expr]) -> Expr:
+        """Lower the terms and operators of an arth_expr node. The parsing
+        tree keeps them flat, so the precedence of `*`, `/` and `%` over `+`
+        and `-` is applied here, both are left associative.
+
+        Args:
+            node (ParsingTreeNode): The arth_expr node.
+            lowered (dict[int, Expr]): The expressions in its parentheses,
+            already lowered, by their node id.
+
+        Returns:
+            Expr: The expression.
+        """
+        children = node.children
+        total = None
+        additive_operator = None
+        product = self.lower_term(children[0], lowered)
+        
+        for index in range(1, len(children), 2):
+            operator = children[index].token.lexeme
+            term = self.lower_term(children[index + 1], lowered)
+            
+            if operator in MULTIPLICATIVE_OPERATORS:
+                product = self.binary(operator, product, term)
+            else:
+                total = product if total is None else self.binary(additive_operator, total, product)
+                additive_operator = operator
+                product = term
+        
+        return product if total is None else self.binary(additive_operator, total, product)
+
+
+    def lower_term(self, node: ParsingTreeNode, lowered: dict[int, Expr]) -> Expr:
+        """Returns: the expression of a term node, an expression in
+        parentheses is taken from the lowered ones."""
+        children = node.children
+        
+        if len(children) == 3:
+            return lowered[id(children[1])]
+        
+        token = children[0].token
+        
+        if token.token_type == ID:
+            return self.lower_var(children[0])
+        
+        try:
+            if "." in token.lexeme:
+                return Num(float(token.lexeme), FLOAT)
+            return Num(int(token.lexeme), INT)
+        except ValueError:
+            raise SyntaxError(f"⚠️  Invalid number <{token.lexeme}>!")
+
+
+    def binary(self, operator: str, left: Expr, right: Expr) -> BinOp:
+        """Returns: a typed arithmetic operation node."""
+        return BinOp(operator, left, right, result_type(left.data_type, right.data_type))
+
+
+class ConstantFolder:
+    def __init__(self) -> None:
+        """Initialize the counters of the folded nodes."""
+        self.folded_expressions: int = 0
+        self.folded_ifs: int = 0
+
+
+    def fold(self, program: Program) -> Program:
+        """Evaluate the constant parts of the program at compile time.
+
+        Args:
+            program (Program): The program.
+
+        Returns:
+            Program: A new program after folding.
+        """
+        return Program(self.fold_body(program.body))
+
+
+    def fold_body(self, body: list[Stmt]) -> list[Stmt]:
+        """Fold a list of statements, an if with a constant condition is
+        replaced by its body or removed.
+
+        Args:
+            body (list[Stmt]): The statements.
+
+        Returns:
+            list[Stmt]: The folded statements.
+        """
+        folded = []
+        
+        for stmt in body:
+            if isinstance(stmt, If):
+                condition = self.fold_expr(stmt.condition)
+                
+                if isinstance(condition, Num):
+                    self.folded_ifs += 1
+                    if condition.value: folded.extend(self.fold_body(stmt.body))
+                else:
+                    folded.append(If(condition, self.fold_body(stmt.body)))
+            elif isinstance(stmt, Decl):
+                folded.append(Decl(stmt.target, None if stmt.value is None else self.fold_value(stmt.value, stmt.target.data_type)))
+            elif isinstance(stmt, Assign):
+                folded.append(Assign(stmt.target, self.fold_value(stmt.value, stmt.target.data_type)))
+            else:
+                folded.append(stmt)
+        
+        return folded
+
+
+    def fold_value(self, value: Expr, data_type: str) -> Expr:
+        """Fold a value stored in a variable, a constant is also converted
+        to the variable data type."""
+        value = self.fold_expr(value)
+        
+        if isinstance(value, Num) and value.data_type != data_type:
+            try:
+                return Num(cast(value.value, data_type), data_type)
+            except OverflowError:
+                # The value doesn't fit the variable, leave it to fail at run time.
+                pass
+        
+        return value
+
+
+    def fold_expr(self, expr: Expr) -> Expr:
+        """Fold an expression bottom up, with an explicit stack so deeply
+        nested expressions don't hit the recursion limit.
+
+        Args:
+            expr (Expr): The expression.
+
+        Returns:
+            Expr: The folded expression.
+        """
+        # The operations are visited twice, first to push their operands,
+        # then to fold them once both operands are folded.
+        folded: list[Expr] = []
+        stack: list[tuple[Expr, bool]] = [(expr, False)]
+        
+        while stack:
+            node, operands_folded = stack.pop()
+            
+            if not isinstance(node, (BinOp, RelOp)):
+                folded.append(node)
+            elif not operands_folded:
+                stack.extend(((node, True), (node.right, False), (node.left, False)))
+            else:
+                right = folded.pop()
+                folded[-1] = self.fold_operation(node, folded[-1], right)
+        
+        return folded[0]
+
+
+    def fold_operation(self, expr: BinOp | RelOp, left: Expr, right: Expr) -> Expr:
+        """Fold an operation with its folded operands.
+
+        Args:
+            expr (BinOp | RelOp): The operation.
+            left (Expr): Its folded left operand.
+            right (Expr): Its folded right operand.
+
+        Returns:
+            Expr: A constant, or the operation of the folded operands.
+        """
+        if isinstance(left, Num) and isinstance(right, Num):
+            operand_type = result_type(left.data_type, right.data_type)
+            
+            try:
+                value = cast(apply_operator(expr.operator, left.value, right.value, operand_type), expr.data_type)
+            except (ZeroDivisionError, OverflowError):
+                # Leave it to fail at run time.
+                pass
+            else:
+                self.folded_expressions += 1
+                return Num(value, expr.data_type)
+        
+        return type(expr)(expr.operator, left, right, expr.data_type)
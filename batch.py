@@ -0,0 +1,138 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from compile_cache import CompileCache, compile_source
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+
+
+@dataclass
+class FileResult:
+    """Used to save the result of compiling a single file."""
+    path: str
+    tokens: int = 0
+    symbols: int = 0
+    error: str = None
+    cached: bool = False
+
+
+@dataclass
+class BatchReport:
+    """Used to save the aggregated results of a batch."""
+    results: list[FileResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> list[FileResult]:
+        return [result for result in self.results if result.error is not None]
+
+    def print_report(self):
+        """Print the failed files with their diagnostics, then a summary."""
+        failed = self.failed
+        
+        for result in failed:
+            print(f"{result.path}: {result.error}")
+        
+        files_per_second = len(self.results) / self.seconds if self.seconds else 0
+        print(f"{len(self.results)} files, {len(self.results) - len(failed)} valid, {len(failed)} with errors, "
+              f"{sum(result.cached for result in self.results)} from cache, "
+              f"{sum(result.tokens for result in self.results)} tokens in {self.seconds:.2f}s ({files_per_second:,.1f} files/sec)")
+
+
+def collect_files(patterns: list[str]) -> list[str]:
+    """Expand the given paths into source files. A directory gives all the
+    .abdo files under it, anything else is used as a glob pattern.
+
+    Args:
+        patterns (list[str]): Files, directories or glob patterns.
+
+    Returns:
+        list[str]: Sorted source file paths without duplicates.
+    """
+    paths = set()
+    
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.update(glob.glob(os.path.join(pattern, "**", "*.abdo"), recursive=True))
+        else:
+            paths.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    
+    return sorted(paths)
+
+
+@lru_cache(maxsize=None)
+def open_cache(cache_dir: str) -> CompileCache:
+    """Returns: the cache of the directory in this process, reused for all
+    its files so the directory size is scanned once instead of per file."""
+    return CompileCache(cache_dir)
+
+
+def compile_file(path: str, cache_dir: str = None) -> FileResult:
+    """Run the lexer, parser and symbol table phases on a file. It runs
+    in the worker processes, so errors are returned instead of raised.
+
+    Args:
+        path (str): The source file.
+        cache_dir (str, optional): A compile cache directory to use.
+
+    Returns:
+        FileResult: The file result.
+    """
+    result = FileResult(path)
+    
+    try:
+        with open(path, "r") as input_file:
+            code = input_file.read()
+    except (OSError, UnicodeDecodeError) as error:
+        result.error = str(error)
+        return result
+    
+    try:
+        if cache_dir is None:
+            artifacts = compile_source(code)
+        else:
+            cache = open_cache(cache_dir)
+            hits = cache.hits
+            artifacts = cache.compile(code, tree=False)
+            result.cached = cache.hits > hits
+    
+    # A failure of a single file must not stop the whole batch.
+    except (RecursionError, MemoryError, OSError) as error:
+        result.error = f"⚠️  {type(error).__name__}: {error}"
+        return result
+    
+    if artifacts.error is not None:
+        result.error = artifacts.error
+    else:
+        result.tokens = len(artifacts.tokens)
+        result.symbols = len(artifacts.symbol_table.unordered_table)
+    
+    return result
+
+
+def compile_batch(paths: list[str], workers: int = None, chunksize: int = 16, cache_dir: str = None) -> BatchReport:
+    """Compile the files over a pool of processes.
+
+    Args:
+        paths (list[str]): The source files.
+        workers (int, optional): Number of processes, 1 compiles in this
+        process. Defaults to the number of CPUs.
+        chunksize (int, optional): Files sent to a worker at once. Defaults to 16.
+        cache_dir (str, optional): A compile cache directory shared by the workers.
+
+    Returns:
+        BatchReport: The results in the same order as the paths.
+    """
+    report = BatchReport()
+    start = time.perf_counter()
+    compile_path = partial(compile_file, cache_dir=cache_dir)
+    
+    if workers == 1:
+        report.results = [compile_path(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            report.results = list(executor.map(compile_path, paths, chunksize=chunksize))
+    
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,2 @@
+"""Benchmarks for the compiler phases, run them from the repository root
+as modules, e.g. `python -m benchmarks.bench_lexer`."""
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import time
+from benchmarks.generator import ProgramGenerator
+from compile_cache import CompileCache, compile_source
+
+
+def timed(function) -> float:
+    """Returns: the seconds of the fastest of five calls."""
+    seconds = float("inf")
+    
+    for _ in range(5):
+        start = time.perf_counter()
+        function()
+        seconds = min(seconds, time.perf_counter() - start)
+    
+    return seconds
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CompileCache(directory)
+        
+        for statements in [500, 5_000]:
+            code = ProgramGenerator(seed=0, statements=statements).generate()
+            cache.compile(code)
+            size = os.path.getsize(cache.path(code.encode()))
+            
+            print(f"{len(code):>9,} chars | file {size:>10,} bytes | compile {timed(lambda: compile_source(code)):6.3f}s "
+                  f"| hit {timed(lambda: cache.compile(code)):6.3f}s | hit without tree {timed(lambda: cache.compile(code, tree=False)):6.3f}s")
+    
+    # The writes must not scan the whole directory each time.
+    for files in [200, 800]:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CompileCache(directory)
+            start = time.perf_counter()
+            
+            for seed in range(files):
+                cache.compile(f"int x{seed} = {seed}; print(x{seed});")
+            
+            print(f"{files:>5} writes | {(time.perf_counter() - start) / files * 1e6:7.1f} us per write")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import time
+from symbol_table import HashSymbolTable
+
+
+class OldHashSymbolTable:
+    """The old hash table, a dict of lists with a weak hash."""
+    def __init__(self, ids: list[str]):
+        self.ids: list[str] = ids
+        self.table: dict[int, list[str]] = {}
+        
+        for id in ids:
+            self.table.setdefault(self.hash_function(id), []).append(id)
+
+    def hash_function(self, id: str) -> int:
+        return (len(id) + ord(id[0])) % len(self.ids)
+
+    def lookup(self, id: str) -> bool:
+        return id in self.table.get(self.hash_function(id), [])
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    for count in [10_000, 100_000, 1_000_000]:
+        ids = [f"var_{index}" for index in range(count)]
+        lookups = ids[::max(1, count // 10_000)]
+        tables = {}
+        
+        builders = {
+            "old": lambda: OldHashSymbolTable(ids),
+            "open addressing": lambda: HashSymbolTable(ids),
+            "dict": lambda: dict.fromkeys(ids),
+        }
+        
+        for name, build in builders.items():
+            if name == "old" and count > 100_000: continue
+            
+            build_seconds = timed(lambda: tables.__setitem__(name, build()))
+            table = tables[name]
+            lookup = table.lookup if name != "dict" else table.get
+            lookup_seconds = timed(lambda: [lookup(id) for id in lookups])
+            print(f"{count:>9,} ids | {name:<15} | build {build_seconds:>8.3f}s | {lookup_seconds / len(lookups) * 1e9:>10,.0f} ns per lookup")
+        
+        table = tables["open addressing"]
+        print(f"{'':>13} probe lengths {table.probe_histogram()}")
+        print(f"{'':>13} IDs per home slot {table.collision_histogram()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+import time
+
+# Each entry imports a module and compiles the test program, the
+# presentation modules it loaded are printed back.
+SNIPPETS = {
+    "import main": "import main",
+    "import compiler": "import compiler",
+    "compiler.compile": "import compiler; compiler.compile(open('test.abdo').read())",
+}
+PRESENTATION_MODULES = ("tabulate", "PrettyPrint", "colorama")
+
+
+def run(code: str) -> tuple[float, list[str]]:
+    """Start a new interpreter that runs the code, `__pycache__` is warm
+    after the first run.
+    
+    Returns:
+        tuple[float, list[str]]: The seconds the process took, and the
+        presentation modules it imported.
+    """
+    check = f"; import sys; print(','.join(name for name in {PRESENTATION_MODULES!r} if name in sys.modules))"
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code + check], capture_output=True, text=True, check=True).stdout
+    return time.perf_counter() - start, [name for name in output.strip().split(",") if name]
+
+
+def main():
+    baseline = min(run("pass")[0] for _ in range(10))
+    print(f"{'empty interpreter':<20} | {baseline * 1000:8.2f} ms")
+    
+    for name, code in SNIPPETS.items():
+        run(code) # Warm the __pycache__.
+        seconds = min(run(code)[0] for _ in range(10))
+        modules = run(code)[1]
+        print(f"{name:<20} | {seconds * 1000:8.2f} ms | +{(seconds - baseline) * 1000:7.2f} ms | presentation modules: {', '.join(modules) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import time
+from incremental import IncrementalCompiler
+
+
+def build_program(lines: int) -> str:
+    """Returns: a program with the given number of lines."""
+    body = ["int a = 1;", "int b = 2;", "float c = 0.5;"]
+    
+    while len(body) < lines:
+        body += ["a = a + b * 2;", "if (a > b) {", "    c = c * 1.5;", "}", "print(c);"]
+    
+    return "\n".join(body)
+
+
+def timed(function) -> float:
+    """Returns: the milliseconds the function takes."""
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    code = build_program(100_000)
+    compiler = None
+    
+    def full():
+        nonlocal compiler
+        compiler = IncrementalCompiler(code)
+    
+    print(f"{'full compile':<28} | {timed(full):>10.2f} ms")
+    
+    edits = [
+        ("edit one line", 50_004, 50_005, "a = b - 3;"),
+        ("insert a statement", 50_004, 50_004, "b = a % 4;\n"),
+        ("delete a line", 50_004, 50_005, ""),
+        ("edit an if statement", 50_006, 50_007, "    c = c / 2;"),
+    ]
+    
+    for name, start_line, end_line, text in edits:
+        print(f"{name:<28} | {timed(lambda: compiler.edit(start_line, end_line, text)):>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import random
+import time
+from abstract_syntax_tree import ASTBuilder, ConstantFolder
+from benchmarks.generator import ProgramGenerator
+from lexer import Lexer
+from simple_parser import Parser
+from symbol_table import SymbolTable
+from three_address_code import IRBuilder, execute, optimize
+
+
+def redundant_program(statements: int, seed: int = 0) -> str:
+    """Returns: a program like the ones written by code generators, with
+    recomputed expressions, chains of copies, overwritten and unused
+    variables, and no division so it runs to the end."""
+    generator = random.Random(seed)
+    lines = ["int a = 7;", "int b = 3;", "float c = 2.5;"]
+    names = ["a", "b"]
+    
+    for i in range(statements):
+        x, y = generator.sample(names, 2)
+        choice = generator.random()
+        
+        if choice < 0.3:
+            lines.append(f"int s{i} = {x} * {y} + {x} - {y} * {x};")
+        elif choice < 0.5:
+            lines.append(f"int s{i} = {x};")
+        elif choice < 0.65:
+            lines.append(f"int s{i} = {x} + 1; s{i} = {y} - {x};")
+        elif choice < 0.75:
+            lines.append(f"float s{i} = c * {x} + c * {x};")
+            continue
+        elif choice < 0.85:
+            lines.append(f"if ({x} < {y} * 2) {{ print({x}); }}")
+            continue
+        else:
+            lines.append(f"print({x}); int s{i} = {x} - {y};")
+        
+        names.append(f"s{i}")
+        
+        # Keep the values small.
+        if len(names) > 8: names.pop(2)
+    
+    return "\n".join(lines)
+
+
+def executed(program) -> int:
+    """Returns: the instructions run before the program ends or fails."""
+    count = 0
+
+    def counter(value):
+        nonlocal count
+        count += 1
+    
+    try:
+        return execute(program, counter)
+    except (ZeroDivisionError, ValueError):
+        return -1
+
+
+def main():
+    for name, code in [("random", ProgramGenerator(seed=0, statements=10_000).generate()), ("redundant", redundant_program(10_000))]:
+        tokens = Lexer(code).get_tokens()
+        parser = Parser(tokens)
+        parser.parse()
+        program = ConstantFolder().fold(ASTBuilder(SymbolTable(tokens)).build(parser.parsing_tree_root))
+        
+        start = time.perf_counter()
+        ir = IRBuilder().build(program)
+        lowering = time.perf_counter() - start
+        before, ran_before = len(ir.instructions), executed(ir)
+        
+        print(f"{name:>10} | {before:>9,} instructions | lowering {lowering:7.3f}s")
+        
+        for report in optimize(ir):
+            print(f"{'':>10} {report.name:<20} removed {report.removed:>9,} | changed {report.changed:>9,} | {report.seconds:7.3f}s")
+        
+        after = len(ir.instructions)
+        print(f"{'':>10} {after:,} instructions left, {1 - after / before:.1%} fewer", end="")
+        print(f" | {ran_before:,} executed before, {executed(ir):,} after" if ran_before >= 0 else " | the program fails at run time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import time
+from lexer import Lexer
+
+
+def build_source(copies: int) -> str:
+    """Build a large program by repeating the test program.
+
+    Args:
+        copies (int): How many times the test program is repeated.
+
+    Returns:
+        str: The generated source code.
+    """
+    with open("./test.abdo", "r") as file:
+        code = file.read()
+    return "\n".join([code] * copies)
+
+
+def measure(code: str, single_pass: bool) -> tuple[int, float]:
+    """Lex the code once and measure the elapsed time.
+
+    Args:
+        code (str): Source code.
+        single_pass (bool): Which scanner mode to use.
+
+    Returns:
+        tuple[int, float]: Number of tokens and elapsed seconds.
+    """
+    start = time.perf_counter()
+    tokens = Lexer(code, single_pass=single_pass).get_tokens()
+    return len(tokens), time.perf_counter() - start
+
+
+def main():
+    for copies in [100, 1_000, 10_000]:
+        code = build_source(copies)
+        lines = code.count("\n") + 1
+        
+        for name, single_pass in [("line by line", False), ("single pass", True)]:
+            count, seconds = measure(code, single_pass)
+            print(f"{lines:>8} lines | {name:<12} | {count:>8} tokens | {count / seconds:>12,.0f} tokens/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import time
+from benchmarks.generator import ProgramGenerator
+from lexer import Lexer
+from memory_layout import MemoryLayout
+from symbol_table import SymbolTable
+
+
+def main():
+    for statements in [1_000, 10_000, 100_000]:
+        code = ProgramGenerator(seed=0, statements=statements).generate()
+        symbol_table = SymbolTable(Lexer(code).get_tokens())
+        
+        start = time.perf_counter()
+        layout = MemoryLayout(symbol_table)
+        seconds = time.perf_counter() - start
+        
+        before, after = layout.unshared_frame_size, layout.frame_size
+        print(f"{len(symbol_table.unordered_table):>7,} variables | frame {before:>9,} bytes -> {after:>7,} bytes, {1 - after / before:6.1%} smaller "
+              f"| VM cells {symbol_table.address - 1:>7,} -> {len(layout.slots):>5,} | {seconds:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
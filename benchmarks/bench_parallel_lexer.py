@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+from benchmarks.generator import ProgramGenerator
+from concurrent.futures import ProcessPoolExecutor
+from parallel_lexer import lex_parallel
+from token_buffer import TokenBuffer
+
+
+def timed(function) -> float:
+    """Returns: the seconds of the fastest of three calls."""
+    seconds = float("inf")
+    
+    for _ in range(3):
+        start = time.perf_counter()
+        function()
+        seconds = min(seconds, time.perf_counter() - start)
+    
+    return seconds
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else max(2, os.cpu_count() or 1)
+    print(f"{workers} workers on {os.cpu_count()} CPUs")
+    crossover = None
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for statements in [1_000, 4_000, 16_000, 64_000, 256_000]:
+            code = ProgramGenerator(seed=0, statements=statements).generate()
+            serial = timed(lambda: TokenBuffer(code))
+            cold = timed(lambda: lex_parallel(code, workers, threshold=0))
+            warm = timed(lambda: lex_parallel(code, workers, threshold=0, executor=pool))
+            
+            if crossover is None and cold < serial:
+                crossover = len(code)
+            
+            print(f"{len(code):>12,} chars | serial {serial:8.4f}s | new pool {cold:8.4f}s | reused pool {warm:8.4f}s | {serial / cold:5.2f}x")
+    
+    print(f"Parallel lexing with a new pool is faster from {crossover:,} chars." if crossover else "Parallel lexing was never faster.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import time
+from abstract_syntax_tree import *
+from main import build_ast, compile_to_bytecode, lexical_analysis, transpile
+from virtual_machine import VirtualMachine
+
+PROGRAM = """
+float rate = 1.5;
+int count = 10;
+int total = count * 3 + 7 % 4;
+float scaled = total * rate / (count + 1);
+if (scaled > 2) {
+    if (total >= 30) {
+        print(total);
+    }
+}
+count = count + total / 2;
+print(count);
+"""
+
+
+def walk(body: list[Stmt], memory: dict[str, int | float], output):
+    """A tree walking interpreter, used as the baseline."""
+    for stmt in body:
+        if isinstance(stmt, (Decl, Assign)):
+            if stmt.value is not None:
+                memory[stmt.target.name] = cast(evaluate(stmt.value, memory), stmt.target.data_type)
+        elif isinstance(stmt, Print):
+            output(memory.get(stmt.value.name, 0))
+        elif evaluate(stmt.condition, memory):
+            walk(stmt.body, memory, output)
+
+
+def evaluate(expr: Expr, memory: dict[str, int | float]) -> int | float:
+    if isinstance(expr, Num): return expr.value
+    if isinstance(expr, Var): return memory.get(expr.name, cast(0, expr.data_type))
+    data_type = result_type(expr.left.data_type, expr.right.data_type)
+    return apply_operator(expr.operator, evaluate(expr.left, memory), evaluate(expr.right, memory), data_type)
+
+
+def per_run(function, runs: int) -> float:
+    """Returns: the average seconds of one call."""
+    start = time.perf_counter()
+    for i in range(runs): function(i)
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    sink = lambda value: None
+    runs = 2_000
+    
+    def parse_and_walk(i):
+        walk(build_ast(lexical_analysis(PROGRAM)).body, {"count": i}, sink)
+    
+    bytecode = compile_to_bytecode(PROGRAM)
+    machine = VirtualMachine(bytecode, output=sink)
+    count_address = next(address for address, name in bytecode.names.items() if name == "count")
+    
+    def virtual_machine(i):
+        machine.run({count_address: i})
+    
+    program = transpile(PROGRAM)
+    
+    def compiled_python(i):
+        program(sink, count=i)
+    
+    for name, function in [("parse + tree walk", parse_and_walk), ("bytecode vm", virtual_machine), ("compiled python", compiled_python)]:
+        print(f"{name:<18} | {per_run(function, runs) * 1e6:>10.2f} µs per run")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import random
+import time
+from lexer import Token
+from main import get_ids_names
+from symbol_table import HashSymbolTable, SymbolTable, TreeSymbolTable
+from tokens import *
+
+
+def build_tokens(occurrences: int, seed: int = 0) -> list[Token]:
+    """Build the tokens of a program with the given number of identifier
+    occurrences, one distinct identifier for every ten occurrences."""
+    rng = random.Random(seed)
+    names = [f"v{index}" for index in range(max(1, occurrences // 10))]
+    rng.shuffle(names)
+    tokens = []
+    
+    for line, name in enumerate(names, start=1):
+        tokens += [Token("int", DATA_TYPE, line), Token(name, ID, line), Token(";", SEMICOLON, line)]
+    
+    for line in range(len(names) + 1, len(names) + 1 + occurrences - len(names)):
+        tokens += [Token(rng.choice(names), ID, line), Token("=", ASSIGN, line), Token("1", NUMBER, line), Token(";", SEMICOLON, line)]
+    
+    return tokens
+
+
+def build_nested_tokens(depth: int, names: int = 8) -> list[Token]:
+    """Build the tokens of `if` blocks nested `depth` times, each block
+    declares one of a few names again, hiding the outer one, and uses all
+    of them. A block has two statements, so the tokens are only meant for
+    the symbol table."""
+    tokens = [token for index in range(names) for token in (Token("int", DATA_TYPE, 1), Token(f"n{index}", ID, 1), Token(";", SEMICOLON, 1))]
+    
+    for line in range(2, depth + 2):
+        tokens += [Token("if", KEYWORD, line), Token("(", LEFT_PAREN, line), Token(f"n{line % names}", ID, line),
+                   Token(">", RELATIONAL_OPERATOR, line), Token("0", NUMBER, line), Token(")", RIGHT_PAREN, line),
+                   Token("{", LEFT_BRACE, line), Token("int", DATA_TYPE, line), Token(f"n{line % names}", ID, line),
+                   Token("=", ASSIGN, line)]
+        tokens += [token for index in range(names) for token in (Token(f"n{index}", ID, line), Token("+", ARITHMETIC_OPERATOR, line))]
+        tokens += [Token("1", NUMBER, line), Token(";", SEMICOLON, line)]
+    
+    return tokens + [Token("}", RIGHT_BRACE, depth + 2)] * depth
+
+
+def quadratic_ids_names(tokens: list[Token]) -> list[str]:
+    """The old ID collection, it copies and scans a slice for each ID."""
+    id_names = [token.lexeme for token in tokens if token.token_type == ID]
+    return [id for i, id in enumerate(id_names) if id not in id_names[:i]]
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    for occurrences in [1_000, 10_000, 100_000, 1_000_000]:
+        tokens = build_tokens(occurrences)
+        old = f"{timed(lambda: quadratic_ids_names(tokens)):>8.3f}s" if occurrences <= 10_000 else "  skipped"
+        new = timed(lambda: get_ids_names(tokens))
+        
+        def all_tables():
+            symbol_table = SymbolTable(tokens)
+            ids = symbol_table.get_ids()
+            TreeSymbolTable(ids, symbol_table.unordered_table)
+            HashSymbolTable(ids)
+        
+        print(f"{occurrences:>9,} ids | old collection {old} | new collection {new:>8.3f}s | all symbol tables {timed(all_tables):>8.3f}s")
+    
+    # Generated code declares its identifiers in sorted order.
+    for count in [1_000, 100_000, 1_000_000]:
+        names = [f"v{index:07d}" for index in range(count)]
+        tree_table = None
+        
+        def build_tree():
+            nonlocal tree_table
+            tree_table = TreeSymbolTable(names)
+        
+        print(f"{count:>9,} sorted ids | tree table {timed(build_tree):>8.3f}s | height {tree_table.height}")
+    
+    # Deeply nested blocks, resolving a reference doesn't walk the scopes.
+    for depth in [100, 1_000, 10_000]:
+        tokens = build_nested_tokens(depth)
+        print(f"{depth:>9,} nested scopes | symbol table {timed(lambda: SymbolTable(tokens)):>8.3f}s | released {timed(lambda: SymbolTable(tokens, release_scopes=True)):>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
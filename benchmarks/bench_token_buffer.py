@@ -0,0 +1,44 @@
+import time
+from benchmarks.bench_tree_memory import traced
+from benchmarks.generator import ProgramGenerator
+from lexer import Lexer
+from ll1_parser import PARSERS
+from token_buffer import TokenBuffer
+
+
+def parse_seconds(parser_name: str, tokens) -> float:
+    """Returns: the seconds a parser takes on the tokens."""
+    start = time.perf_counter()
+    PARSERS[parser_name](tokens).parse()
+    return time.perf_counter() - start
+
+
+def main():
+    for statements in [10_000, 100_000]:
+        code = ProgramGenerator(seed=0, statements=statements).generate()
+        
+        tokens, list_size = traced(lambda: Lexer(code).get_tokens())
+        buffer, buffer_size = traced(lambda: TokenBuffer(code))
+        
+        # Timed again without tracing the allocations, which slows them down.
+        start = time.perf_counter()
+        Lexer(code).get_tokens()
+        list_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        TokenBuffer(code)
+        buffer_seconds = time.perf_counter() - start
+        
+        print(f"{len(tokens):>10,} tokens | list {list_size:>12,} bytes {list_seconds:7.3f}s | buffer {buffer_size:>12,} bytes {buffer_seconds:7.3f}s "
+              f"| {list_size / buffer_size:5.1f}x smaller")
+        
+        # The buffer saves memory, the parsers build the Token objects of
+        # the leaves from it so parsing it is slower.
+        for parser_name in PARSERS:
+            list_parse, buffer_parse = parse_seconds(parser_name, tokens), parse_seconds(parser_name, buffer)
+            print(f"{parser_name:>17} | parsing: list {list_parse:7.3f}s | buffer {buffer_parse:7.3f}s "
+                  f"| lexing and parsing: list {list_seconds + list_parse:7.3f}s | buffer {buffer_seconds + buffer_parse:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import tracemalloc
+from benchmarks.bench_lexer import build_source
+from lexer import Lexer
+from parse_tree_arena import ParseTreeArena
+from simple_parser import Parser, ParsingTreeNode
+
+
+class EagerNode:
+    """The old parsing tree node, with a formatted title and a
+    children list for every node."""
+    def __init__(self, title: str):
+        self.title: str = title
+        self.children: list[EagerNode] = []
+
+
+def to_eager(node: ParsingTreeNode) -> EagerNode:
+    """Copy a parsing tree into the old node representation."""
+    eager = EagerNode(node.title)
+    eager.children = [to_eager(child) for child in node.children]
+    return eager
+
+
+def traced(build) -> tuple[object, int]:
+    """Call the build function and measure the memory it keeps allocated.
+
+    Returns:
+        tuple[object, int]: The built object and its size in bytes.
+    """
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    for copies in [1_000, 10_000]:
+        code = build_source(copies)
+        tokens = Lexer(code).get_tokens()
+        
+        def parse(builder=None):
+            parser = Parser(tokens, builder)
+            parser.parse()
+            return parser.parsing_tree_root
+        
+        tree, compact_size = traced(parse)
+        _, eager_size = traced(lambda: to_eager(tree))
+        _, arena_size = traced(lambda: parse(ParseTreeArena()))
+        
+        print(f"{len(code):>10,} source bytes | eager tree {eager_size:>12,} bytes | compact tree {compact_size:>12,} bytes | arena {arena_size:>12,} bytes")
+
+
+if __name__ == "__main__":
+    main()
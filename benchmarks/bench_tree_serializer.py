@@ -0,0 +1,81 @@
+import io
+import time
+from benchmarks.bench_lexer import build_source
+from lexer import Lexer
+from simple_parser import IF_STMT, Parser, ParsingTreeNode
+from tree_serializer import load_binary, write_binary, write_json, write_text
+
+
+def recursive_print_tree(node: ParsingTreeNode, file, level: int = 0):
+    """The old text writer, a call and a write for each node."""
+    file.write("\t" * level + node.title + "\n")
+    
+    for child in node.children:
+        recursive_print_tree(child, file, level + 1)
+
+
+def count_nodes(root: ParsingTreeNode) -> int:
+    count, stack = 0, [root]
+    
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    
+    return count
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    for copies in [1_000, 10_000, 30_000]:
+        code = build_source(copies)
+        tokens = Lexer(code).get_tokens()
+        parser = Parser(tokens)
+        parser.parse()
+        tree = parser.parsing_tree_root
+        nodes = count_nodes(tree)
+        
+        print(f"{nodes:>9,} nodes | source {len(code) / 1e6:6.2f} MB")
+        
+        for name, writer, file_type in [("old text", recursive_print_tree, io.StringIO), ("text", write_text, io.StringIO),
+                                        ("json", write_json, io.StringIO), ("binary", write_binary, io.BytesIO)]:
+            file = file_type()
+            seconds = timed(lambda: writer(tree, file))
+            size = len(file.getvalue())
+            print(f"    write {name:<10} {seconds:8.3f}s | {size / 1e6:7.2f} MB")
+        
+        binary = io.BytesIO()
+        write_binary(tree, binary)
+        binary.seek(0)
+        
+        def reparse():
+            parser = Parser(Lexer(code).get_tokens())
+            parser.parse()
+        
+        print(f"    load binary      {timed(lambda: load_binary(binary)):8.3f}s | lex + parse {timed(reparse):8.3f}s")
+    
+    # An if nested too deep for the recursive writer.
+    depth = 5_000
+    root = node = ParsingTreeNode(IF_STMT)
+    
+    for _ in range(depth):
+        child = ParsingTreeNode(IF_STMT)
+        node.add_child(child)
+        node = child
+    
+    try:
+        recursive_print_tree(root, io.StringIO())
+        old = "ok"
+    except RecursionError:
+        old = "RecursionError"
+    
+    print(f"{depth:>9,} nested ifs | old text {old} | text {timed(lambda: write_text(root, io.StringIO())):8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
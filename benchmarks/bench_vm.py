@@ -0,0 +1,47 @@
+import time
+from main import compile_to_bytecode
+from virtual_machine import VirtualMachine
+
+
+def straight_line_program(statements: int) -> str:
+    """Returns: a program of many assignments without branches."""
+    lines = ["int a = 1;", "int b = 2;", "float c = 0.5;"]
+    
+    for i in range(statements):
+        lines.append(["a = a + b * 2 - 1;", "b = a % 7 + 3;", "c = c * 1.5 / (b + 1);"][i % 3])
+    
+    return "\n".join(lines)
+
+
+def nested_if_program(depth: int, copies: int) -> str:
+    """Returns: a program of nested if statements repeated many times."""
+    nested = "a = a + 1;"
+    
+    for level in range(depth):
+        nested = f"if (a + {level} >= 0) {{ {nested} }}"
+    
+    return "\n".join(["int a = 0;"] + [nested] * copies)
+
+
+def measure(name: str, code: str, runs: int = 5):
+    """Compile the program once, run it several times and print the
+    instructions per second of the fastest run."""
+    bytecode = compile_to_bytecode(code)
+    machine = VirtualMachine(bytecode, output=lambda value: None)
+    best = float("inf")
+    
+    for _ in range(runs):
+        start = time.perf_counter()
+        machine.run()
+        best = min(best, time.perf_counter() - start)
+    
+    print(f"{name:<28} | {len(bytecode.code):>9} code ints | {machine.executed:>9} instructions | {machine.executed / best:>12,.0f} instructions/sec")
+
+
+def main():
+    measure("straight line (30k stmts)", straight_line_program(30_000))
+    measure("nested if (depth 50 x 200)", nested_if_program(50, 200))
+
+
+if __name__ == "__main__":
+    main()
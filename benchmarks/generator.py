@@ -0,0 +1,209 @@
+import random
+from ll1_parser import load_grammar
+
+# The lexemes of the terminals that are always written the same way.
+PUNCTUATION = {
+    "PRINT": "print", "IF": "if", "ASSIGN": "=", "SEMICOLON": ";",
+    "LEFT_PAREN": "(", "RIGHT_PAREN": ")", "LEFT_BRACE": "{", "RIGHT_BRACE": "}",
+}
+
+DATA_TYPES = ["int", "float"]
+ARITHMETIC_OPERATORS = ["+", "-", "*", "/", "%"]
+RELATIONAL_OPERATORS = ["<", ">", "<=", ">=", "==", "!="]
+
+
+class ProgramGenerator:
+    def __init__(self, seed: int = 0, statements: int = 1_000, identifiers: int = 50, expression_length: int = 4,
+                 max_depth: int = 3, paren_probability: float = 0.15, grammar: dict[str, list[list[str]]] = None):
+        """Generate valid programs by expanding the grammar productions,
+        the choices are random but seeded, so the same settings always give
+        the same program. Variables are declared before they are used.
+        
+        Args:
+            seed (int, optional): The random seed. Defaults to 0.
+            statements (int, optional): Top level statements. Defaults to 1,000.
+            identifiers (int, optional): Distinct global variables. Defaults to 50.
+            expression_length (int, optional): Most terms in an expression. Defaults to 4.
+            max_depth (int, optional): Most nested `if` statements. Defaults to 3.
+            paren_probability (float, optional): Chance of a term being a
+            parenthesized expression, it's halved for each open parenthesis.
+            grammar (dict, optional): The productions. Defaults to grammar.txt.
+        """
+        self.random: random.Random = random.Random(seed)
+        self.statements: int = statements
+        self.identifiers: int = identifiers
+        self.expression_length: int = expression_length
+        self.max_depth: int = max_depth
+        self.paren_probability: float = paren_probability
+        self.grammar: dict[str, list[list[str]]] = grammar or load_grammar()
+        self.lexemes: list[str] = []
+        self.visible: list[str] = [] # The variables that can be used.
+        self.declared: int = 0 # Global variables declared so far.
+        self.depth: int = 0 # Open `if` statements.
+        self.parens: int = 0 # Open parentheses.
+        self.terms: int = 0 # Terms left in the current expression.
+
+
+    def generate(self) -> str:
+        """Returns: the source of a new program."""
+        self.lexemes = []
+        
+        for _ in range(self.statements):
+            self.expand("stmt")
+        
+        return self.format(self.lexemes)
+
+
+    def format(self, lexemes: list[str]) -> str:
+        """Returns: the lexemes joined into lines, a line ends after each
+        semicolon and brace."""
+        lines, line, indent = [], [], 0
+        
+        for lexeme in lexemes:
+            if lexeme == "}": indent -= 1
+            line.append(lexeme)
+            
+            if lexeme in (";", "{", "}"):
+                lines.append("    " * indent + " ".join(line))
+                line = []
+            
+            if lexeme == "{": indent += 1
+        
+        return "\n".join(lines) + "\n"
+
+
+    def expand(self, symbol: str):
+        """Add the lexemes of a grammar symbol to the program.
+        
+        Args:
+            symbol (str): A non terminal or a terminal of the grammar.
+        """
+        if symbol not in self.grammar:
+            self.lexemes.append(self.terminal(symbol))
+            return
+        
+        if symbol == "if_stmt":
+            self.expand_if()
+            return
+        
+        if symbol == "expr":
+            self.expand_expr()
+            return
+        
+        for child in self.choose(symbol, self.grammar[symbol]):
+            self.expand(child)
+
+
+    def expand_if(self):
+        """Expand an if statement, the declarations in its body are only
+        visible inside it."""
+        visible = len(self.visible)
+        self.depth += 1
+        
+        for child in self.grammar["if_stmt"][0]:
+            self.expand(child)
+        
+        self.depth -= 1
+        del self.visible[visible:]
+
+
+    def expand_expr(self):
+        """Expand an expression with a random number of terms, an
+        expression in parentheses has its own number."""
+        terms = self.terms
+        self.terms = self.random.randint(1, self.expression_length)
+        
+        for child in self.grammar["expr"][0]:
+            self.expand(child)
+        
+        self.terms = terms
+
+
+    def choose(self, symbol: str, alternatives: list[list[str]]) -> list[str]:
+        """Pick the alternative of a non terminal, the random choices are
+        limited so the program is valid and has the requested shape.
+        
+        Args:
+            symbol (str): The non terminal.
+            alternatives (list[list[str]]): Its alternatives.
+        
+        Returns:
+            list[str]: The picked alternative.
+        """
+        if symbol == "stmt":
+            names = [alternative[0] for alternative in alternatives]
+            
+            # Nothing can be used before the first declaration.
+            if not self.visible or (self.depth == 0 and self.declared < self.identifiers and self.random.random() < 0.3):
+                return alternatives[names.index("dec_stmt")]
+            
+            allowed = [alternative for alternative in alternatives if alternative[0] != "dec_stmt" or self.depth > 0]
+            if self.depth >= self.max_depth:
+                allowed = [alternative for alternative in allowed if alternative[0] != "if_stmt"]
+            
+            return self.random.choice(allowed)
+        
+        if symbol == "arth_expr":
+            # Go on while the expression needs more terms.
+            self.terms -= 1
+            return max(alternatives, key=len) if self.terms > 0 else min(alternatives, key=len)
+        elif symbol == "term":
+            alternatives = [alternative for alternative in alternatives if alternative[0] != "ID" or self.visible]
+            nested = [alternative for alternative in alternatives if len(alternative) > 1]
+            
+            if nested and self.random.random() < self.paren_probability / (1 << self.parens):
+                return nested[0]
+            
+            return self.random.choice([alternative for alternative in alternatives if len(alternative) == 1])
+        
+        return self.random.choice(alternatives)
+
+
+    def terminal(self, symbol: str) -> str:
+        """Returns: the lexeme of a terminal."""
+        if symbol in PUNCTUATION:
+            if symbol == "LEFT_PAREN": self.parens += 1
+            elif symbol == "RIGHT_PAREN": self.parens -= 1
+            return PUNCTUATION[symbol]
+        
+        if symbol == "ID":
+            # The ID after a data type is declared, the others are used.
+            if self.lexemes and self.lexemes[-1] in DATA_TYPES:
+                if self.depth == 0:
+                    name = f"v{self.declared}"
+                    self.declared += 1
+                else:
+                    name = f"l{len(self.lexemes)}"
+                
+                self.visible.append(name)
+                return name
+            
+            return self.random.choice(self.visible)
+        
+        if symbol == "NUMBER":
+            if self.random.random() < 0.3: return f"{self.random.randint(0, 999)}.{self.random.randint(0, 99)}"
+            return str(self.random.randint(0, 9999))
+        
+        if symbol == "DATA_TYPE": return self.random.choice(DATA_TYPES)
+        if symbol == "ARITHMETIC_OPERATOR": return self.random.choice(ARITHMETIC_OPERATORS)
+        if symbol == "RELATIONAL_OPERATOR": return self.random.choice(RELATIONAL_OPERATORS)
+        raise ValueError(f"Unknown terminal <{symbol}>")
+
+
+def sorted_identifiers(count: int) -> str:
+    """Returns: a program declaring its variables in sorted order and then
+    using them, the worst order for an unbalanced search tree."""
+    names = [f"v{index:07d}" for index in range(count)]
+    return "\n".join([f"int {name} = {index};" for index, name in enumerate(names)] + [f"print({name});" for name in names]) + "\n"
+
+
+def deep_parentheses(depth: int, statements: int = 10) -> str:
+    """Returns: assignments of expressions nested in `depth` parentheses."""
+    expression = "(" * depth + "x" + " + 1)" * depth
+    return "int x = 1;\n" + f"x = {expression};\n" * statements
+
+
+def deep_nesting(depth: int, statements: int = 10) -> str:
+    """Returns: `if` statements nested `depth` times."""
+    opened = "".join(f"if (x > {level}) {{\n" for level in range(depth))
+    return "int x = 1;\n" + (opened + "x = x + 1;\n" + "}\n" * depth) * statements
@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from benchmarks.generator import ProgramGenerator, deep_nesting, deep_parentheses, sorted_identifiers
+from lexer import Lexer
+from ll1_parser import LL1Parser
+from simple_parser import Parser
+from symbol_table import HashSymbolTable, SymbolTable, TreeSymbolTable
+from typing import Callable
+
+# Top level statements of each size tier.
+TIERS = {"small": 1_000, "medium": 10_000, "large": 100_000}
+
+# Build the program of each shape for a number of statements.
+SHAPES: dict[str, Callable[[int], str]] = {
+    "random": lambda size: ProgramGenerator(seed=0, statements=size).generate(),
+    "many_ids": lambda size: ProgramGenerator(seed=1, statements=size, identifiers=size // 2).generate(),
+    "long_expressions": lambda size: ProgramGenerator(seed=2, statements=size, expression_length=32).generate(),
+    "deep_if": lambda size: deep_nesting(50, max(1, size // 50)),
+    "deep_parens": lambda size: deep_parentheses(100, max(1, size // 100)),
+    "sorted_ids": lambda size: sorted_identifiers(size // 2),
+}
+
+
+def phases(code: str) -> list[tuple[str, Callable[[dict], object]]]:
+    """Returns: the compiler phases in order, each one takes the results
+    of the phases before it by their names."""
+    def print_tree(results: dict):
+        with open(os.devnull, "w") as file:
+            results["parser"].print_tree(file)
+
+    def parse(results: dict, parser_class: type = Parser):
+        parser = parser_class(results["lexer"])
+        parser.parse()
+        return parser.parsing_tree_root
+    
+    return [
+        ("lexer", lambda results: Lexer(code).get_tokens()),
+        ("parser", parse),
+        ("ll1_parser", lambda results: parse(results, LL1Parser)),
+        ("symbol_table", lambda results: SymbolTable(results["lexer"])),
+        ("tree_symbol_table", lambda results: TreeSymbolTable(results["symbol_table"].get_ids(), results["symbol_table"].unordered_table)),
+        ("hash_symbol_table", lambda results: HashSymbolTable(results["symbol_table"].get_ids(), results["symbol_table"].unordered_table)),
+        ("tree_printing", print_tree),
+    ]
+
+
+def measure(code: str, repeat: int = 3) -> dict[str, dict[str, float]]:
+    """Time each phase of compiling the code, and measure the peak memory
+    it allocates in a separate run, because tracing slows it down.
+    
+    Args:
+        code (str): Source code.
+        repeat (int, optional): Runs of each phase, the fastest counts. Defaults to 3.
+    
+    Returns:
+        dict[str, dict[str, float]]: The seconds and peak bytes of each phase.
+    """
+    results, report = {}, {}
+    
+    for name, phase in phases(code):
+        seconds = float("inf")
+        
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results[name] = phase(results)
+            seconds = min(seconds, time.perf_counter() - start)
+        
+        tracemalloc.start()
+        phase(results)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        
+        report[name] = {"seconds": seconds, "peak_bytes": peak}
+    
+    return report
+
+
+def run(tiers: list[str], shapes: list[str], repeat: int, output: str):
+    """Measure every shape in every tier and save the results as JSON.
+    
+    Args:
+        tiers (list[str]): Names from `TIERS`.
+        shapes (list[str]): Names from `SHAPES`.
+        repeat (int): Runs of each phase.
+        output (str): The results file.
+    """
+    results = {}
+    
+    for tier in tiers:
+        for shape in shapes:
+            code = SHAPES[shape](TIERS[tier])
+            workload = f"{shape}/{tier}"
+            results[workload] = {"source_bytes": len(code), "phases": measure(code, repeat)}
+            
+            for name, phase in results[workload]["phases"].items():
+                print(f"{workload:<24} | {name:<18} | {phase['seconds']:9.4f}s | {phase['peak_bytes'] / 1e6:9.2f} MB")
+    
+    meta = {"python": platform.python_version(), "platform": platform.platform(), "repeat": repeat, "time": time.time()}
+    
+    with open(output, "w") as file:
+        json.dump({"meta": meta, "results": results}, file, indent=2)
+    
+    print(f"\nResults saved to \"{output}\".")
+
+
+def compare(baseline: str, current: str, threshold: float) -> int:
+    """Compare two results files and print the phases that got slower or
+    use more memory than the threshold allows.
+    
+    Args:
+        baseline (str): The old results file.
+        current (str): The new results file.
+        threshold (float): The allowed increase, 0.1 is 10%.
+    
+    Returns:
+        int: The number of regressions.
+    """
+    with open(baseline) as file:
+        old = json.load(file)["results"]
+    
+    with open(current) as file:
+        new = json.load(file)["results"]
+    
+    regressions = 0
+    
+    for workload in sorted(old.keys() & new.keys()):
+        for name in [name for name in old[workload]["phases"] if name in new[workload]["phases"]]:
+            old_phase, new_phase = old[workload]["phases"][name], new[workload]["phases"][name]
+            
+            for metric in ("seconds", "peak_bytes"):
+                ratio = new_phase[metric] / old_phase[metric] if old_phase[metric] else 1.0
+                flag = ""
+                
+                if ratio > 1 + threshold:
+                    regressions += 1
+                    flag = "REGRESSION"
+                
+                print(f"{workload:<24} | {name:<18} | {metric:<10} | {ratio:7.2f}x {flag}")
+    
+    print(f"\n{regressions} regressions beyond {threshold:.0%}.")
+    return regressions
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="Measure the compiler phases on generated programs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = commands.add_parser("run", help="Measure and save the results.")
+    run_parser.add_argument("--tiers", nargs="+", choices=TIERS, default=["small", "medium"])
+    run_parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    run_parser.add_argument("--repeat", type=int, default=3, help="Runs of each phase, the fastest counts.")
+    run_parser.add_argument("--output", default="bench_results.json", help="The results file.")
+    
+    compare_parser = commands.add_parser("compare", help="Flag the regressions between two results files.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="The allowed increase. Defaults to 0.10.")
+    
+    arguments = parser.parse_args(argv)
+    
+    if arguments.command == "run":
+        run(arguments.tiers, arguments.shapes, arguments.repeat, arguments.output)
+    elif compare(arguments.baseline, arguments.current, arguments.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
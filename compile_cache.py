@@ -0,0 +1,255 @@
+import gc
+import hashlib
+import io
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from lexer import Lexer, Token
+from ll1_parser import PARSERS
+from simple_parser import ParsingTreeNode
+from symbol_table import SymbolTable
+from tree_serializer import load_binary, load_tokens, write_binary
+
+# Files that change the compile results, they are part of the cache key.
+# The parsers build the same tree, so the parser isn't.
+COMPILER_FILES = ("tokens.py", "grammar.txt", "lexer.py", "simple_parser.py", "ll1_parser.py", "symbol_table.py", "tree_serializer.py",
+                  "compile_cache.py")
+CACHE_SUFFIX = ".abdc"
+
+# Written first in a cache file, then the binary tree or the UTF-8 error.
+TREE_MAGIC, ERROR_MAGIC = b"ABDC\x01T", b"ABDC\x01E"
+
+# After going over the size cap, old files are evicted until the directory
+# is this part of the cap, so the next writes don't scan it again.
+LOW_WATER_MARK = 0.9
+
+
+@dataclass
+class CompileArtifacts:
+    """Used to save the results of the compile phases, or the error."""
+    tokens: list[Token] = None
+    tree: ParsingTreeNode = None
+    symbol_table: SymbolTable = None
+    error: str = None
+
+
+@lru_cache(maxsize=1)
+def compiler_fingerprint() -> bytes:
+    """Returns: a hash of the compiler source files, so changing the
+    compiler never loads results of an older version."""
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    
+    for name in COMPILER_FILES:
+        with open(os.path.join(directory, name), "rb") as file:
+            digest.update(name.encode() + b"\0" + file.read() + b"\0")
+    
+    return digest.digest()
+
+
+def compile_source(code: str, parser_name: str = "recursive") -> CompileArtifacts:
+    """Run the lexer, parser and symbol table phases.
+
+    Args:
+        code (str): Source code.
+        parser_name (str, optional): One of `PARSERS`. Defaults to "recursive".
+
+    Returns:
+        CompileArtifacts: The results, or the error of the code. Code
+        nested too deeply for the recursive parser is parsed again with
+        the LL(1) one, it builds the same tree without recursion, so the
+        results don't depend on the parser.
+    """
+    try:
+        tokens = Lexer(code).get_tokens()
+        parser = PARSERS[parser_name](tokens)
+        parser.parse()
+        return CompileArtifacts(tokens, parser.parsing_tree_root, SymbolTable(tokens))
+    except SyntaxError as error:
+        return CompileArtifacts(error=str(error))
+    except RecursionError:
+        if parser_name != "ll1": return compile_source(code, "ll1")
+        return CompileArtifacts(error="⚠️  The code is nested too deeply to be compiled!")
+
+
+class CompileCache:
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        """Initialize the cache in a directory, it can be shared by many
+        processes because every write is atomic. Each file is the binary
+        parsing tree of a source, its leaves are all the tokens, and the
+        symbol table is built again from them as it's faster than loading it.
+
+        The size of the directory is scanned at the first write, then each
+        cache adds the size of its own writes, and scans the directory again
+        only when the total goes over the cap. With many processes writing,
+        the directory can go over the cap by what the others wrote since.
+
+        Args:
+            directory (str): The cache directory, created if missing.
+            max_bytes (int, optional): Size cap of the directory. Defaults to 256 MiB.
+        """
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.size: int = None # The bytes in the directory, scanned at the first write.
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        os.makedirs(directory, exist_ok=True)
+
+
+    def path(self, source: bytes) -> str:
+        """Returns: the cache file of the source, named by the hash of
+        the source and the compiler fingerprint."""
+        key = hashlib.sha256(compiler_fingerprint() + source).hexdigest()
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+
+    def get(self, source: bytes, tree: bool = True) -> CompileArtifacts | None:
+        """Load the cached results of the source. A hit touches the file
+        modification time, which is used as the LRU order.
+
+        Args:
+            source (bytes): The source code bytes.
+            tree (bool, optional): Build the parsing tree, it's most of the
+            loading time. Without it only the tokens and the symbol table
+            are loaded. Defaults to True.
+
+        Returns:
+            CompileArtifacts | None: The results, or None on a miss.
+        """
+        path = self.path(source)
+        
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            
+            if data.startswith(ERROR_MAGIC):
+                artifacts = CompileArtifacts(error=data[len(ERROR_MAGIC):].decode())
+            elif data.startswith(TREE_MAGIC):
+                artifacts = self.load(data[len(TREE_MAGIC):], tree)
+            else:
+                raise ValueError("Not a cache file")
+            
+            os.utime(path)
+        except (OSError, ValueError, IndexError, UnicodeDecodeError):
+            # Missing or broken, compile again and replace it.
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return artifacts
+
+
+    @staticmethod
+    def load(data: bytes, tree: bool) -> CompileArtifacts:
+        """Returns: the results of a binary tree, with the symbol table of
+        its tokens."""
+        file = io.BytesIO(data)
+        
+        # The garbage collector would scan the new objects again and again
+        # while they are created, and they have no cycles.
+        enabled = gc.isenabled()
+        gc.disable()
+        
+        try:
+            if tree:
+                tokens = []
+                root = load_binary(file, tokens=tokens)
+            else:
+                tokens, root = load_tokens(file), None
+            
+            return CompileArtifacts(tokens, root, SymbolTable(tokens))
+        finally:
+            if enabled: gc.enable()
+
+
+    def put(self, source: bytes, artifacts: CompileArtifacts):
+        """Save the results atomically by writing a temporary file and
+        renaming it, then evict old files if the cap is exceeded.
+
+        Args:
+            source (bytes): The source code bytes.
+            artifacts (CompileArtifacts): The results.
+        """
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                if artifacts.error is not None:
+                    file.write(ERROR_MAGIC + artifacts.error.encode())
+                else:
+                    file.write(TREE_MAGIC)
+                    write_binary(artifacts.tree, file)
+                
+                written = file.tell()
+            
+            os.replace(temporary_path, self.path(source))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+        
+        if self.size is None:
+            self.evict()
+        else:
+            self.size += written
+            if self.size > self.max_bytes: self.evict()
+
+
+    def evict(self):
+        """Scan the size of the directory, and if it's over the cap remove
+        the least recently used files until it's under the low water mark."""
+        files = []
+        
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue # Removed by another process.
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        self.size = sum(size for _, size, _ in files)
+        if self.size <= self.max_bytes: return
+        
+        for _, size, path in sorted(files):
+            if self.size <= self.max_bytes * LOW_WATER_MARK: break
+            
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            
+            self.size -= size
+
+
+    def compile(self, code: str, tree: bool = True, parser_name: str = "recursive") -> CompileArtifacts:
+        """Get the results of the code from the cache, or compile it and
+        cache the results. Errors are cached too.
+
+        Args:
+            code (str): Source code.
+            tree (bool, optional): Load the parsing tree of a cached code.
+            Defaults to True.
+            parser_name (str, optional): The parser of a miss, one of
+            `PARSERS`. Defaults to "recursive".
+
+        Returns:
+            CompileArtifacts: The results, or the error of the code.
+        """
+        source = code.encode()
+        artifacts = self.get(source, tree)
+        
+        if artifacts is None:
+            artifacts = compile_source(code, parser_name)
+            self.put(source, artifacts)
+        
+        return artifacts
+
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Returns: the hit, miss and eviction counters."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,163 @@
+from dataclasses import dataclass, field
+from instrumentation import NO_STATS, Stats
+from lexer import Diagnostic, Lexer, Token
+from ll1_parser import PARSERS
+from simple_parser import ParsingTreeNode
+from symbol_table import HashSymbolTable, SymbolTable, TreeSymbolTable
+from token_buffer import TokenBuffer
+from typing import Iterable
+
+# The phases `compile` can run, with the phases each one needs.
+PHASES = {
+    "tokens": (),
+    "tree": ("tokens",),
+    "symbol_table": ("tree",), # Only the symbols of a valid syntax are found.
+    "tree_table": ("symbol_table",),
+    "hash_table": ("symbol_table",),
+    "ir": ("symbol_table",), # Three address code, after the passes of `ir_passes`.
+    "layout": ("symbol_table",),
+}
+DEFAULT_PHASES = ("tokens", "tree", "symbol_table")
+
+
+@dataclass
+class CompileResult:
+    """Used to save the results of the phases that ran, and the errors
+    of the code."""
+    tokens: list[Token] | TokenBuffer = None
+    tree: ParsingTreeNode = None
+    symbol_table: SymbolTable = None
+    tree_table: TreeSymbolTable = None
+    hash_table: HashSymbolTable = None
+    ir: "IRProgram" = None
+    ir_reports: list["PassReport"] = field(default_factory=list)
+    layout: "MemoryLayout" = None
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Returns: whether the code has no errors."""
+        return not self.diagnostics
+
+
+def required_phases(phases: Iterable[str]) -> set[str]:
+    """Returns: the phases and all the phases they need.
+    
+    Raises:
+        ValueError: If a phase name isn't in `PHASES`.
+    """
+    required, pending = set(), list(phases)
+    
+    while pending:
+        phase = pending.pop()
+        
+        if phase not in PHASES:
+            raise ValueError(f"Unknown phase <{phase}>, expected one of {', '.join(PHASES)}")
+        
+        if phase not in required:
+            required.add(phase)
+            pending.extend(PHASES[phase])
+    
+    return required
+
+
+def compile(source: str, *, phases: Iterable[str] = DEFAULT_PHASES, recover: bool = False, max_diagnostics: int = 100,
+            stats: Stats = NO_STATS, parser_name: str = "recursive", compact_tokens: bool = False, lex_workers: int = 1,
+            ir_passes: Iterable[str] = None) -> CompileResult:
+    """Run the compile phases on the source code without printing
+    anything, the errors of the code are returned instead of raised.
+    
+    Args:
+        source (str): Source code.
+        phases (Iterable[str], optional): The results needed, from `PHASES`,
+        the phases they need run too. Defaults to tokens, tree and symbol table.
+        recover (bool, optional): Find all the lexical and syntax errors
+        instead of the first one. Defaults to False.
+        max_diagnostics (int, optional): Stop after that many errors. Defaults to 100.
+        stats (Stats, optional): Records the time of each phase.
+        parser_name (str, optional): One of `PARSERS`, they build the same
+        tree. Defaults to "recursive".
+        compact_tokens (bool, optional): Keep the tokens in a `TokenBuffer`
+        instead of a list of Token objects, it takes a tenth of the memory
+        but parsing it is slower. Defaults to False.
+        lex_workers (int, optional): Lex large sources over that many
+        processes, the tokens are then a `TokenBuffer`. None is the number
+        of CPUs. Defaults to 1.
+        ir_passes (Iterable[str], optional): The passes run on the three
+        address code, names from `three_address_code.PASSES`. None is its
+        DEFAULT_PIPELINE. Defaults to None.
+    
+    Raises:
+        ValueError: If a phase name isn't in `PHASES`, or a pass name isn't
+        in `three_address_code.PASSES`.
+    
+    Returns:
+        CompileResult: The results and the errors.
+    """
+    required = required_phases(phases)
+    result = CompileResult()
+    diagnostics = result.diagnostics if recover else None
+    
+    try:
+        with stats.phase("lexing"):
+            if lex_workers != 1:
+                # The process pool is slow to import, and only used here.
+                from parallel_lexer import lex_parallel
+                result.tokens = lex_parallel(source, lex_workers, diagnostics, max_diagnostics)
+            elif compact_tokens:
+                result.tokens = TokenBuffer(source, diagnostics=diagnostics, max_diagnostics=max_diagnostics)
+            else:
+                result.tokens = Lexer(source, diagnostics=diagnostics, max_diagnostics=max_diagnostics).get_tokens()
+        
+        if "tree" in required:
+            with stats.phase("parsing"):
+                parser = PARSERS[parser_name](result.tokens, diagnostics=diagnostics, max_diagnostics=max_diagnostics)
+                parser.parse()
+                result.tree = parser.parsing_tree_root
+        
+        # The symbols of broken code aren't worth finding.
+        if "symbol_table" in required and not result.diagnostics:
+            with stats.phase("symbol_table"):
+                result.symbol_table = SymbolTable(result.tokens)
+            
+            ids = result.symbol_table.get_ids()
+            
+            if "tree_table" in required:
+                with stats.phase("tree_symbol_table"):
+                    result.tree_table = TreeSymbolTable(ids, result.symbol_table.unordered_table)
+            
+            if "hash_table" in required:
+                with stats.phase("hash_symbol_table"):
+                    result.hash_table = HashSymbolTable(ids, result.symbol_table.unordered_table)
+    
+            if "ir" in required:
+                # The middle end is only imported when it's used.
+                from abstract_syntax_tree import ASTBuilder, ConstantFolder
+                from three_address_code import DEFAULT_PIPELINE, IRBuilder, optimize
+                
+                with stats.phase("ir"):
+                    program = ConstantFolder().fold(ASTBuilder(result.symbol_table).build(result.tree))
+                    result.ir = IRBuilder().build(program)
+                
+                with stats.phase("ir_passes"):
+                    result.ir_reports = optimize(result.ir, DEFAULT_PIPELINE if ir_passes is None else ir_passes)
+                
+                if stats.enabled:
+                    stats.count("ir_instructions", len(result.ir.instructions))
+                    stats.count("ir_removed_instructions", sum(report.removed for report in result.ir_reports))
+            
+            if "layout" in required:
+                from memory_layout import MemoryLayout
+                
+                with stats.phase("memory_layout"):
+                    result.layout = MemoryLayout(result.symbol_table)
+                
+                if stats.enabled:
+                    stats.count("unshared_frame_size", result.layout.unshared_frame_size)
+                    stats.count("frame_size", result.layout.frame_size)
+    
+    # Without recovering, the first error stops the phases.
+    except SyntaxError as se:
+        result.diagnostics.append(Diagnostic(None, str(se)))
+    
+    return result
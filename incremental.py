@@ -0,0 +1,185 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from lexer import Lexer, Token, scan_tokens
+from simple_parser import Parser, ParsingTreeNode
+from symbol_table import SymbolTable
+from tokens import *
+
+
+def split_lines(text: str) -> list[str]:
+    """Split an edit text into lines, a final new line doesn't start
+    a new line, so "" is no lines and "x;\\n" is one line."""
+    if not text: return []
+    lines = text.split("\n")
+    return lines[:-1] if text.endswith("\n") else lines
+
+
+def first_line(node: ParsingTreeNode) -> int:
+    """Returns: the line of the first token in the node."""
+    while node.token is None: node = node.children[0]
+    return node.token.line_number
+
+
+def last_line(node: ParsingTreeNode) -> int:
+    """Returns: the line of the last token in the node."""
+    while node.token is None: node = node.children[-1]
+    return node.token.line_number
+
+
+class IncrementalCompiler:
+    def __init__(self, code: str):
+        """Compile the whole source code once, later edits only redo the
+        work for the lines they touch.
+
+        Args:
+            code (str): Source code.
+        """
+        self.lines: list[str] = code.split("\n")
+        self.tokens: list[Token] = None
+        self.tree: ParsingTreeNode = None
+        self.symbol_table: SymbolTable = None
+        self.starts: array = array("i") # First line of each top level statement.
+        self.ends: array = array("i") # Last line of each top level statement.
+        self.rebuild()
+
+
+    def rebuild(self):
+        """Compile the whole source code from scratch.
+
+        Raises:
+            SyntaxError: If the code has an error.
+        """
+        self.tokens = self.tree = self.symbol_table = None
+        tokens = Lexer("\n".join(self.lines)).get_tokens()
+        parser = Parser(tokens)
+        parser.parse()
+        self.symbol_table = SymbolTable(tokens)
+        self.tokens = tokens
+        self.tree = parser.parsing_tree_root
+        self.starts = array("i", map(first_line, self.tree.children))
+        self.ends = array("i", map(last_line, self.tree.children))
+
+
+    def edit(self, start_line: int, end_line: int, text: str):
+        """Replace the lines from `start_line` up to but not including
+        `end_line` with the lines of the text, then re-lex only the touched
+        lines, re-parse only the top level statements on them and patch the
+        symbol table. If the code had an error before, compile it again.
+
+        Args:
+            start_line (int): First replaced line, starting from 1.
+            end_line (int): The line after the last replaced one, equals
+            `start_line` to insert the text before it.
+            text (str): The new text.
+
+        Raises:
+            SyntaxError: If the code has an error after the edit.
+        """
+        new_lines = split_lines(text)
+        
+        if self.tokens is None:
+            self.lines[start_line - 1:end_line - 1] = new_lines
+            self.rebuild()
+            return
+        
+        try:
+            self.patch(start_line, end_line, new_lines)
+        except SyntaxError:
+            # Keep the edit and report the error, the next edit compiles
+            # everything again.
+            self.tokens = self.tree = self.symbol_table = None
+            raise
+
+
+    def patch(self, start_line: int, end_line: int, new_lines: list[str]):
+        """Apply the edit to the compiled state, see `edit`."""
+        starts, ends = self.starts, self.ends
+        
+        # Grow the region until it covers whole statements, because the
+        # statements sharing a line with the edit are lexed again too.
+        region_start, region_end = start_line, end_line - 1
+        first, last = bisect_left(ends, start_line), bisect_left(starts, end_line)
+        
+        while first < last and (starts[first] < region_start or ends[last - 1] > region_end):
+            region_start = min(region_start, starts[first])
+            region_end = max(region_end, ends[last - 1])
+            first, last = bisect_left(ends, region_start), bisect_right(starts, region_end)
+        
+        region_lines = self.lines[region_start - 1:start_line - 1] + new_lines + self.lines[end_line - 1:region_end]
+        self.lines[start_line - 1:end_line - 1] = new_lines
+        
+        # Lex and parse the new text of the region.
+        new_tokens = list(scan_tokens("\n".join(region_lines), region_start))
+        new_stmts = list(Parser(new_tokens).iter_stmts())
+        
+        token_start = bisect_left(self.tokens, region_start, key=lambda token: token.line_number)
+        token_end = bisect_right(self.tokens, region_end, lo=token_start, key=lambda token: token.line_number)
+        old_tokens = self.tokens[token_start:token_end]
+        delta = len(new_lines) - (end_line - start_line)
+        
+        self.patch_symbol_table(old_tokens, new_tokens, region_end, delta)
+        
+        # Splice the new tokens and statements in, and shift the lines
+        # of everything after the region.
+        self.tokens[token_start:token_end] = new_tokens
+        self.tree.children[first:last] = new_stmts
+        starts[first:last] = array("i", map(first_line, new_stmts))
+        ends[first:last] = array("i", map(last_line, new_stmts))
+        
+        if delta:
+            for token in self.tokens[token_start + len(new_tokens):]:
+                token.line_number += delta
+            
+            for index in range(first + len(new_stmts), len(starts)):
+                starts[index] += delta
+                ends[index] += delta
+        
+        if self.symbol_table is None:
+            self.symbol_table = SymbolTable(self.tokens)
+
+
+    def patch_symbol_table(self, old_tokens: list[Token], new_tokens: list[Token], region_end: int, delta: int):
+        """Update the reference lines of the symbol table entries instead of
+        building it again. If the region declares a variable or opens a
+        scope, build it again after splicing the tokens. Otherwise all its
+        references are in the global scope.
+
+        Args:
+            old_tokens (list[Token]): The tokens removed from the region.
+            new_tokens (list[Token]): The tokens added to the region.
+            region_end (int): Last line of the region before the edit.
+            delta (int): How many lines were added, negative if removed.
+
+        Raises:
+            SyntaxError: If a variable is used before being declared.
+        """
+        table = self.symbol_table.unordered_table
+        
+        if any(token.token_type in (DATA_TYPE, LEFT_BRACE, RIGHT_BRACE) for token in old_tokens + new_tokens):
+            self.symbol_table = None
+            return
+        
+        # Check the new references before touching the table, the lines
+        # after the region are compared after shifting them.
+        for token in new_tokens:
+            if token.token_type == ID:
+                entry = table.get(token.lexeme)
+                
+                if entry is None or entry.declaration_line + (delta if entry.declaration_line > region_end else 0) > token.line_number:
+                    raise SyntaxError(f"⚠️  The variable <{token.lexeme}> is used before being declared!")
+        
+        for token in old_tokens:
+            if token.token_type == ID:
+                table[token.lexeme].reference_lines.remove(token.line_number)
+        
+        if delta:
+            for entry in table.values():
+                if entry.declaration_line > region_end: entry.declaration_line += delta
+                lines = entry.reference_lines
+                
+                for index in range(bisect_right(lines, region_end), len(lines)):
+                    lines[index] += delta
+        
+        for token in new_tokens:
+            if token.token_type == ID:
+                insort(table[token.lexeme].reference_lines, token.line_number)
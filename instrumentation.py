@@ -0,0 +1,120 @@
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator, TextIO
+
+# Used by the disabled stats for every phase.
+NO_PHASE = nullcontext()
+
+
+def count_nodes(root) -> int:
+    """Returns: the number of nodes in a parsing tree, counted without
+    recursion."""
+    count, stack = 0, [root]
+    
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    
+    return count
+
+
+class Stats:
+    def __init__(self, hooks: list[Callable[[str, float], None]] = None):
+        """Used to record the wall time of each compile phase and a few
+        counters about its work, the compile functions take it as an
+        optional argument.
+        
+        Args:
+            hooks (list[Callable[[str, float], None]], optional): Called
+            with the name and the seconds of each phase when it ends.
+        """
+        self.hooks: list[Callable[[str, float], None]] = hooks or []
+        self.phases: dict[str, float] = {}
+        self.counters: dict[str, int | float] = {}
+
+
+    @property
+    def enabled(self) -> bool:
+        """Returns: whether the counters are worth computing."""
+        return True
+
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure the wall time of the code in the `with` block, the times
+        of a phase measured more than once are added.
+        
+        Args:
+            name (str): The phase name.
+        """
+        start = time.perf_counter()
+        
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+            
+            for hook in self.hooks:
+                hook(name, seconds)
+
+
+    def count(self, name: str, value: int | float):
+        """Record a counter, like the number of tokens."""
+        self.counters[name] = value
+
+
+    def report(self) -> dict[str, dict[str, float]]:
+        """Returns: the phase times and the counters, with the tokens per
+        second if the tokens were counted while lexing."""
+        counters = dict(self.counters)
+        
+        if self.phases.get("lexing") and "tokens" in counters:
+            counters["tokens_per_second"] = round(counters["tokens"] / self.phases["lexing"])
+        
+        return {"phases": dict(self.phases), "counters": counters}
+
+
+    def print_report(self, as_json: bool = False, file: TextIO = None):
+        """Print the report as a table, or as a single JSON line.
+        
+        Args:
+            as_json (bool, optional): Print JSON. Defaults to False.
+            file (TextIO, optional): Defaults to the standard output.
+        """
+        file = file or sys.stdout
+        report = self.report()
+        
+        if as_json:
+            file.write(json.dumps({"section": "stats", **report}) + "\n")
+            return
+        
+        file.write(f"\n{'=' * 10} Stats {'=' * 10}\n")
+        
+        for name, seconds in report["phases"].items():
+            file.write(f"{name:<28} {seconds * 1000:>12.3f} ms\n")
+        
+        for name, value in report["counters"].items():
+            file.write(f"{name:<28} {value:>15,}\n")
+
+
+class DisabledStats(Stats):
+    """Records nothing, it's the default of the compile functions so
+    measuring costs nothing when it's not needed."""
+    @property
+    def enabled(self) -> bool:
+        return False
+
+
+    def phase(self, name: str):
+        return NO_PHASE
+
+
+    def count(self, name: str, value: int | float):
+        pass
+
+
+NO_STATS = DisabledStats()
@@ -1,6 +1,8 @@
 import re
+import codecs
 from tokens import *
 from dataclasses import dataclass
+from typing import BinaryIO, Iterator, TextIO
 
 
 @dataclass
@@ -11,31 +13,206 @@ class Token:
     line_number: int
 
 
+@dataclass
+class Diagnostic:
+    """Used to save a single error found while recovering from errors."""
+    line_number: int | None # None if the error has no line, like at the end of the code.
+    message: str
+    expected: str = None
+    found: str = None
+
+    def __str__(self) -> str:
+        where = "End of code" if self.line_number is None else f"Line {self.line_number}"
+        return f"{where}: {self.message}"
+
+
+    @staticmethod
+    def order(diagnostic: "Diagnostic") -> int | float:
+        """Returns: the sort key of a diagnostic, its line, the errors
+        without a line go last."""
+        return float("inf") if diagnostic.line_number is None else diagnostic.line_number
+
+
+def build_master_pattern() -> tuple[re.Pattern, dict[str, str]]:
+    """Compile the token types into a single alternation with named groups,
+    so the whole source can be scanned with one `finditer` pass. The groups
+    slice the code exactly like the line scanner does, words are matched as
+    IDs and resolved to keywords and data types using `RESERVED_WORDS`.
+
+    Returns:
+        tuple[re.Pattern, dict[str, str]]: The compiled master pattern, and
+        the token type of each of its groups that is a token.
+    """
+    group_types = {"NUMBER": NUMBER}
+    groups = [
+        r"(?P<NEWLINE>\n)",
+        r"(?P<COMMENT>#[^\n]*)",
+        r"(?P<NUMBER>[0-9]+\.[0-9]+|\d\w*)",
+        r"(?P<WORD>[a-zA-Z_]\w*)",
+    ]
+    
+    # Operators and punctuation keep their order in TOKENS, so "==" is
+    # still a relational operator and not two assign operators.
+    for index, (token_type, pattern) in enumerate(TOKENS.items()):
+        if token_type not in (KEYWORD, DATA_TYPE, NUMBER, ID, COMMENT):
+            groups.append(f"(?P<T{index}>{pattern})")
+            group_types[f"T{index}"] = token_type
+    
+    # Anything else is a lexeme that doesn't match any type.
+    groups.append(r'(?P<MISMATCH>"[^"\n]*"|\w+|\S)')
+    return re.compile("|".join(groups)), group_types
+
+
+MASTER_PATTERN, GROUP_TYPES = build_master_pattern()
+
+
+def scan_tokens(code: str, first_line: int = 1, diagnostics: list[Diagnostic] = None, max_diagnostics: int = 100) -> Iterator[Token]:
+    """Scan the source code in a single pass over the master pattern and
+    yield its tokens, comments are skipped.
+
+    Args:
+        code (str): Source code.
+        first_line (int, optional): Line number of the first line. Defaults to 1.
+        diagnostics (list[Diagnostic], optional): If given, unrecognized
+        lexemes are skipped and added to it instead of raising an error.
+        max_diagnostics (int, optional): Stop adding diagnostics when the
+        list has that many. Defaults to 100.
+
+    Raises:
+        SyntaxError: If there is a lexeme not matched with any token
+        regex, raise a syntax error to inform the user with the error
+        in details.
+
+    Yields:
+        Token: The next token in the code.
+    """
+    line_number = first_line
+    
+    for match in MASTER_PATTERN.finditer(code):
+        group = match.lastgroup
+        
+        if group == "WORD":
+            lexeme = match.group()
+            yield Token(lexeme, RESERVED_WORDS.get(lexeme, ID), line_number)
+        elif group == "NEWLINE":
+            line_number += 1
+        elif group == "MISMATCH":
+            # Found a lexeme that doesn't match with any type.
+            message = f"⚠️  Lexical Error, unrecognized token: <{match.group()}>! Please follow the language rules."
+            if diagnostics is None: raise SyntaxError(message)
+            
+            if len(diagnostics) < max_diagnostics:
+                diagnostics.append(Diagnostic(line_number, message, found=match.group()))
+        elif group != "COMMENT":
+            yield Token(match.group(), GROUP_TYPES[group], line_number)
+
+
+def iter_tokens(source: TextIO | BinaryIO, chunk_size: int = 1 << 20) -> Iterator[Token]:
+    """Read the source code chunk by chunk from a file object or an mmap
+    and yield its tokens. Chunks are cut at the last new line because no
+    token spans lines, so only one chunk is in memory at a time.
+
+    Args:
+        source (TextIO | BinaryIO): Anything with a `read(size)` method,
+        bytes are decoded as UTF-8.
+        chunk_size (int, optional): Size of each read. Defaults to 1 MiB.
+
+    Raises:
+        SyntaxError: If there is a lexeme not matched with any token regex.
+
+    Yields:
+        Token: The next token in the code.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    line_number = 1
+    pending = ""
+    
+    while True:
+        data = source.read(chunk_size)
+        text = pending + (decoder.decode(data, final=not data) if isinstance(data, bytes) else data)
+        
+        if not data:
+            # The rest of the code after the last new line.
+            yield from scan_tokens(text, line_number)
+            return
+        
+        # Keep the unfinished last line for the next chunk.
+        cut = text.rfind("\n") + 1
+        pending = text[cut:]
+        
+        if cut:
+            yield from scan_tokens(text[:cut], line_number)
+            line_number += text.count("\n", 0, cut)
+
+
+class TokenStream:
+    def __init__(self, source: TextIO | BinaryIO, chunk_size: int = 1 << 20) -> None:
+        """Wrap a seekable file object or mmap, so its tokens can be iterated
+        more than once without keeping them in memory. Each iteration scans
+        the source again from the start.
+
+        Args:
+            source (TextIO | BinaryIO): Seekable file object or mmap.
+            chunk_size (int, optional): Size of each read. Defaults to 1 MiB.
+        """
+        self.source: TextIO | BinaryIO = source
+        self.chunk_size: int = chunk_size
+
+
+    def __iter__(self) -> Iterator[Token]:
+        self.source.seek(0)
+        return iter_tokens(self.source, self.chunk_size)
+
+
 class Lexer:
-    def __init__(self, code: str) -> None:
+    def __init__(self, code: str, single_pass: bool = True, diagnostics: list[Diagnostic] = None, max_diagnostics: int = 100) -> None:
         """Initialize the Lexer with the source code, and
         then loop over it.
 
         Args:
             code (str): Source code.
+            single_pass (bool, optional): Scan the code with the master
+            pattern instead of matching each lexeme line by line. Defaults to True.
+            diagnostics (list[Diagnostic], optional): If given, unrecognized
+            lexemes are skipped and added to it instead of raising an error.
+            max_diagnostics (int, optional): Stop adding diagnostics when the
+            list has that many. Defaults to 100.
         """
-        # Split the source code into lines.
-        self.code: list[str] = code.split("\n")
+        self.code: str = code
+        self.single_pass: bool = single_pass
+        self.diagnostics: list[Diagnostic] = diagnostics
+        self.max_diagnostics: int = max_diagnostics
         self.tokens: list[Token] = []
         self.check_tokens()
         
 
     def check_tokens(self) -> None:
+        """Get the token type for each lexeme in the source code. Also, it
+        handles the error when there is a lexeme doesn't match any type.
+
+        Raises:
+            SyntaxError: If there is a lexeme not matched with any token
+            regex, raise a syntax error to inform the user with the error
+            in details.
+        """
+        if self.single_pass:
+            # A single run of the master pattern over the code.
+            self.tokens.extend(scan_tokens(self.code, diagnostics=self.diagnostics, max_diagnostics=self.max_diagnostics))
+        else:
+            self.check_tokens_by_line()
+
+
+    def check_tokens_by_line(self) -> None:
         """Loop over the splitted source code and get the token type for
-        each lexeme. Also, it handles the error when there is a lexeme
-        doesn't match any type.
+        each lexeme by trying the token regexes one by one.
 
         Raises:
             SyntaxError: If there is a lexeme not matched with any token
             regex, raise a syntax error to inform the user with the error
             in details.
         """
-        for line_number, line in enumerate(self.code, start=1):
+        # Split the source code into lines.
+        for line_number, line in enumerate(self.code.split("\n"), start=1):
             # Split single line to lexemes using a regex for more effeciency.
             code_slices = re.findall(r'(?:"[^"]*"|#[^\n]*|[0-9]+\.[0-9]+|\w+|<=|>=|==|!=|\S)', line)
             
@@ -52,7 +229,11 @@ class Lexer:
                     
                 if not match:
                     # Found a lexeme that doesn't match with any type.
-                    raise SyntaxError(f"⚠️  Lexical Error, unrecognized token: <{slice}>! Please follow the language rules.")
+                    message = f"⚠️  Lexical Error, unrecognized token: <{slice}>! Please follow the language rules."
+                    if self.diagnostics is None: raise SyntaxError(message)
+                    
+                    if len(self.diagnostics) < self.max_diagnostics:
+                        self.diagnostics.append(Diagnostic(line_number, message, found=slice))
     
     
     def get_tokens(self) -> list[Token]:
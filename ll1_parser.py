@@ -0,0 +1,377 @@
+import os
+import tokens
+from functools import lru_cache
+from lexer import Diagnostic, Token
+from simple_parser import ARTH_EXPR, ASSIGN_STMT, DEC_STMT, END_OF_CODE, IF_STMT, PRINT_STMT, REL_EXPR, STMT_LIST, TERM, ParsingTreeNode, Parser, TreeBuilder
+from token_buffer import KIND_TYPES, WORD_KINDS, TokenBuffer
+from tokens import EOF, KEYWORD, LEFT_BRACE, RESERVED_WORDS, RIGHT_BRACE
+from typing import Iterable
+
+GRAMMAR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grammar.txt")
+
+# The terminal of the end of the code in the FOLLOW sets.
+END = "$"
+
+# The parsing tree node of each non terminal, the others are transparent,
+# their children are added to the node above them. Like the list of
+# `arth_expr` that is flat under its `expr` node.
+NODE_KINDS = {
+    "program": STMT_LIST, "dec_stmt": DEC_STMT, "assign_stmt": ASSIGN_STMT, "print_stmt": PRINT_STMT,
+    "if_stmt": IF_STMT, "rel_expr": REL_EXPR, "expr": ARTH_EXPR, "term": TERM,
+}
+
+# The errors of the non terminals that have no fallback alternative.
+UNEXPECTED_TOKEN = "⚠️  Syntax Error in <{lexeme}>! Unexpected token <{token_type}>"
+ERRORS = {
+    "stmt_list": (UNEXPECTED_TOKEN, "statement"),
+    "stmt": (UNEXPECTED_TOKEN, "statement"),
+    "term": ("⚠️  Syntax Error in <{lexeme}>! Not a valid expression!", "expression"),
+}
+
+# Pushed on the stack above the symbols of a node, popping it closes the node.
+CLOSE_NODE = -1
+
+
+def load_grammar(path: str = GRAMMAR_PATH) -> dict[str, list[list[str]]]:
+    """Read the productions of the grammar file, each one is a line like
+    `stmt -> dec_stmt | assign_stmt`, and ε is the empty alternative.
+    
+    Args:
+        path (str, optional): The grammar file. Defaults to grammar.txt.
+    
+    Returns:
+        dict[str, list[list[str]]]: The alternatives of each non terminal,
+        the first one is the start symbol.
+    """
+    grammar = {}
+    
+    with open(path, "r") as file:
+        for line in file:
+            if "->" not in line: continue
+            head, body = line.split("->")
+            grammar[head.strip()] = [[symbol for symbol in alternative.split() if symbol != "ε"] for alternative in body.split("|")]
+    
+    return grammar
+
+
+def terminal_token(terminal: str) -> tuple[str, str]:
+    """Get the tokens a grammar terminal matches. It's named after its
+    token type in tokens.py, like `SEMICOLON`, or after its keyword, like
+    `PRINT` for the `print` keyword.
+    
+    Args:
+        terminal (str): The terminal name.
+    
+    Raises:
+        ValueError: If the terminal is neither a token type nor a keyword.
+    
+    Returns:
+        tuple[str, str]: The token type, and the keyword lexeme or None.
+    """
+    token_type = getattr(tokens, terminal, None)
+    if isinstance(token_type, str): return token_type, None
+    
+    if RESERVED_WORDS.get(terminal.lower()) == KEYWORD: return KEYWORD, terminal.lower()
+    raise ValueError(f"Unknown terminal <{terminal}> in the grammar")
+
+
+class ParseTable:
+    def __init__(self, grammar: dict[str, list[list[str]]]):
+        """Compute the FIRST and FOLLOW sets of the grammar, and the
+        predictive parse table out of them. Symbols are numbered, the
+        terminals are 0 to T - 1 and the non terminals come after them, so
+        the parser stack only holds ints.
+        
+        Args:
+            grammar (dict[str, list[list[str]]]): The productions, the
+            first non terminal is the start symbol.
+        
+        Raises:
+            ValueError: If the grammar isn't LL(1), or has unknown terminals.
+        """
+        self.grammar: dict[str, list[list[str]]] = grammar
+        self.nonterminals: list[str] = list(grammar)
+        self.terminals: list[str] = sorted({symbol for alternatives in grammar.values() for alternative in alternatives
+                                            for symbol in alternative if symbol not in grammar}) + [END]
+        self.symbols: dict[str, int] = {symbol: index for index, symbol in enumerate(self.terminals + self.nonterminals)}
+        self.first: dict[str, set[str]] = self.compute_first()
+        self.follow: dict[str, set[str]] = self.compute_follow()
+        
+        # The token type of each terminal, the match errors show it, and
+        # the kind of each token type and keyword. The tokens no terminal
+        # matches have their own kind after the terminals.
+        self.unknown_kind: int = len(self.terminals)
+        self.token_types: list[str] = []
+        self.token_kinds: dict[str, int] = {EOF: self.symbols[END]}
+        self.keyword_kinds: dict[str, int] = {}
+        
+        for kind, terminal in enumerate(self.terminals[:-1]):
+            token_type, keyword = terminal_token(terminal)
+            self.token_types.append(token_type)
+            
+            if keyword is None:
+                self.token_kinds[token_type] = kind
+            else:
+                self.keyword_kinds[keyword] = kind
+        
+        self.token_types.append(EOF)
+        
+        # The rows are indexed by the symbol, the terminals have none.
+        self.rows: list[list[tuple[int, tuple[int, ...]]]] = [None] * len(self.terminals) + [self.build_row(nonterminal) for nonterminal in self.nonterminals]
+
+
+    def buffer_kinds(self, buffer: TokenBuffer) -> bytes:
+        """Returns: the terminal kind of each token in a buffer, and the end
+        of the code after them, translated from the buffer kinds at once."""
+        words = {kind: word for word, kind in WORD_KINDS.items()}
+        translation = bytearray([self.unknown_kind]) * 256
+        
+        for kind, token_type in enumerate(KIND_TYPES):
+            if token_type == KEYWORD:
+                translation[kind] = self.keyword_kinds.get(words.get(kind), self.unknown_kind)
+            else:
+                translation[kind] = self.token_kinds.get(token_type, self.unknown_kind)
+        
+        return bytes(buffer.kinds).translate(translation) + bytes([self.symbols[END]])
+
+
+    def first_of(self, symbols: list[str]) -> set[str]:
+        """Returns: the FIRST set of a sequence of symbols, with ε if all
+        of them can be empty."""
+        first = set()
+        
+        for symbol in symbols:
+            symbol_first = self.first[symbol] if symbol in self.grammar else {symbol}
+            first |= symbol_first - {"ε"}
+            if "ε" not in symbol_first: return first
+        
+        return first | {"ε"}
+
+
+    def compute_first(self) -> dict[str, set[str]]:
+        """Returns: the FIRST set of each non terminal, the sets grow until
+        none of them changes."""
+        self.first = {nonterminal: set() for nonterminal in self.nonterminals}
+        changed = True
+        
+        while changed:
+            changed = False
+            
+            for nonterminal, alternatives in self.grammar.items():
+                for alternative in alternatives:
+                    first = self.first_of(alternative)
+                    
+                    if not first <= self.first[nonterminal]:
+                        self.first[nonterminal] |= first
+                        changed = True
+        
+        return self.first
+
+
+    def compute_follow(self) -> dict[str, set[str]]:
+        """Returns: the FOLLOW set of each non terminal, the end of the code
+        follows the start symbol."""
+        follow = {nonterminal: set() for nonterminal in self.nonterminals}
+        follow[self.nonterminals[0]].add(END)
+        changed = True
+        
+        while changed:
+            changed = False
+            
+            for nonterminal, alternatives in self.grammar.items():
+                for alternative in alternatives:
+                    for index, symbol in enumerate(alternative):
+                        if symbol not in self.grammar: continue
+                        
+                        # What can come after the symbol, and what follows the
+                        # non terminal if the rest can be empty.
+                        rest = self.first_of(alternative[index + 1:])
+                        new = rest - {"ε"}
+                        if "ε" in rest: new |= follow[nonterminal]
+                        
+                        if not new <= follow[symbol]:
+                            follow[symbol] |= new
+                            changed = True
+        
+        return follow
+
+
+    def build_row(self, nonterminal: str) -> list[tuple[int, tuple[int, ...]]]:
+        """Build the table row of a non terminal, it has the node kind and
+        the stack symbols of the alternative to expand for each terminal kind.
+        
+        The alternative is picked by its FIRST set, or by the FOLLOW set if
+        it can be empty. A non terminal without an error in `ERRORS` expands
+        its last alternative for the other terminals, like the `else` of a
+        hand written parser, so the terminal it expects reports the error.
+        
+        Args:
+            nonterminal (str): The non terminal.
+        
+        Raises:
+            ValueError: If two alternatives start with the same terminal.
+        
+        Returns:
+            list[tuple[int, tuple[int, ...]]]: The node kind and the stack
+            symbols of each terminal kind, or None for the errors.
+        """
+        alternatives = self.grammar[nonterminal]
+        fallback = None if nonterminal in ERRORS else self.entry(nonterminal, alternatives[-1])
+        row = [fallback] * (len(self.terminals) + 1)
+        picked = [None] * len(self.terminals)
+        
+        for alternative in alternatives:
+            first = self.first_of(alternative)
+            if "ε" in first: first = (first - {"ε"}) | self.follow[nonterminal]
+            
+            for terminal in first:
+                kind = self.symbols[terminal]
+                
+                if picked[kind] is not None:
+                    raise ValueError(f"The grammar isn't LL(1), <{nonterminal}> has two alternatives for <{terminal}>: "
+                                     f"{' '.join(picked[kind]) or 'ε'} | {' '.join(alternative) or 'ε'}")
+                
+                picked[kind] = alternative
+                row[kind] = self.entry(nonterminal, alternative)
+        
+        return row
+
+
+    def entry(self, nonterminal: str, alternative: list[str]) -> tuple[int, tuple[int, ...]]:
+        """Returns: the node kind of the non terminal or None, and the
+        symbols pushed to expand an alternative. They are reversed so the
+        first one is popped first, under a CLOSE_NODE if there is a node."""
+        symbols = tuple(self.symbols[symbol] for symbol in reversed(alternative))
+        if nonterminal not in NODE_KINDS: return None, symbols
+        return NODE_KINDS[nonterminal], (CLOSE_NODE,) + symbols
+
+
+@lru_cache(maxsize=None)
+def load_table(path: str = GRAMMAR_PATH) -> ParseTable:
+    """Returns: the parse table of a grammar file, built once."""
+    return ParseTable(load_grammar(path))
+
+
+class LL1Parser(Parser):
+    def __init__(self, tokens: Iterable[Token], builder: TreeBuilder = None, diagnostics: list[Diagnostic] = None, max_diagnostics: int = 100,
+                 table: ParseTable = None):
+        """Initialize a table driven parser, it builds the same parsing tree
+        as `Parser` with a loop over an explicit stack instead of a method per
+        production, so deeply nested code doesn't hit the recursion limit.
+        The braces are only counted for the recovery when there is an error.
+        Statements are still parsed one at a time, so `iter_stmts` and the
+        error recovery work the same.
+        
+        Args:
+            tokens (Iterable[Token]): The tokens of the code.
+            builder (TreeBuilder, optional): Where the parsing tree nodes
+            are stored. Defaults to ParsingTreeNode objects.
+            diagnostics (list[Diagnostic], optional): If given, the parser
+            recovers from syntax errors instead of raising them.
+            max_diagnostics (int, optional): Stop parsing when the
+            diagnostics list has that many. Defaults to 100.
+            table (ParseTable, optional): Defaults to the table of grammar.txt.
+        """
+        self.table: ParseTable = table if table is not None else load_table()
+        
+        # The kinds of a token buffer are translated once, so the driver
+        # reads an int instead of looking up the token type. The leaves still
+        # need Token objects, so parsing a buffer is slower than a list.
+        self.kinds: bytes = self.table.buffer_kinds(tokens) if isinstance(tokens, TokenBuffer) else None
+        self.terminal_count: int = len(self.table.terminals)
+        self.stmt: int = self.table.symbols["stmt"]
+        super().__init__(tokens, builder, diagnostics, max_diagnostics)
+
+
+    def token_kind(self, token: Token) -> int:
+        """Returns: the terminal kind of a token, or the unknown kind."""
+        if token.token_type == KEYWORD: return self.table.keyword_kinds.get(token.lexeme, self.table.unknown_kind)
+        return self.table.token_kinds.get(token.token_type, self.table.unknown_kind)
+
+
+    def table_error(self, symbol: int, stack: list[int]) -> SyntaxError:
+        """Get the error of a symbol that can't start with the current token,
+        it's a terminal or a non terminal from `ERRORS`.
+        
+        The braces the statement opened are the closing braces still on the
+        stack without their opening brace, the recovery skips them.
+        
+        Args:
+            symbol (int): The symbol popped from the stack.
+            stack (list[int]): The symbols under it.
+        
+        Returns:
+            SyntaxError: The error to raise.
+        """
+        token = self.current_token
+        left_brace, right_brace = self.table.token_kinds.get(LEFT_BRACE), self.table.token_kinds.get(RIGHT_BRACE)
+        self.open_braces += stack.count(right_brace) + (symbol == right_brace) - stack.count(left_brace) - (symbol == left_brace)
+        
+        if symbol < self.terminal_count:
+            return self.syntax_error(f"⚠️  Syntax Error in <{token.lexeme}>! Expected <{self.table.token_types[symbol]}> but found <{token.token_type}>",
+                                     expected=self.table.token_types[symbol])
+        
+        message, expected = ERRORS[self.table.nonterminals[symbol - self.terminal_count]]
+        return self.syntax_error(message.format(lexeme=token.lexeme, token_type=token.token_type), expected=expected)
+
+
+    def validate_stmt(self) -> ParsingTreeNode:
+        """Parse a single statement by expanding the `stmt` non terminal
+        with the parse table until the stack is empty.
+        
+        Raises:
+            SyntaxError: If the current token doesn't fit the grammar.
+        
+        Returns:
+            ParsingTreeNode: The statement node.
+        """
+        table = self.table
+        rows, terminal_count = table.rows, self.terminal_count
+        token_kinds, keyword_kinds, unknown_kind = table.token_kinds, table.keyword_kinds, table.unknown_kind
+        new_node, add_child, leaf, tokens, kinds = self.new_node, self.add_child, self.builder.leaf, self.tokens, self.kinds
+        stack, parents = [self.stmt], []
+        root = None
+        token = self.current_token
+        kind = self.token_kind(token)
+        
+        while stack:
+            symbol = stack.pop()
+            
+            if symbol >= terminal_count:
+                entry = rows[symbol][kind]
+                if entry is None: raise self.table_error(symbol, stack)
+                
+                node_kind, symbols = entry
+                
+                if node_kind is not None:
+                    node = new_node(node_kind)
+                    
+                    if parents:
+                        add_child(parents[-1], node)
+                    else:
+                        root = node
+                    
+                    parents.append(node)
+                
+                stack.extend(symbols)
+            elif symbol == CLOSE_NODE:
+                parents.pop()
+            else:
+                if symbol != kind: raise self.table_error(symbol, stack)
+                
+                add_child(parents[-1], leaf(token))
+                
+                # Inlined `advance`, it runs for every token.
+                self.token_index += 1
+                token = self.current_token = next(tokens, END_OF_CODE)
+                
+                if kinds is not None:
+                    kind = kinds[self.token_index]
+                else:
+                    kind = keyword_kinds.get(token.lexeme, unknown_kind) if token.token_type == KEYWORD else token_kinds.get(token.token_type, unknown_kind)
+        
+        return root
+
+
+# The parsers by their names, they build the same parsing tree.
+PARSERS = {"recursive": Parser, "ll1": LL1Parser}
@@ -1,8 +1,16 @@
-from lexer import Lexer, Token
-from simple_parser import Parser, ParsingTreeNode
+import argparse
+import sys
+from contextlib import nullcontext
+from functools import lru_cache
+from instrumentation import NO_STATS, Stats, count_nodes
+from lexer import Diagnostic, Lexer, Token, TokenStream, scan_tokens
+from ll1_parser import PARSERS
+from simple_parser import ParsingTreeNode
+from row_writers import DIAGNOSTIC_FIELDS, ROW_WRITERS, SYMBOL_FIELDS, TOKEN_FIELDS, RowWriter, diagnostic_row, symbol_row, token_row
 from symbol_table import SymbolTable, HashSymbolTable, TreeSymbolTable
+from token_buffer import TokenBuffer
 from tokens import ID
-from tabulate import tabulate
+from typing import Callable, Iterable
 
 def print_title(title: str, end: str = "\n", before: str=None):
     """Used to print output title in a nice way.
@@ -16,19 +24,21 @@ def print_title(title: str, end: str = "\n", before: str=None):
     print(f"{'=' * 10} {title} {'=' * 10}", end=end)
 
 
-def get_input_code(from_file: bool=True) -> str:
+def get_input_code(from_file: bool=True, path: str="./test.abdo") -> str:
     """ Get the input code that will be used. It can be a constant
     code string, input from user, or a text file that will be read.
     
     Args:
         from_file (bool): Flag to choose the source of input code.
+        path (str, optional): The file to read. Defaults to "./test.abdo".
         
     Returns:
         str: Source code to compile.
     """
     
     if from_file:
-        input_code = open("./test.abdo", "r").read()
+        with open(path, "r") as input_file:
+            input_code = input_file.read()
     else:
         input_code = """
         # This is a comment
@@ -45,49 +55,68 @@ def get_input_code(from_file: bool=True) -> str:
     return input_code
 
 
-def lexical_analysis(code: str) -> list[Token]:
+def lexical_analysis(code: str, stats: Stats = NO_STATS) -> list[Token]:
     """Do Lexical analysis to the input code and get tokens &
     lexemes in it.
 
     Args:
         code (str): The input code we will analyze.
+        stats (Stats, optional): Records the lexing time and counters.
 
     Returns:
         list[Token]: The list of tokens and lexemes in the code.
     """
-    lexer = Lexer(code = code)
-    tokens = lexer.get_tokens()
+    with stats.phase("lexing"):
+        lexer = Lexer(code = code)
+        tokens = lexer.get_tokens()
+    
+    stats.count("tokens", len(tokens))
+    
     return tokens
 
 
-def do_parsing(tokens: list[Token]) -> ParsingTreeNode:
+def do_parsing(tokens: list[Token], arena: bool = False, stats: Stats = NO_STATS, parser_name: str = "recursive") -> ParsingTreeNode:
     """Do parsing to the tokens list to check the grammar, and
     return the parsing tree.
 
     Args:
         tokens (list[Token]): The list of tokens in the code.
+        arena (bool, optional): Store the tree in a flat `ParseTreeArena`
+        instead of node objects. Defaults to False.
+        stats (Stats, optional): Records the parsing time and the tree size.
+        parser_name (str, optional): One of `PARSERS`. Defaults to "recursive".
 
     Returns:
         Node: Parsing tree root.
     """
-    parser = Parser(tokens=tokens)
-    parser.parse()
+    # The arena is only imported when it's used.
+    if arena: from parse_tree_arena import ParseTreeArena
+    
+    with stats.phase("parsing"):
+        parser = PARSERS[parser_name](tokens=tokens, builder=ParseTreeArena() if arena else None)
+        parser.parse()
+    
+    if stats.enabled:
+        stats.count("parse_nodes", len(parser.builder) if arena else count_nodes(parser.parsing_tree_root))
+    
     return parser.parsing_tree_root
 
 
-def get_ids_names(tokens: list[Token]) -> list[str]:
+def get_ids_names(tokens: list[Token] | TokenBuffer) -> list[str]:
     """Filter the tokens to get the ID names only.
 
     Args:
-        tokens (list[Token]): The list of tokens.
+        tokens (list[Token] | TokenBuffer): The list of tokens.
 
     Returns:
         list[str]: The ID names list with non duplicated IDs.
     """
-    id_tokens = filter(lambda x: x.token_type == ID, tokens)
-    id_names = list(map(lambda x: x.lexeme, id_tokens))
-    non_duplicated_ids = [id for i, id in enumerate(id_names) if id not in id_names[:i]]
-    return non_duplicated_ids
+    # A buffer finds its IDs by their kind without building the tokens.
+    if isinstance(tokens, TokenBuffer):
+        return list(dict.fromkeys(tokens.lexemes(ID)))
+    
+    # A dict keeps the first seen order and checks duplicates in O(1).
+    return list(dict.fromkeys(token.lexeme for token in tokens if token.token_type == ID))
 
 
 def print_tokens(tokens: list[Token]):
@@ -96,43 +125,104 @@ def print_tokens(tokens: list[Token]):
     Args:
         tokens (list[Token]): The tokens list.
     """
+    from tabulate import tabulate
     print_title(title="Lexical Analysis", before="\n")
     print(f"Total number of lexemes & tokens = {len(tokens)}\n")
     tokens_to_print = [(token.lexeme, token.token_type) for token in tokens]
     print(tabulate(tokens_to_print, headers=["Lexeme", "Token"], tablefmt="rounded_grid", stralign="center"))
 
 
-def parse_and_print_tree(tokens: list[Token]):
+# The file and the writer of each parsing tree format, the writers are
+# looked up in `tree_serializer` when a tree is written.
+TREE_FORMATS = {
+    "text": ("output_tree.txt", "w", "write_text"),
+    "binary": ("output_tree.bin", "wb", "write_binary"),
+    "json": ("output_tree.json", "w", "write_json"),
+}
+
+
+def tree_writer(tree_format: str) -> tuple[str, str, Callable]:
+    """Returns: the file, the file mode and the writer of a parsing tree format."""
+    import tree_serializer
+    path, mode, writer_name = TREE_FORMATS[tree_format]
+    return path, mode, getattr(tree_serializer, writer_name)
+
+
+def parse_and_print_tree(tokens: list[Token], parsing_tree: ParsingTreeNode = None, tree_format: str = "text", stats: Stats = NO_STATS,
+                         parser_name: str = "recursive"):
     """Takes the list of tokens in the code, parse it to check
     the syntax of the code according to the grammar, and then
     print the parsing tree.
 
     Args:
         tokens (list[Token]): The list of tokens in the code.
+        parsing_tree (ParsingTreeNode, optional): The tree if the tokens
+        are already parsed.
+        tree_format (str, optional): One of `TREE_FORMATS`. Defaults to "text".
+        stats (Stats, optional): Records the parsing and writing times.
+        parser_name (str, optional): One of `PARSERS`. Defaults to "recursive".
     """
     print_title(title="Parsing", before="\n")
-    parsing_tree = do_parsing(tokens=tokens)
+    parsing_tree = parsing_tree or do_parsing(tokens=tokens, stats=stats, parser_name=parser_name)
+    path, mode, write_tree = tree_writer(tree_format)
     
     # If there is no error in the code, this will be printed.
     print("This is a valid syntax!")
     
-    # Print parsing tree in a text file to save space in the terminal.
+    # Print parsing tree in a file to save space in the terminal.
+    print(f"For the parsing tree, see the \"{path}\" file.")
+    with stats.phase("tree_writing"), open(path, mode) as output_file:
+        write_tree(parsing_tree, output_file)
+
+
+def parse_stream_and_print_tree(tokens: Iterable[Token], stats: Stats = NO_STATS, parser_name: str = "recursive"):
+    """Parse the tokens one statement at a time and write each statement
+    to the parsing tree file once it's parsed, so the whole tree is never
+    kept in memory.
+
+    Args:
+        tokens (Iterable[Token]): The tokens in the code.
+        stats (Stats, optional): Records the time to scan, parse and write
+        the statements, and their number.
+        parser_name (str, optional): One of `PARSERS`. Defaults to "recursive".
+    """
+    print_title(title="Parsing", before="\n")
+    parser = PARSERS[parser_name](tokens=tokens)
+    statements = 0
+    
+    with stats.phase("parsing"), open("output_tree.txt", "w") as output_file:
+        output_file.write("stmt_list\n")
+        
+        for stmt in parser.iter_stmts():
+            stmt.print_tree(output_file, level=1)
+            statements += 1
+    
+    stats.count("statements", statements)
+    
+    # If there is no error in the code, this will be printed.
+    print("This is a valid syntax!")
     print("For the parsing tree, see the \"output_tree.txt\" file.")
-    with open("output_tree.txt", "w") as output_file:
-        parsing_tree.print_tree(output_file)
 
 
-def print_symbol_tables(tokens: list[Token]):
-    """Takes the list of tokens in the code and print the four
-    types of symbol table (Unordered, Ordered, Tree-Structured, Hash).
+def print_symbol_tables(tokens: Iterable[Token], symbol_table: SymbolTable = None, stats: Stats = NO_STATS):
+    """Takes the tokens in the code and print the four types of
+    symbol table (Unordered, Ordered, Tree-Structured, Hash).
 
     Args:
-        tokens (list[Token]): The list of tokens.
+        tokens (Iterable[Token]): The tokens, they are iterated once.
+        symbol_table (SymbolTable, optional): The table if it's already built.
+        stats (Stats, optional): Records the time to build each table, and
+        the tree height and the longest probe of the hash table.
     """
     
+    from tabulate import tabulate
+    
     # Form unordered and ordered symbol tables.
-    symbol_table = SymbolTable(tokens)
-    headers = ["Id", "Data Type", "Delaration Line", "Reference Lines", "Address", "Scope", "Dimension"]
+    if symbol_table is None:
+        with stats.phase("symbol_table"):
+            symbol_table = SymbolTable(tokens)
+    
+    headers = ["Id", "Data Type", "Delaration Line", "Reference Lines", "Address", "Scope", "Dimension", "Scope Id", "Depth"]
     
     # Print unordered symbol table in table form.
     print_title(title="Unordered Symbol Table", before="\n")
@@ -142,39 +232,487 @@ def print_symbol_tables(tokens: list[Token]):
     print_title(title="Ordered Symbol Table", before="\n")
     print(tabulate(symbol_table.ordered_table.values(), headers=headers, tablefmt="rounded_grid", stralign="center", numalign="center"))
     
-    # Get ids only from tokens.
-    ids = get_ids_names(tokens)
+    # Get ids from the same pass that built the table.
+    ids = symbol_table.get_ids()
     
     # Form tree symbol table and print it.
-    tree_table = TreeSymbolTable(ids=ids)
+    with stats.phase("tree_symbol_table"):
+        tree_table = TreeSymbolTable(ids=ids, entries=symbol_table.unordered_table)
+    
     print_title(title="Tree Structured Symbol Table", before="\n")
     print()
     tree_table.print_tree_table()
     
     # Form hash symbol table and print it.
     print_title(title="Hash Symbol Table", before="\n")
-    hash_table = HashSymbolTable(ids)
+    with stats.phase("hash_symbol_table"):
+        hash_table = HashSymbolTable(ids, entries=symbol_table.unordered_table)
+    
     hash_table.print_hash_table()
+    
+    if stats.enabled:
+        stats.count("symbols", len(ids))
+        stats.count("tree_table_height", tree_table.height)
+        stats.count("hash_table_max_probe_length", hash_table.max_probe_length)
+
+
+def analyze(tokens: list[Token]) -> tuple["Program", SymbolTable]:
+    """Parse the tokens and lower the parsing tree into the abstract
+    syntax tree, after folding its constants.
+
+    Args:
+        tokens (list[Token]): The list of tokens in the code.
+
+    Returns:
+        tuple[Program, SymbolTable]: The folded program, and the symbol
+        table it was lowered with.
+    """
+    # The middle end is only imported when it's used.
+    from abstract_syntax_tree import ASTBuilder, ConstantFolder
+    tree = do_parsing(tokens=tokens)
+    symbol_table = SymbolTable(tokens)
+    return ConstantFolder().fold(ASTBuilder(symbol_table).build(tree)), symbol_table
+
+
+def build_ast(tokens: list[Token]) -> "Program":
+    """Parse the tokens and lower the parsing tree into the abstract
+    syntax tree, after folding its constants.
+
+    Args:
+        tokens (list[Token]): The list of tokens in the code.
+
+    Returns:
+        Program: The folded program.
+    """
+    return analyze(tokens)[0]
+
+
+def compile_to_bytecode(code: str, reuse_slots: bool = False) -> "Bytecode":
+    """Compile the source code into bytecode for the virtual machine.
+
+    Args:
+        code (str): Source code.
+        reuse_slots (bool, optional): Lay the variables out with
+        `MemoryLayout`, so the ones never alive at once share a memory
+        cell. Defaults to False.
+
+    Returns:
+        Bytecode: The compiled program.
+    """
+    from memory_layout import MemoryLayout
+    from virtual_machine import BytecodeCompiler
+    program, symbol_table = analyze(lexical_analysis(code=code))
+    return BytecodeCompiler(MemoryLayout(symbol_table) if reuse_slots else None).compile(program)
+
+
+def run(code: str, output=print, reuse_slots: bool = False) -> "VirtualMachine":
+    """Compile the source code and execute it.
+
+    Args:
+        code (str): Source code.
+        output (optional): Called with each printed value. Defaults to print.
+        reuse_slots (bool, optional): Share the memory cells of the
+        variables never alive at once. Defaults to False.
+
+    Returns:
+        VirtualMachine: The machine after running, with the final memory.
+    """
+    from virtual_machine import VirtualMachine
+    machine = VirtualMachine(compile_to_bytecode(code, reuse_slots), output=output)
+    machine.run()
+    return machine
+
+
+def print_memory_layout(code: str):
+    """Print the slot of each variable in the frame of the program, and
+    the frame size before and after reusing the slots.
+
+    Args:
+        code (str): Source code.
+    """
+    from memory_layout import TYPE_LAYOUTS, MemoryLayout
+    from tabulate import tabulate
+    
+    try:
+        symbol_table = analyze(lexical_analysis(code=code))[1]
+    except SyntaxError as se:
+        print(se)
+        return
+    
+    layout = MemoryLayout(symbol_table)
+    rows = []
+    
+    for key, entry in symbol_table.unordered_table.items():
+        slot, lifetime = layout.slot(entry), layout.lifetimes[key]
+        rows.append((key, entry.data_type, entry.scope_id, f"{lifetime.start}-{lifetime.end}", slot.index, slot.offset, TYPE_LAYOUTS[entry.data_type].size))
+    
+    print_title(title="Memory Layout", before="\n")
+    print(tabulate(rows, headers=["Id", "Data Type", "Scope Id", "Lines Alive", "Slot", "Offset", "Size"], tablefmt="rounded_grid", stralign="center", numalign="center"))
+    
+    before, after = layout.unshared_frame_size, layout.frame_size
+    print(f"Frame size: {before} bytes with a slot for each variable, {after} bytes after reusing the slots", end="")
+    print(f" ({1 - after / before:.1%} smaller)." if before else ".")
+    print(f"Memory cells of the virtual machine: {symbol_table.address - 1 if symbol_table.address else 0} by the symbol table addresses, {len(layout.slots)} by the slots.")
+
+
+@lru_cache(maxsize=128)
+def transpile(code: str) -> "CompiledProgram":
+    """Compile the source code into a Python function, the result is
+    cached so running the same program again skips compiling.
+
+    Args:
+        code (str): Source code.
+
+    Returns:
+        CompiledProgram: Callable with the output and the initial values.
+    """
+    from python_backend import PythonTranspiler
+    return PythonTranspiler().compile(build_ast(lexical_analysis(code=code)))
+
+
+def compile_stream(path: str, stats: Stats = NO_STATS, parser_name: str = "recursive"):
+    """Compile a source file without loading it. The tokens are scanned
+    again from the file by each phase instead of being kept in a list,
+    so the memory stays flat whatever the file size is. The parsing tree
+    is written one statement at a time, in the text format.
+
+    Args:
+        path (str): The source file.
+        stats (Stats, optional): Records the time of each phase, scanning
+        is part of the phases that read the tokens.
+        parser_name (str, optional): One of `PARSERS`. Defaults to "recursive".
+    """
+    with open(path, "rb") as input_file:
+        tokens = TokenStream(input_file)
+        
+        try:
+            # Check code grammar using the parser and print the parsing tree.
+            parse_stream_and_print_tree(tokens, stats, parser_name)
+            
+            # Get symbol tables and print them.
+            print_symbol_tables(tokens, stats=stats)
+        
+        # Catch errors in the code to print them.
+        except SyntaxError as se:
+            print(se)
+
+
+def compile_cached(code: str, cache_dir: str, stats: Stats = NO_STATS, parser_name: str = "recursive", tree_format: str = "text"):
+    """Get the compile results from the cache, or compile the code and
+    cache them, then print them like an uncached compile.
+
+    Args:
+        code (str): Source code.
+        cache_dir (str): The cache directory.
+        stats (Stats, optional): Records the time to get the results, or
+        to compile them on a miss, and the cache counters.
+        parser_name (str, optional): The parser of a miss, one of `PARSERS`.
+        Defaults to "recursive".
+        tree_format (str, optional): One of `TREE_FORMATS`. Defaults to "text".
+    """
+    from compile_cache import CompileCache
+    cache = CompileCache(cache_dir)
+    
+    with stats.phase("cache"):
+        artifacts = cache.compile(code, parser_name=parser_name)
+    
+    if stats.enabled:
+        for name, value in cache.stats.items():
+            stats.count(f"cache_{name}", value)
+    
+    if artifacts.error is not None:
+        print(artifacts.error)
+    else:
+        stats.count("tokens", len(artifacts.tokens))
+        print_tokens(artifacts.tokens)
+        parse_and_print_tree(artifacts.tokens, artifacts.tree, tree_format, stats)
+        print_symbol_tables(artifacts.tokens, artifacts.symbol_table, stats)
+    
+    print(f"\nCompile cache: {cache.hits} hits, {cache.misses} misses, {cache.evictions} evictions")
 
 
-def main():
-    input_code = get_input_code()
+def print_ir(code: str, passes: list[str] = None):
+    """Print the three address code of the source code, then optimize it
+    and print it again with what each pass removed.
+    
+    Args:
+        code (str): Source code.
+        passes (list[str], optional): Names from `PASSES`. Defaults to DEFAULT_PIPELINE.
+    """
+    # The middle end is only imported when it's used.
+    from three_address_code import DEFAULT_PIPELINE, IRBuilder, optimize
     
+    try:
+        program = IRBuilder().build(build_ast(lexical_analysis(code=code)))
+    except SyntaxError as se:
+        print(se)
+        return
+    
+    before, original = len(program.instructions), program.dump()
+    
+    try:
+        reports = optimize(program, DEFAULT_PIPELINE if passes is None else passes)
+    except ValueError as ve:
+        print(f"⚠️  {ve}")
+        return
+    
+    print_title(title="Three Address Code", before="\n")
+    print(original)
+    
+    print_title(title="Optimized Three Address Code", before="\n")
+    print(program.dump())
+    
+    print_title(title="Passes", before="\n")
+    for report in reports:
+        print(f"{report.name:<20} removed {report.removed:>7} instructions, changed {report.changed:>7} in {report.seconds * 1000:8.3f} ms")
+    print(f"{before} instructions, {len(program.instructions)} after the passes.")
+
+
+def print_diagnostics(diagnostics: list[Diagnostic], max_diagnostics: int):
+    """Print all the errors found in the code ordered by their lines.
+
+    Args:
+        diagnostics (list[Diagnostic]): The errors.
+        max_diagnostics (int): The most errors the compiler reports.
+    """
+    print_title(title="Errors", before="\n")
+    
+    for diagnostic in sorted(diagnostics, key=Diagnostic.order):
+        print(diagnostic)
+    
+    stopped = " (stopped at the limit)" if len(diagnostics) >= max_diagnostics else ""
+    print(f"\nFound {len(diagnostics)} errors{stopped}.")
+
+
+def compile_with_recovery(code: str, max_diagnostics: int = 100, parser_name: str = "recursive", stats: Stats = NO_STATS,
+                          tree_format: str = "text"):
+    """Compile the code without stopping at the first error. All the
+    lexical and syntax errors are printed, with the parsing tree of the
+    valid statements.
+
+    Args:
+        code (str): Source code.
+        max_diagnostics (int, optional): Stop after that many errors. Defaults to 100.
+        parser_name (str, optional): One of `PARSERS`. Defaults to "recursive".
+        stats (Stats, optional): Records the time of each phase, and the
+        number of errors.
+        tree_format (str, optional): One of `TREE_FORMATS`. Defaults to "text".
+    """
+    diagnostics = []
+    
+    with stats.phase("lexing"):
+        tokens = Lexer(code, diagnostics=diagnostics, max_diagnostics=max_diagnostics).get_tokens()
+    
+    stats.count("tokens", len(tokens))
+    
+    with stats.phase("parsing"):
+        parser = PARSERS[parser_name](tokens, diagnostics=diagnostics, max_diagnostics=max_diagnostics)
+        parser.parse()
+    
+    stats.count("diagnostics", len(diagnostics))
+    
+    if diagnostics:
+        print_diagnostics(diagnostics, max_diagnostics)
+        path, mode, write_tree = tree_writer(tree_format)
+        
+        with stats.phase("tree_writing"), open(path, mode) as output_file:
+            write_tree(parser.parsing_tree_root, output_file)
+        
+        print(f"For the parsing tree of the valid statements, see the \"{path}\" file.")
+        return
+    
+    try:
+        print_tokens(tokens)
+        parse_and_print_tree(tokens, parser.parsing_tree_root, tree_format, stats)
+        print_symbol_tables(tokens, stats=stats)
+    except SyntaxError as se:
+        print(se)
+
+
+def compile_to_rows(code: str, writer: RowWriter, recover: bool = False, max_diagnostics: int = 100, stats: Stats = NO_STATS,
+                    parser_name: str = "recursive"):
+    """Compile the code and write its tokens, symbol table entries and
+    errors as rows. Each token is written once it's scanned, and nothing is
+    formatted as a table.
+
+    Args:
+        code (str): Source code.
+        writer (RowWriter): Writes the rows in the output format.
+        recover (bool, optional): Report all the errors instead of the
+        first one. Defaults to False.
+        max_diagnostics (int, optional): Stop after that many errors. Defaults to 100.
+        stats (Stats, optional): Records the time of each phase, the lexing
+        time includes writing the token rows.
+        parser_name (str, optional): One of `PARSERS`. Defaults to "recursive".
+    """
+    diagnostics = [] if recover else None
+    tokens = []
+    append, write_row = tokens.append, writer.row
+    writer.section("token", TOKEN_FIELDS)
+    
+    try:
+        with stats.phase("lexing"):
+            for token in scan_tokens(code, diagnostics=diagnostics, max_diagnostics=max_diagnostics):
+                append(token)
+                write_row(token_row(token))
+        
+        stats.count("tokens", len(tokens))
+        
+        with stats.phase("parsing"):
+            PARSERS[parser_name](tokens, diagnostics=diagnostics, max_diagnostics=max_diagnostics).parse()
+        
+        if not diagnostics:
+            with stats.phase("symbol_table"):
+                symbol_table = SymbolTable(tokens)
+            
+            writer.section("symbol", SYMBOL_FIELDS)
+            
+            for entry in symbol_table.unordered_table.values():
+                write_row(symbol_row(entry))
+    
+    # Without recovering, the first error is the only one and its line
+    # is in the message.
+    except SyntaxError as se:
+        diagnostics = [Diagnostic(None, str(se))]
+    
+    if diagnostics:
+        writer.section("diagnostic", DIAGNOSTIC_FIELDS)
+        
+        for diagnostic in sorted(diagnostics, key=Diagnostic.order):
+            write_row(diagnostic_row(diagnostic))
+    
+    writer.close()
+
+
+def compile_tables(input_code: str, stats: Stats = NO_STATS, parser_name: str = "recursive", tree_format: str = "text"):
+    """Compile the code and print the tokens, the parsing tree file and
+    the symbol tables, or the first error of the code.
+
+    Args:
+        input_code (str): Source code.
+        stats (Stats, optional): Records the time of each phase.
+        parser_name (str, optional): One of `PARSERS`. Defaults to "recursive".
+        tree_format (str, optional): One of `TREE_FORMATS`. Defaults to "text".
+    """
     try:
         # Get tokens in the input code, and print them in a table form.
-        tokens = lexical_analysis(code=input_code)
+        tokens = lexical_analysis(code=input_code, stats=stats)
         print_tokens(tokens)
         
         # Check code grammar using the parser and print the parsing tree.
-        parse_and_print_tree(tokens)
+        parse_and_print_tree(tokens, tree_format=tree_format, stats=stats, parser_name=parser_name)
         
         # Get symbol tables and print them.
-        print_symbol_tables(tokens)
+        print_symbol_tables(tokens, stats=stats)
     
     # Catch errors in the code to print them.
     except SyntaxError as se:
         print(se)
 
 
+def parse_arguments(argv: list[str] = None) -> argparse.Namespace:
+    """Parse the command line arguments, without a command the test
+    program is compiled.
+
+    Args:
+        argv (list[str], optional): The arguments. Defaults to `sys.argv`.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Simple compiler for .abdo programs.")
+    parser.set_defaults(command="compile", path="./test.abdo", stream=False, cache_dir=None, recover=False, max_errors=100, tree_format="text", format="table", output=None, stats=None, parser="recursive")
+    commands = parser.add_subparsers(dest="command")
+    
+    compile_parser = commands.add_parser("compile", help="Analyze a program and print the results.")
+    compile_parser.add_argument("path", nargs="?", default="./test.abdo", help="The source file.")
+    compile_parser.add_argument("--stream", action="store_true", help="Scan the file lazily for sources larger than memory.")
+    compile_parser.add_argument("--cache-dir", help="Reuse the results of unchanged sources from this directory.")
+    compile_parser.add_argument("--recover", action="store_true", help="Report all the syntax errors instead of the first one.")
+    compile_parser.add_argument("--max-errors", type=int, default=100, help="Stop after that many errors with --recover.")
+    compile_parser.add_argument("--tree-format", choices=TREE_FORMATS, default="text", help="The format of the parsing tree file.")
+    compile_parser.add_argument("--format", choices=["table", *ROW_WRITERS], default="table", help="Print tables for humans, or stream the tokens, symbols and errors as rows.")
+    compile_parser.add_argument("--output", help="Write the rows to this file instead of the standard output.")
+    compile_parser.add_argument("--stats", nargs="?", const="text", choices=["text", "json"], help="Print the time and counters of each phase.")
+    compile_parser.add_argument("--parser", choices=PARSERS, default="recursive", help="The recursive descent parser, or the LL(1) table driven one for deeply nested code.")
+    
+    ir_parser = commands.add_parser("ir", help="Print the three address code of a program before and after the optimization passes.")
+    ir_parser.add_argument("path", nargs="?", default="./test.abdo", help="The source file.")
+    ir_parser.add_argument("--passes", nargs="*", default=None, help="The passes to run in order. Defaults to all of them.")
+    
+    run_parser = commands.add_parser("run", help="Compile a program to bytecode and execute it.")
+    run_parser.add_argument("path", nargs="?", default="./test.abdo", help="The source file.")
+    run_parser.add_argument("--reuse-slots", action="store_true", help="Share the memory cells of the variables never alive at once.")
+    
+    layout_parser = commands.add_parser("layout", help="Print the memory layout of the variables and the frame size.")
+    layout_parser.add_argument("path", nargs="?", default="./test.abdo", help="The source file.")
+    
+    batch_parser = commands.add_parser("batch", help="Check many programs in parallel and print one report.")
+    batch_parser.add_argument("paths", nargs="+", help="Source files, directories or glob patterns.")
+    batch_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes. Defaults to the number of CPUs.")
+    batch_parser.add_argument("--chunksize", type=int, default=16, help="Files sent to a worker at once.")
+    batch_parser.add_argument("--cache-dir", help="Compile cache directory shared by the workers.")
+    
+    arguments = parser.parse_args(argv)
+    
+    # The compile options each path doesn't support, the streamed tree is
+    # written one statement at a time so only as text, and the rows have
+    # no tree and aren't cached.
+    used = {"--stream": arguments.stream, "--cache-dir": arguments.command == "compile" and arguments.cache_dir is not None,
+            "--recover": arguments.recover, "--format": arguments.format != "table", "--tree-format": arguments.tree_format != "text"}
+    
+    for option, other in [("--stream", "--cache-dir"), ("--stream", "--recover"), ("--stream", "--format"), ("--stream", "--tree-format"),
+                          ("--cache-dir", "--recover"), ("--cache-dir", "--format"), ("--format", "--tree-format")]:
+        if used[option] and used[other]: parser.error(f"{option} can't be used with {other}")
+    
+    return arguments
+
+
+def main(argv: list[str] = None):
+    arguments = parse_arguments(argv)
+    
+    if arguments.command == "batch":
+        # The process pool is slow to import, and only used here.
+        from batch import collect_files, compile_batch
+        compile_batch(collect_files(arguments.paths), arguments.workers, arguments.chunksize, arguments.cache_dir).print_report()
+        return
+    
+    if arguments.command == "ir":
+        print_ir(get_input_code(path=arguments.path), arguments.passes)
+        return
+    
+    if arguments.command == "layout":
+        print_memory_layout(get_input_code(path=arguments.path))
+        return
+    
+    if arguments.command == "run":
+        try:
+            run(get_input_code(path=arguments.path), reuse_slots=arguments.reuse_slots)
+        except SyntaxError as se:
+            print(se)
+        except ZeroDivisionError:
+            print("⚠️  Runtime Error, division by zero!")
+        except OverflowError:
+            print("⚠️  Runtime Error, a value doesn't fit in its data type!")
+        return
+    
+    stats = Stats() if arguments.stats else NO_STATS
+    
+    if arguments.stream:
+        compile_stream(arguments.path, stats, arguments.parser)
+    elif arguments.format != "table":
+        with open(arguments.output, "w", newline="") if arguments.output else nullcontext(sys.stdout) as output_file:
+            compile_to_rows(get_input_code(path=arguments.path), ROW_WRITERS[arguments.format](output_file), arguments.recover, arguments.max_errors,
+                            stats, arguments.parser)
+    elif arguments.cache_dir:
+        compile_cached(get_input_code(path=arguments.path), arguments.cache_dir, stats, arguments.parser, arguments.tree_format)
+    elif arguments.recover:
+        compile_with_recovery(get_input_code(path=arguments.path), arguments.max_errors, arguments.parser, stats, arguments.tree_format)
+    else:
+        compile_tables(get_input_code(path=arguments.path), stats, arguments.parser, arguments.tree_format)
+    
+    if arguments.stats: stats.print_report(as_json=arguments.stats == "json")
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,169 @@
+import heapq
+from abstract_syntax_tree import FLOAT, INT
+from dataclasses import dataclass, field
+from symbol_table import Scope, SymbolTable, SymbolTableEntry
+
+
+@dataclass(frozen=True)
+class TypeLayout:
+    """Used to save the storage of a data type, in bytes."""
+    size: int
+    alignment: int
+
+
+# Ints are 32 bits, and floats are doubles like the Python floats the runtime keeps.
+TYPE_LAYOUTS = {INT: TypeLayout(4, 4), FLOAT: TypeLayout(8, 8)}
+
+
+@dataclass
+class Lifetime:
+    """Used to save the lines a variable holds a value in, from its
+    declaration to its last reference. The program has no loops, so the
+    value is never read after its last reference."""
+    start: int
+    end: int
+
+
+@dataclass
+class Slot:
+    """Used to save a piece of the frame, and the variables it holds."""
+    index: int
+    size: int
+    alignment: int
+    offset: int = 0
+    variables: list[str] = field(default_factory=list)
+
+
+class MemoryLayout:
+    def __init__(self, symbol_table: SymbolTable, reuse: bool = True):
+        """Give each variable of the symbol table a slot in the frame of
+        the program, sized and aligned for its data type. Like register
+        allocation, the variables are scanned in the order their lifetimes
+        start, and a variable reuses a slot when none of the variables in
+        it is still alive. A slot is also reused by variables of sibling
+        blocks, as only one block is left before the other is entered,
+        even when their lifetimes share a line.
+        
+        The slots are then laid out by alignment, the larger first, so the
+        frame needs no padding between them.
+        
+        Args:
+            symbol_table (SymbolTable): The symbol table of the program,
+            its scopes must not be released.
+            reuse (bool, optional): Share the slots, instead of a slot for
+            each variable. Defaults to True.
+        
+        Raises:
+            ValueError: If the scopes of the symbol table were released.
+        """
+        if symbol_table.release_scopes:
+            raise ValueError("The memory layout needs the scopes, build the symbol table without releasing them")
+        
+        self.scopes: list[Scope] = symbol_table.scopes
+        self.entries: dict[str, SymbolTableEntry] = symbol_table.unordered_table
+        self.lifetimes: dict[str, Lifetime] = {
+            key: Lifetime(entry.declaration_line, max(entry.reference_lines, default=entry.declaration_line))
+            for key, entry in self.entries.items()
+        }
+        self.slots: list[Slot] = []
+        self.assignment: dict[str, Slot] = {}
+        self.allocate(reuse)
+        self.frame_size: int = self.place(self.slots)
+
+
+    def allocate(self, reuse: bool):
+        """Give the variables their slots, the best fitting free one, else
+        the best fitting one holding only variables of sibling blocks, else
+        a new one."""
+        # The variables alive in each slot, when their lifetimes end, and
+        # the slots without any.
+        alive: dict[int, list[str]] = {}
+        ending: list[tuple[int, int, str]] = []
+        free: list[Slot] = []
+        order = sorted(self.entries, key=lambda key: self.lifetimes[key].start) # The sort is stable, so it keeps the declaration order.
+        
+        for key in order:
+            lifetime, layout = self.lifetimes[key], TYPE_LAYOUTS[self.entries[key].data_type]
+            
+            # Free the variables whose values are never read again.
+            while ending and ending[0][0] < lifetime.start:
+                _, index, ended = heapq.heappop(ending)
+                alive[index].remove(ended)
+                if not alive[index]: free.append(self.slots[index])
+            
+            slot = None
+            
+            if reuse:
+                fits = lambda slot: slot.size >= layout.size and slot.alignment >= layout.alignment
+                slot = min(filter(fits, free), key=lambda slot: slot.size, default=None)
+                
+                if slot is None:
+                    siblings = [slot for slot in self.slots if fits(slot) and all(self.disjoint(key, other) for other in alive[slot.index])]
+                    slot = min(siblings, key=lambda slot: slot.size, default=None)
+            
+            if slot is None:
+                slot = Slot(len(self.slots), layout.size, layout.alignment)
+                self.slots.append(slot)
+                alive[slot.index] = []
+            elif not alive[slot.index]:
+                free.remove(slot)
+            
+            slot.variables.append(key)
+            self.assignment[key] = slot
+            alive[slot.index].append(key)
+            heapq.heappush(ending, (lifetime.end, slot.index, key))
+
+
+    def disjoint(self, key: str, other: str) -> bool:
+        """Returns: whether the variables are declared in sibling blocks,
+        or blocks inside them, so they are never alive at once."""
+        scope, other_scope = self.scopes[self.entries[key].scope_id], self.scopes[self.entries[other].scope_id]
+        
+        # Go up from the deeper scope, it's inside the other one if it meets it.
+        while scope.depth > other_scope.depth: scope = scope.parent
+        while other_scope.depth > scope.depth: other_scope = other_scope.parent
+        
+        return scope is not other_scope
+
+
+    @staticmethod
+    def place(slots: list[Slot]) -> int:
+        """Give the slots their offsets, by alignment then index.
+        
+        Returns:
+            int: The frame size, a multiple of the largest alignment.
+        """
+        offset = alignment = 0
+        
+        for slot in sorted(slots, key=lambda slot: (-slot.alignment, slot.index)):
+            offset += -offset % slot.alignment
+            slot.offset = offset
+            offset += slot.size
+            alignment = max(alignment, slot.alignment)
+        
+        return offset + (-offset % alignment if alignment else 0)
+
+
+    @property
+    def unshared_frame_size(self) -> int:
+        """Returns: the frame size with a slot for each variable, in the
+        order they are declared, like the symbol table addresses them."""
+        offset = alignment = 0
+        
+        for entry in self.entries.values():
+            layout = TYPE_LAYOUTS[entry.data_type]
+            offset += -offset % layout.alignment + layout.size
+            alignment = max(alignment, layout.alignment)
+        
+        return offset + (-offset % alignment if alignment else 0)
+
+
+    def slot(self, entry: SymbolTableEntry) -> Slot:
+        """Returns: the slot of a variable."""
+        return self.assignment[entry.key]
+
+
+    def shared(self, entry: SymbolTableEntry) -> bool:
+        """Returns: whether other variables use the slot of the variable,
+        so its value isn't zero before its declaration stores one."""
+        return len(self.assignment[entry.key].variables) > 1
@@ -0,0 +1,180 @@
+import os
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from lexer import Diagnostic
+from multiprocessing.shared_memory import SharedMemory
+from token_buffer import TokenBuffer, offset_typecode
+
+# Below this many characters, starting the processes and joining the
+# chunks costs more than lexing on one core, see bench_parallel_lexer.
+PARALLEL_THRESHOLD = 1 << 20
+
+# Chunks per worker, so a slow chunk doesn't keep the others waiting.
+CHUNKS_PER_WORKER = 4
+
+
+@dataclass
+class Chunk:
+    """Used to save where a chunk of lines is in the shared source."""
+    byte_start: int
+    byte_end: int
+    char_start: int # The offset of the chunk in the source string.
+    first_line: int
+
+
+@dataclass
+class ChunkTokens:
+    """Used to send the columns of a lexed chunk back, they pickle as
+    plain bytes."""
+    kinds: array
+    starts: array
+    ends: array
+    lines: array
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+    error: str = None
+
+
+def split_lines(code: str, count: int) -> list[tuple[int, int]]:
+    """Split the code into about `count` chunks of whole lines, no token
+    spans lines, so each chunk can be lexed alone.
+    
+    Args:
+        code (str): Source code.
+        count (int): The number of chunks.
+    
+    Returns:
+        list[tuple[int, int]]: The start and end of each chunk.
+    """
+    size = max(1, len(code) // count)
+    ranges, start = [], 0
+    
+    while start < len(code):
+        end = code.find("\n", start + size) + 1 or len(code)
+        ranges.append((start, end))
+        start = end
+    
+    return ranges
+
+
+def lex_chunk(shared_name: str, recover: bool, max_diagnostics: int, chunk: Chunk) -> ChunkTokens:
+    """Lex a chunk of the source from the shared memory, it runs in the
+    worker processes, so the lexical error is returned instead of raised.
+    
+    Args:
+        shared_name (str): The name of the shared memory with the UTF-8 source.
+        recover (bool): Skip the unrecognized lexemes and add them to the
+        diagnostics, instead of stopping at the first one.
+        max_diagnostics (int): The most diagnostics of the chunk.
+        chunk (Chunk): The chunk to lex.
+    
+    Returns:
+        ChunkTokens: The columns, with offsets and lines in the whole source.
+    """
+    shared = SharedMemory(name=shared_name)
+    
+    try:
+        with shared.buf[chunk.byte_start:chunk.byte_end] as view:
+            text = str(view, "utf-8")
+    finally:
+        shared.close()
+    
+    diagnostics = [] if recover else None
+    
+    try:
+        buffer = TokenBuffer(text, chunk.first_line, diagnostics, max_diagnostics, offset=chunk.char_start)
+    except SyntaxError as error:
+        return ChunkTokens(array("B"), array("I"), array("I"), array("I"), error=str(error))
+    
+    return ChunkTokens(buffer.kinds, buffer.starts, buffer.ends, buffer.lines, diagnostics or [])
+
+
+def lex_parallel(code: str, workers: int = None, diagnostics: list[Diagnostic] = None, max_diagnostics: int = 100,
+                 threshold: int = PARALLEL_THRESHOLD, executor: Executor = None) -> TokenBuffer:
+    """Lex a large source over a pool of processes. The source is copied
+    once to shared memory as UTF-8 and split into chunks of whole lines,
+    each worker reads only its chunk from there. The chunks are joined in
+    order, so the tokens, line numbers and errors are the same as lexing
+    on one core. Small sources, or a single worker, are lexed serially.
+    
+    Args:
+        code (str): Source code.
+        workers (int, optional): Number of processes. Defaults to the number of CPUs.
+        diagnostics (list[Diagnostic], optional): If given, unrecognized
+        lexemes are skipped and added to it instead of raising an error.
+        max_diagnostics (int, optional): Stop adding diagnostics when the
+        list has that many. Defaults to 100.
+        threshold (int, optional): The smallest source lexed in parallel,
+        in characters. Defaults to PARALLEL_THRESHOLD.
+        executor (Executor, optional): A pool to reuse, instead of starting
+        one for each source.
+    
+    Raises:
+        SyntaxError: The first lexical error in the code, if not recovering.
+    
+    Returns:
+        TokenBuffer: The tokens of the whole source.
+    """
+    workers = workers or os.cpu_count() or 1
+    
+    if (workers == 1 and executor is None) or len(code) < threshold:
+        return TokenBuffer(code, diagnostics=diagnostics, max_diagnostics=max_diagnostics)
+    
+    data = code.encode("utf-8")
+    ascii = len(data) == len(code)
+    shared = SharedMemory(create=True, size=max(1, len(data)))
+    
+    try:
+        shared.buf[:len(data)] = data
+        del data
+        
+        # The byte offsets are the character offsets for ASCII sources.
+        chunks, byte_start, line_number = [], 0, 1
+        
+        for start, end in split_lines(code, workers * CHUNKS_PER_WORKER):
+            byte_end = end if ascii else byte_start + len(code[start:end].encode("utf-8"))
+            chunks.append(Chunk(byte_start, byte_end, start, line_number))
+            byte_start = byte_end
+            line_number += code.count("\n", start, end)
+        
+        lex = partial(lex_chunk, shared.name, diagnostics is not None, max_diagnostics)
+        
+        if executor is not None:
+            results = list(executor.map(lex, chunks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lex, chunks))
+    finally:
+        shared.close()
+        shared.unlink()
+    
+    return join_chunks(code, results, diagnostics, max_diagnostics)
+
+
+def join_chunks(code: str, results: list[ChunkTokens], diagnostics: list[Diagnostic], max_diagnostics: int) -> TokenBuffer:
+    """Join the columns of the chunks in order into a single buffer.
+    
+    Raises:
+        SyntaxError: The error of the first chunk that has one.
+    
+    Returns:
+        TokenBuffer: The tokens of the whole source.
+    """
+    typecode = offset_typecode(len(code) + 1)
+    kinds, starts, ends, lines = array("B"), array(typecode), array(typecode), array(typecode)
+    
+    for result in results:
+        if result.error is not None: raise SyntaxError(result.error)
+        
+        kinds.extend(result.kinds)
+        
+        # The chunks at the start of a large source can have narrower columns.
+        for column, chunk_column in ((starts, result.starts), (ends, result.ends), (lines, result.lines)):
+            column.extend(chunk_column if chunk_column.typecode == typecode else array(typecode, chunk_column))
+        
+        # Keep the first diagnostics of the code, like a serial lexer.
+        if diagnostics is not None:
+            diagnostics.extend(result.diagnostics[:max(0, max_diagnostics - len(diagnostics))])
+    
+    return TokenBuffer.from_columns(code, kinds, starts, ends, lines)
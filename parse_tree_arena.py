@@ -0,0 +1,217 @@
+from array import array
+from lexer import Token
+from simple_parser import NODE_TITLES, TOKEN_NODE
+from typing import Iterator
+
+# Used in the index columns when there is no node.
+NO_NODE = -1
+
+# Lines kept before writing them at once.
+BUFFER_SIZE = 1 << 14
+
+
+class ParseTreeArena:
+    def __init__(self) -> None:
+        """Initialize empty columns, the node with index i is described by
+        the i-th item of each column. Nodes are appended in preorder by the
+        parser, so every subtree is a contiguous range of indices.
+        """
+        self.kinds: array = array("b")
+        self.token_indices: array = array("i")
+        self.first_children: array = array("i")
+        self.next_siblings: array = array("i")
+        self.parents: array = array("i")
+        self.last_children: array = array("i") # Used to append children in O(1).
+        self.tokens: list[Token] = []
+
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+
+    def node(self, kind: int, token_index: int = NO_NODE) -> int:
+        """Append a new node without a parent.
+
+        Args:
+            kind (int): The node kind.
+            token_index (int, optional): Index of the node token in `tokens`.
+
+        Returns:
+            int: The node index.
+        """
+        self.kinds.append(kind)
+        self.token_indices.append(token_index)
+        self.first_children.append(NO_NODE)
+        self.next_siblings.append(NO_NODE)
+        self.parents.append(NO_NODE)
+        self.last_children.append(NO_NODE)
+        return len(self.kinds) - 1
+
+
+    def leaf(self, token: Token) -> int:
+        """Append a new token node.
+
+        Args:
+            token (Token): The node token.
+
+        Returns:
+            int: The node index.
+        """
+        self.tokens.append(token)
+        return self.node(TOKEN_NODE, len(self.tokens) - 1)
+
+
+    def add_child(self, node: int, child: int):
+        """Link the child node as the last child of the node.
+
+        Args:
+            node (int): The parent node index.
+            child (int): The child node index.
+        """
+        last_child = self.last_children[node]
+        
+        if last_child == NO_NODE:
+            self.first_children[node] = child
+        else:
+            self.next_siblings[last_child] = child
+        
+        self.last_children[node] = child
+        self.parents[child] = node
+
+
+    def tree(self, root: int) -> "ArenaNodeView":
+        return self.view(root)
+
+
+    def mark(self) -> int:
+        """Returns: a position to roll back to."""
+        return len(self.kinds)
+
+
+    def rollback(self, mark: int):
+        """Drop the nodes created after the mark, they must not be linked
+        to the nodes before it, like a statement that failed to parse."""
+        leaves = self.kinds[mark:].count(TOKEN_NODE)
+        if leaves: del self.tokens[-leaves:]
+        
+        for column in (self.kinds, self.token_indices, self.first_children, self.next_siblings, self.parents, self.last_children):
+            del column[mark:]
+
+
+    def view(self, node: int) -> "ArenaNodeView":
+        """Returns: a ParsingTreeNode like view of the node."""
+        return ArenaNodeView(self, node)
+
+
+    def token(self, node: int) -> Token:
+        """Returns: the token of the node, or None for non token nodes."""
+        token_index = self.token_indices[node]
+        return None if token_index == NO_NODE else self.tokens[token_index]
+
+
+    def title(self, node: int) -> str:
+        """Returns: the node title, like the ParsingTreeNode title."""
+        if self.kinds[node] == TOKEN_NODE:
+            token = self.token(node)
+            return f"{token.token_type}({token.lexeme})"
+        return NODE_TITLES[self.kinds[node]]
+
+
+    def children(self, node: int) -> Iterator[int]:
+        """Yields: the indices of the node children in order."""
+        child = self.first_children[node]
+        
+        while child != NO_NODE:
+            yield child
+            child = self.next_siblings[child]
+
+
+    def subtree(self, node: int) -> range:
+        """Get the indices of the node and all its descendants, they are
+        contiguous because the nodes are stored in preorder.
+
+        Args:
+            node (int): The subtree root.
+
+        Returns:
+            range: The subtree indices.
+        """
+        # The subtree ends at the next sibling of the node or of its
+        # nearest ancestor that has one.
+        current = node
+        
+        while current != NO_NODE:
+            if self.next_siblings[current] != NO_NODE:
+                return range(node, self.next_siblings[current])
+            current = self.parents[current]
+        
+        return range(node, len(self.kinds))
+
+
+    def preorder(self, node: int = 0) -> Iterator[tuple[int, int]]:
+        """Iterate over the subtree in preorder without recursion.
+
+        Args:
+            node (int, optional): The subtree root. Defaults to the tree root.
+
+        Yields:
+            tuple[int, int]: The node index and its depth in the subtree.
+        """
+        nodes = self.subtree(node)
+        depths = array("i", bytes(4 * len(nodes)))
+        parents = self.parents
+        start = nodes.start
+        yield node, 0
+        
+        # A parent always comes before its children.
+        for current in nodes[1:]:
+            depth = depths[parents[current] - start] + 1
+            depths[current - start] = depth
+            yield current, depth
+
+
+    def print_tree(self, file, node: int = 0, level: int = 0):
+        """Write the subtree into the file in the same format as the
+        ParsingTreeNode `print_tree`, the lines are written in large pieces."""
+        lines = []
+        
+        for current, depth in self.preorder(node):
+            lines.append("\t" * (level + depth) + self.title(current) + "\n")
+            
+            if len(lines) >= BUFFER_SIZE:
+                file.write("".join(lines))
+                lines.clear()
+        
+        file.write("".join(lines))
+
+
+class ArenaNodeView:
+    """Used to give a node in the arena the ParsingTreeNode interface,
+    views are created on demand and hold nothing but the node index."""
+    __slots__ = ("arena", "index")
+    
+    def __init__(self, arena: ParseTreeArena, index: int):
+        self.arena: ParseTreeArena = arena
+        self.index: int = index
+
+    @property
+    def kind(self) -> int:
+        return self.arena.kinds[self.index]
+
+    @property
+    def token(self) -> Token:
+        return self.arena.token(self.index)
+
+    @property
+    def title(self) -> str:
+        return self.arena.title(self.index)
+
+    @property
+    def children(self) -> list["ArenaNodeView"]:
+        return [ArenaNodeView(self.arena, child) for child in self.arena.children(self.index)]
+
+    def add_child(self, node: "ArenaNodeView"):
+        self.arena.add_child(self.index, node.index)
+    
+    def print_tree(self, file, level: int = 0):
+        self.arena.print_tree(file, self.index, level)
@@ -0,0 +1,192 @@
+import math
+from abstract_syntax_tree import *
+from types import CodeType
+from typing import Callable
+
+# Operators that Python evaluates like the language for ints and floats.
+PYTHON_OPERATORS = ("+", "-", "*")
+
+# Names the generated code can use beside the variables.
+RUNTIME = {"int_div": int_div, "int_mod": int_mod, "fmod": float_mod, "cast": cast}
+
+
+def local_name(name: str) -> str:
+    """Returns: the Python local of a variable, a global `x` is `v_x` and
+    `x@3` declared in the scope 3 is `v3_x`, so they never clash."""
+    name, _, scope_id = name.partition("@")
+    return f"v{scope_id}_{name}"
+
+
+class CompiledProgram:
+    def __init__(self, source: str, names: list[str], defaults: dict[str, int | float]):
+        """Compile the generated source once into a code object, and get
+        the program function out of it.
+
+        Args:
+            source (str): The generated Python source.
+            names (list[str]): The variable names in the order they are returned.
+            defaults (dict[str, int | float]): The default value of each variable.
+        """
+        self.source: str = source
+        self.names: list[str] = names
+        self.defaults: dict[str, int | float] = defaults
+        self.code: CodeType = compile(source, "<abdo>", "exec")
+        namespace = dict(RUNTIME)
+        exec(self.code, namespace)
+        self.function: Callable = namespace["program"]
+
+
+    def __call__(self, output: Callable[[int | float], None] = print, **initial_values) -> dict[str, int | float]:
+        """Run the program.
+
+        Args:
+            output (Callable, optional): Called with each printed value. Defaults to print.
+            initial_values: The initial value of some variables by their names.
+
+        Raises:
+            ZeroDivisionError: If dividing by zero.
+            OverflowError: If an infinite or NaN float is stored in an int.
+
+        Returns:
+            dict[str, int | float]: The final value of each variable.
+        """
+        arguments = {local_name(name): type(self.defaults[name])(value) for name, value in initial_values.items()}
+        return dict(zip(self.names, self.function(output, **arguments)))
+
+
+class PythonTranspiler:
+    def __init__(self) -> None:
+        """Initialize the generated lines and the program variables."""
+        self.lines: list[str] = []
+        self.defaults: dict[str, int | float] = {}
+
+
+    def compile(self, program: Program) -> CompiledProgram:
+        """Generate the Python source of the program and compile it.
+
+        Args:
+            program (Program): The program, better after constant folding.
+
+        Returns:
+            CompiledProgram: The compiled program.
+        """
+        source = self.transpile(program)
+        return CompiledProgram(source, list(self.defaults), self.defaults)
+
+
+    def transpile(self, program: Program) -> str:
+        """Generate a Python function equivalent to the program. Every
+        variable becomes a local with a `v` prefix so it never clashes with
+        Python names, and its initial value can be passed as an argument.
+        The operations are stored in `t` locals, one line each.
+
+        Args:
+            program (Program): The program.
+
+        Returns:
+            str: The generated source.
+        """
+        for stmt in program.body:
+            self.transpile_stmt(stmt, level=1)
+        
+        names = [local_name(name) for name in self.defaults]
+        parameters = "".join(f", {name}={value!r}" for name, value in zip(names, self.defaults.values()))
+        header = f"def program(output{parameters}):"
+        footer = f"    return ({''.join(name + ', ' for name in names)})"
+        return "\n".join([header] + self.lines + [footer]) + "\n"
+
+
+    def variable(self, var: Var) -> str:
+        """Returns: the local name of the variable after recording it."""
+        self.defaults.setdefault(var.name, cast(0, var.data_type))
+        return local_name(var.name)
+
+
+    def transpile_stmt(self, stmt: Stmt, level: int):
+        """Generate the lines of a single statement.
+
+        Args:
+            stmt (Stmt): The statement.
+            level (int): The indentation level.
+        """
+        indent = "    " * level
+        
+        if isinstance(stmt, (Decl, Assign)):
+            name = self.variable(stmt.target)
+            if stmt.value is None: return
+            
+            value = self.transpile_expr(stmt.value, indent)
+            
+            # Convert the value only if its type isn't the variable type,
+            # `cast` fails on the floats an int can't hold.
+            if stmt.value.data_type != stmt.target.data_type:
+                value = f"cast({value}, {stmt.target.data_type!r})"
+            
+            self.lines.append(f"{indent}{name} = {value}")
+        elif isinstance(stmt, Print):
+            self.lines.append(f"{indent}output({self.variable(stmt.value)})")
+        elif isinstance(stmt, If):
+            condition = self.transpile_expr(stmt.condition, indent)
+            self.lines.append(f"{indent}if {condition}:")
+            body_start = len(self.lines)
+            
+            for body_stmt in stmt.body:
+                self.transpile_stmt(body_stmt, level + 1)
+            
+            # A declaration without a value has no line, so the body can be empty.
+            if len(self.lines) == body_start:
+                self.lines.append(f"{indent}    pass")
+
+
+    def transpile_expr(self, expr: Expr, indent: str) -> str:
+        """Generate the lines of an expression, each operation is stored
+        in a temporary by a line of its own, so long expressions don't nest
+        parentheses past the limit of the Python parser. The operations are
+        visited in postorder with an explicit stack, like the constant
+        folder does, and a temporary is named by the place of its value on
+        the operand stack, so they are reused.
+
+        Args:
+            expr (Expr): The expression.
+            indent (str): The indentation of the lines.
+
+        Returns:
+            str: The source of the value, a literal, a variable or a temporary.
+        """
+        operands: list[str] = []
+        stack: list[tuple[Expr, bool]] = [(expr, False)]
+        
+        while stack:
+            node, operands_done = stack.pop()
+            
+            if isinstance(node, Num):
+                operands.append(self.literal(node))
+            elif isinstance(node, Var):
+                operands.append(self.variable(node))
+            elif not operands_done:
+                stack.extend(((node, True), (node.right, False), (node.left, False)))
+            else:
+                right = operands.pop()
+                temporary = f"t{len(operands) - 1}"
+                self.lines.append(f"{indent}{temporary} = {self.operation(node, operands[-1], right)}")
+                operands[-1] = temporary
+        
+        return operands[0]
+
+
+    @staticmethod
+    def literal(num: Num) -> str:
+        """Returns: the source of a number."""
+        # A folded float can overflow to inf or be nan, they have no literal.
+        if isinstance(num.value, float) and not math.isfinite(num.value): return f"float('{num.value}')"
+        return repr(num.value)
+
+
+    @staticmethod
+    def operation(expr: BinOp | RelOp, left: str, right: str) -> str:
+        """Returns: the source of an operation on two operand sources."""
+        if isinstance(expr, RelOp) or expr.operator in PYTHON_OPERATORS:
+            return f"{left} {expr.operator} {right}"
+        if expr.data_type == FLOAT:
+            return f"{left} / {right}" if expr.operator == "/" else f"fmod({left}, {right})"
+        return f"int_div({left}, {right})" if expr.operator == "/" else f"int_mod({left}, {right})"
@@ -0,0 +1,109 @@
+import csv
+import json
+from json.encoder import encode_basestring
+from operator import attrgetter
+from typing import TextIO
+
+# The fields of each kind of row, in the order they are written.
+TOKEN_FIELDS = ("lexeme", "token_type", "line_number")
+SYMBOL_FIELDS = ("name", "data_type", "declaration_line", "reference_lines", "address", "scope", "dimension", "scope_id", "depth")
+DIAGNOSTIC_FIELDS = ("line_number", "message", "expected", "found") # A diagnostic without a line has null in JSON and nothing in CSV.
+
+# Get the row values out of a Token, SymbolTableEntry or Diagnostic.
+token_row = attrgetter(*TOKEN_FIELDS)
+symbol_row = attrgetter(*SYMBOL_FIELDS)
+diagnostic_row = attrgetter(*DIAGNOSTIC_FIELDS)
+
+# Rows kept before writing them at once.
+BUFFER_SIZE = 1 << 12
+
+
+class RowWriter:
+    def __init__(self, file: TextIO):
+        """Used to write the compile results as rows, each row is written
+        once it's produced instead of building whole tables. This one writes
+        nothing, it's the `none` format, the other formats extend it.
+        
+        Args:
+            file (TextIO): Where the rows are written.
+        """
+        self.file: TextIO = file
+        self.section_name: str = None
+
+
+    def section(self, name: str, fields: tuple[str, ...]):
+        """Start a new kind of rows.
+        
+        Args:
+            name (str): The section name, like "token".
+            fields (tuple[str, ...]): The names of the row values.
+        """
+        self.section_name = name
+
+
+    def row(self, values: tuple):
+        """Write a row with a value for each field of the section."""
+
+
+    def close(self):
+        """Write the rows that are still buffered."""
+
+
+class JsonlWriter(RowWriter):
+    """Writes each row as a JSON object in a line, with its section name."""
+    def __init__(self, file: TextIO):
+        super().__init__(file)
+        self.template: str = None
+        self.lines: list[str] = []
+        self.strings: dict[str, str] = {} # Each string is escaped only once.
+
+
+    def section(self, name: str, fields: tuple[str, ...]):
+        super().section(name, fields)
+        keys = "".join(f", {encode_basestring(field)}: %s" for field in fields)
+        self.template = f'{{"section": {encode_basestring(name)}{keys}}}\n'
+
+
+    def encode(self, value) -> str:
+        """Returns: the JSON of a single value."""
+        if value.__class__ is str:
+            encoded = self.strings.get(value)
+            if encoded is None: encoded = self.strings[value] = encode_basestring(value)
+            return encoded
+        
+        if value.__class__ is int: return str(value)
+        return json.dumps(value)
+
+
+    def row(self, values: tuple):
+        self.lines.append(self.template % tuple(map(self.encode, values)))
+        
+        if len(self.lines) >= BUFFER_SIZE:
+            self.close()
+
+
+    def close(self):
+        self.file.write("".join(self.lines))
+        self.lines.clear()
+
+
+class CsvWriter(RowWriter):
+    """Writes the rows as CSV, each section starts with a header row. The
+    first column is the section name, so the sections can be told apart."""
+    def __init__(self, file: TextIO):
+        super().__init__(file)
+        self.writer = csv.writer(file)
+
+
+    def section(self, name: str, fields: tuple[str, ...]):
+        super().section(name, fields)
+        self.writer.writerow(("section",) + fields)
+
+
+    def row(self, values: tuple):
+        self.writer.writerow((self.section_name,) + values)
+
+
+# The row writer of each output format, the table format is printed
+# by main for humans.
+ROW_WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "none": RowWriter}
@@ -1,29 +1,96 @@
-from lexer import Token
+from lexer import Diagnostic, Token
 from tokens import *
+from typing import Iterable, Iterator
+
+# Kinds of the parsing tree nodes.
+STMT_LIST, DEC_STMT, ASSIGN_STMT, PRINT_STMT, IF_STMT, REL_EXPR, ARTH_EXPR, TERM, TOKEN_NODE = range(9)
+NODE_TITLES = ("stmt_list", "dec_stmt", "assign_stmt", "print_stmt", "if_stmt", "rel_expr", "arth_expr", "term")
+
+# All the leaves share this empty children tuple.
+NO_CHILDREN = ()
+
+# The current token after the last one, so a statement cut at the end
+# of the code fails like any other unexpected token.
+END_OF_CODE = Token("", EOF, 0)
+
 
 class ParsingTreeNode:
-    def __init__(self, title: str):
-        self.title: str = title
-        self.children: list[ParsingTreeNode] = []
+    """Used to present a node in the parsing tree. A token node keeps
+    a reference to its token, and its title is rendered only when needed."""
+    __slots__ = ("kind", "token", "children")
+    
+    def __init__(self, kind: int, token: Token = None):
+        self.kind: int = kind
+        self.token: Token = token
+        self.children: list[ParsingTreeNode] = NO_CHILDREN if kind == TOKEN_NODE else []
+
+    @property
+    def title(self) -> str:
+        if self.kind == TOKEN_NODE:
+            return f"{self.token.token_type}({self.token.lexeme})"
+        return NODE_TITLES[self.kind]
 
     def add_child(self, node):
+        if self.children is NO_CHILDREN:
+            self.children = []
         self.children.append(node)
     
     def print_tree(self, file, level: int = 0):
-        # Write current node into the file.
-        file.write("\t" * level + self.title + "\n")
-        
-        # Write each child in the current node.
-        for child in self.children:
-            child.print_tree(file, level + 1)
+        # Written without recursion, so deep trees are fine.
+        from tree_serializer import write_text
+        write_text(self, file, level)
+
+
+class TreeBuilder:
+    """Used by the parser to build the parsing tree out of ParsingTreeNode
+    objects. Other storages, like `ParseTreeArena`, have the same methods."""
+    def node(self, kind: int) -> ParsingTreeNode:
+        return ParsingTreeNode(kind)
+    
+    def leaf(self, token: Token) -> ParsingTreeNode:
+        return ParsingTreeNode(TOKEN_NODE, token)
+    
+    def add_child(self, node: ParsingTreeNode, child: ParsingTreeNode):
+        node.add_child(child)
+    
+    def tree(self, root: ParsingTreeNode) -> ParsingTreeNode:
+        return root
+    
+    def mark(self) -> int:
+        """Returns: a position to roll back to, nodes are objects so
+        the unused ones are just dropped."""
+        return 0
+    
+    def rollback(self, mark: int):
+        """Drop the nodes created after the mark."""
 
 
 class Parser:
-    def __init__(self, tokens: list[Token]):
-        self.tokens: list[Token] = tokens
+    def __init__(self, tokens: Iterable[Token], builder: TreeBuilder = None, diagnostics: list[Diagnostic] = None, max_diagnostics: int = 100):
+        """Initialize the parser with the tokens, they are pulled lazily
+        one by one, so it can be a list or a generator like `iter_tokens`.
+
+        Args:
+            tokens (Iterable[Token]): The tokens of the code.
+            builder (TreeBuilder, optional): Where the parsing tree nodes
+            are stored. Defaults to ParsingTreeNode objects.
+            diagnostics (list[Diagnostic], optional): If given, the parser
+            recovers from syntax errors instead of raising them. Each error
+            is added to it, the broken statement is skipped and the tree
+            keeps the other statements.
+            max_diagnostics (int, optional): Stop parsing when the
+            diagnostics list has that many. Defaults to 100.
+        """
+        self.tokens: Iterator[Token] = iter(tokens)
         self.token_index: int = -1
         self.current_token: Token = None
         self.parsing_tree_root: ParsingTreeNode = None
+        self.builder: TreeBuilder = builder if builder is not None else TreeBuilder()
+        self.new_node = self.builder.node
+        self.add_child = self.builder.add_child
+        self.diagnostics: list[Diagnostic] = diagnostics
+        self.max_diagnostics: int = max_diagnostics
+        self.open_braces: int = 0 # Braces opened by the current top level statement.
         self.advance()
 
 
@@ -40,23 +107,88 @@ class Parser:
         if self.current_token.token_type == token_type:
             self.advance()
         else:
-            raise SyntaxError(f"⚠️  Syntax Error in <{self.current_token.lexeme}>! Expected <{token_type}> but found <{self.current_token.token_type}>")
+            raise self.syntax_error(f"⚠️  Syntax Error in <{self.current_token.lexeme}>! Expected <{token_type}> but found <{self.current_token.token_type}>", expected=token_type)
+
+
+    def syntax_error(self, message: str, expected: str = None) -> SyntaxError:
+        """Used to build the error of the current token, and add it to the
+        diagnostics if the parser recovers from errors.
+
+        Args:
+            message (str): The error message.
+            expected (str, optional): What the parser expected to find.
+
+        Returns:
+            SyntaxError: The error to raise.
+        """
+        if self.diagnostics is not None and len(self.diagnostics) < self.max_diagnostics:
+            token = self.current_token
+            line_number = None if token is END_OF_CODE else token.line_number
+            self.diagnostics.append(Diagnostic(line_number, message, expected, token.token_type))
+        
+        return SyntaxError(message)
+
+
+    def leaf(self) -> ParsingTreeNode:
+        """Returns: a tree node for the current token."""
+        return self.builder.leaf(self.current_token)
 
 
     def advance(self):
-        """Used to read the next token in the list. If there no next token,
-        assign None to stop the parsing."""
+        """Used to read the next token, it's the only lookahead the parser
+        needs. If there no next token, assign END_OF_CODE to stop the parsing."""
         self.token_index += 1
-        
-        if self.token_index < len(self.tokens):
-            self.current_token = self.tokens[self.token_index]
-        else:
-            self.current_token = None
+        self.current_token = next(self.tokens, END_OF_CODE)
 
 
     def parse(self):
         """Start parsing the tokens and building the parsing tree."""
-        self.parsing_tree_root = self.stmt_list()
+        self.parsing_tree_root = self.builder.tree(self.stmt_list())
+
+
+    def iter_stmts(self) -> Iterator[ParsingTreeNode]:
+        """Parse the program one statement at a time without building the
+        whole parsing tree, so the memory stays flat for large programs.
+
+        Yields:
+            ParsingTreeNode: The next top level statement node.
+        """
+        while self.current_token is not END_OF_CODE:
+            if self.diagnostics is None:
+                yield self.validate_stmt()
+                continue
+            
+            mark = self.builder.mark()
+            
+            try:
+                stmt = self.validate_stmt()
+            except SyntaxError:
+                # Drop the broken statement and go on after it, unless
+                # there are too many errors already.
+                self.builder.rollback(mark)
+                if len(self.diagnostics) >= self.max_diagnostics: return
+                self.synchronize()
+                continue
+            
+            yield stmt
+
+
+    def synchronize(self):
+        """Skip the tokens up to the end of the broken statement, that's a
+        semicolon or a closing brace, then skip the braces closing the
+        statements it was nested in."""
+        while self.current_token.token_type not in (SEMICOLON, RIGHT_BRACE, EOF):
+            if self.current_token.token_type == LEFT_BRACE: self.open_braces += 1
+            self.advance()
+        
+        if self.current_token.token_type == RIGHT_BRACE: self.open_braces -= 1
+        self.advance()
+        
+        while self.open_braces > 0 and self.current_token.token_type == RIGHT_BRACE:
+            self.open_braces -= 1
+            self.advance()
+        
+        self.open_braces = 0
 
 
     def stmt_list(self) -> ParsingTreeNode:
@@ -67,10 +199,10 @@ class Parser:
         Returns:
             ParsingTreeNode: The root node of the parsing tree.
         """
-        root = ParsingTreeNode("stmt_list")
+        root = self.new_node(STMT_LIST)
         
-        while self.current_token != None:
-            root.add_child(self.validate_stmt())
+        for stmt in self.iter_stmts():
+            self.add_child(root, stmt)
         
         return root
 
@@ -99,7 +231,7 @@ class Parser:
         elif self.current_token.lexeme == "if" and self.current_token.token_type == KEYWORD:
             return self.validate_if_stmt()
         else:
-            raise SyntaxError(f"⚠️  Syntax Error in <{self.current_token.lexeme}>! Unexpected token <{self.current_token.token_type}>")
+            raise self.syntax_error(f"⚠️  Syntax Error in <{self.current_token.lexeme}>! Unexpected token <{self.current_token.token_type}>", expected="statement")
 
 
     def validate_dec_stmt(self) -> ParsingTreeNode:
@@ -110,24 +242,24 @@ class Parser:
             ParsingTreeNode: Declaration statement node.
         """
         # The root will be the declaration statement itself.
-        node = ParsingTreeNode("dec_stmt")
+        node = self.new_node(DEC_STMT)
         
         # Check for each part in the statement and add it as a child
         # to the statement node.
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(DATA_TYPE)
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(ID)
         
         # Because we can declare without giving a value.
         if self.current_token.token_type == ASSIGN:
-            node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+            self.add_child(node, self.leaf())
             self.match(ASSIGN)
             
-            node.add_child(self.validate_arth_expr())
+            self.add_child(node, self.validate_arth_expr())
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(SEMICOLON)
         
         return node
@@ -141,19 +273,19 @@ class Parser:
             ParsingTreeNode: Assignment statement node.
         """
         # The root will be the assignment statement itself.
-        node = ParsingTreeNode("assign_stmt")
+        node = self.new_node(ASSIGN_STMT)
         
         # Check for each part in the statement and add it as a child
         # to the statement node.
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(ID)
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(ASSIGN)
         
-        node.add_child(self.validate_arth_expr())
+        self.add_child(node, self.validate_arth_expr())
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(SEMICOLON)
         
         return node
@@ -167,23 +299,23 @@ class Parser:
             ParsingTreeNode: Print statement node.
         """
         # The root will be the print statement itself.
-        node = ParsingTreeNode("print_stmt")
+        node = self.new_node(PRINT_STMT)
         
         # Check for each part in the statement and add it as a child
         # to the statement node.
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(KEYWORD)
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(LEFT_PAREN)
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(ID)
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(RIGHT_PAREN)
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(SEMICOLON)
         
         return node
@@ -197,28 +329,30 @@ class Parser:
             ParsingTreeNode: If statement node.
         """
         # The root will be the if statement itself.
-        node = ParsingTreeNode("if_stmt")
+        node = self.new_node(IF_STMT)
         
         # Check for each part in the statement and add it as a child
         # to the statement node.
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(KEYWORD)
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(LEFT_PAREN)
         
-        node.add_child(self.validate_rel_expr())
+        self.add_child(node, self.validate_rel_expr())
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(RIGHT_PAREN)
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(LEFT_BRACE)
+        self.open_braces += 1
         
-        node.add_child(self.validate_stmt())
+        self.add_child(node, self.validate_stmt())
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(RIGHT_BRACE)
+        self.open_braces -= 1
         
         return node
 
@@ -231,16 +365,16 @@ class Parser:
             ParsingTreeNode: Relational expression node.
         """
         # The root will be the relational expression itself.
-        node = ParsingTreeNode("rel_expr")
+        node = self.new_node(REL_EXPR)
         
         # Check for each part in the expression and add it as a child
         # to the expression node.
-        node.add_child(self.validate_arth_expr())
+        self.add_child(node, self.validate_arth_expr())
         
-        node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+        self.add_child(node, self.leaf())
         self.match(RELATIONAL_OPERATOR)
         
-        node.add_child(self.validate_arth_expr())
+        self.add_child(node, self.validate_arth_expr())
         
         return node
 
@@ -253,17 +387,17 @@ class Parser:
             ParsingTreeNode: Arithmetic expression node.
         """
         # The root will be the arithmetic expression itself.
-        node = ParsingTreeNode("arth_expr")
+        node = self.new_node(ARTH_EXPR)
         
         # Check for each part in the expression and add it as a child
         # to the expression node.
-        node.add_child(self.validate_term())
+        self.add_child(node, self.validate_term())
         
         # Used for the expressions like (x + 5).
         while self.current_token.token_type == ARITHMETIC_OPERATOR:
-            node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+            self.add_child(node, self.leaf())
             self.advance()
-            node.add_child(self.validate_term())
+            self.add_child(node, self.validate_term())
 
         return node
 
@@ -280,22 +414,22 @@ class Parser:
             ParsingTreeNode: Term node.
         """
         # The root will be the term itself.
-        node = ParsingTreeNode("term")
+        node = self.new_node(TERM)
         
         # Check for the term cases and add them as children to the
         # term node.
         if self.current_token.token_type in [ID, NUMBER]:
-            node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+            self.add_child(node, self.leaf())
             self.advance()
         elif self.current_token.token_type == LEFT_PAREN:
-            node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+            self.add_child(node, self.leaf())
             self.match(LEFT_PAREN)
             
-            node.add_child(self.validate_arth_expr())
+            self.add_child(node, self.validate_arth_expr())
             
-            node.add_child(ParsingTreeNode(f"{self.current_token.token_type}({self.current_token.lexeme})"))
+            self.add_child(node, self.leaf())
             self.match(RIGHT_PAREN)
         else:
-            raise SyntaxError(f"⚠️  Syntax Error in <{self.current_token.lexeme}>! Not a valid expression!")
+            raise self.syntax_error(f"⚠️  Syntax Error in <{self.current_token.lexeme}>! Not a valid expression!", expected="expression")
         
         return node
@@ -1,8 +1,10 @@
 from lexer import Token
 from tokens import *
+from array import array
+from collections import Counter
 from dataclasses import dataclass
-from PrettyPrint import PrettyPrintTree
-from colorama import Back
+from hashlib import blake2b
+from typing import Iterable, Iterator
 
 @dataclass
 class SymbolTableEntry:
@@ -14,65 +16,114 @@ class SymbolTableEntry:
     address: int
     scope: str = "Global"
     dimension: int = 0 # Because all variables are primitives.
+    scope_id: int = 0 # The block that declares the variable, 0 is the global scope.
+    depth: int = 0 # How many blocks the declaration is nested in.
+
+    @property
+    def key(self) -> str:
+        """Returns: the entry key in the tables, a local variable gets
+        its scope id too, so shadowing variables don't share an entry.
+        It's only used for lookups, see `display_names` for printing."""
+        return self.name if self.scope_id == 0 else f"{self.name}@{self.scope_id}"
 
     def add_reference_line(self, line):
         self.reference_lines.append(line)
 
 
+def display_names(entries: Iterable[tuple[str, SymbolTableEntry]]) -> dict[str, str]:
+    """Returns: the printed name of each key, the variable name, with its
+    key only when another variable has the same name so they can be told
+    apart. A key without an entry is printed as it is."""
+    entries = list(entries)
+    counts = Counter(entry.name for _, entry in entries if entry is not None)
+    return {key: key if entry is None or counts[entry.name] > 1 else entry.name for key, entry in entries}
+
+
+class Scope:
+    """Used to save the variables declared in a single block. Each `{`
+    opens a scope inside the current one, and its `}` closes it."""
+    __slots__ = ("id", "parent", "depth", "symbols")
+    
+    def __init__(self, id: int, parent: "Scope" = None):
+        self.id: int = id
+        self.parent: Scope = parent
+        self.depth: int = 0 if parent is None else parent.depth + 1
+        self.symbols: dict[str, SymbolTableEntry] = {}
+
+
 class SymbolTable:
-    def __init__(self, tokens: list[Token]):
+    def __init__(self, tokens: Iterable[Token], release_scopes: bool = False):
         """Initialize the tables with an empty dictionary, and use the
-        tokens list to build the tables.
+        tokens to build the tables.
 
         Args:
-            tokens (list[Token]): The list of tokens in the code.
+            tokens (Iterable[Token]): The tokens in the code, they are
+            iterated only once.
+            release_scopes (bool, optional): Drop the entries of each block
+            once it's closed, so only the global and the open scopes are kept.
+            Used when the tables are only checked. Defaults to False.
         """
-        self.tokens: list[Token] = tokens
+        self.tokens: Iterable[Token] = tokens
+        self.release_scopes: bool = release_scopes
         self.unordered_table: dict[str, SymbolTableEntry] = {}
         self.ordered_table: dict[str, SymbolTableEntry] = {}
         self.address: int = 0 # The initial address.
+        self.global_scope: Scope = Scope(0)
+        self.scopes: list[Scope] = [self.global_scope] # Indexed by the scope id.
+        self.resolved: dict[tuple[str, int], SymbolTableEntry] = {}
         self.build_unordered_symbol_table()
         self.build_ordered_symbol_table()
 
 
-    def insert(self, name: str, data_type: str, line: int, scope: str):
+    def insert(self, name: str, data_type: str, line: int, scope: Scope) -> SymbolTableEntry:
         """Used to insert or update an ID entity in the table. If the
-        ID is already in the table, just update the reference lines. If
-        the ID wasn't added before, add a new entity for it. 
+        ID is already declared in the same scope, just update the reference
+        lines. If not, add a new entity for it, that hides the variables
+        with the same name in the outer scopes.
 
         Args:
             name (str): ID name.
             data_type (str): ID data type.
             line (int): Current line.
-            scope (str): ID scope.
+            scope (Scope): The scope of the declaration.
+
+        Returns:
+            SymbolTableEntry: The ID entity.
         """
-        if name in self.unordered_table:
-            # The Id was already added to the table just 
+        entry = scope.symbols.get(name)
+        
+        if entry is not None:
+            # The Id was already declared in this scope, just
             # update the reference lines.
-            entry = self.add_reference(name=name, line=line)
-        else:
-            # The Id is new. Create a new entity for it.
-            entry = SymbolTableEntry(
-                name=name,
-                data_type=data_type,
-                declaration_line=line,
-                reference_lines=[],
-                address=self.address,
-                scope=scope
-            )
-            
-            # Update address
-            self.address += 2
+            entry.add_reference_line(line)
+            return entry
         
-        # Update the Id object in the table.
-        self.unordered_table[name] = entry
+        # The Id is new. Create a new entity for it.
+        entry = SymbolTableEntry(
+            name=name,
+            data_type=data_type,
+            declaration_line=line,
+            reference_lines=[],
+            address=self.address,
+            scope="Global" if scope.depth == 0 else "Local",
+            scope_id=scope.id,
+            depth=scope.depth
+        )
+        
+        # Update address
+        self.address += 2
+        
+        # Add the Id object to its scope and the table.
+        scope.symbols[name] = entry
+        self.unordered_table[entry.key] = entry
+        return entry
 
     
     def add_reference(self, name: str, line: int) -> SymbolTableEntry:
         """Update the reference lines of the ID and return it back.
 
         Args:
-            name (str): ID name.
+            name (str): ID key in the table.
             line (int): Reference line number.
 
         Returns:
@@ -82,9 +133,39 @@ class SymbolTable:
         entry.add_reference_line(line)
         return entry
 
+
+    def lookup(self, name: str, scope_id: int = 0) -> SymbolTableEntry | None:
+        """Find the variable a name refers to inside a scope, starting
+        from the scope itself up to the global scope. Resolved names are
+        cached, so looking the same name up again is a dict access.
+
+        Args:
+            name (str): ID name.
+            scope_id (int, optional): The scope of the reference. Defaults
+            to the global scope.
+
+        Returns:
+            SymbolTableEntry | None: The innermost visible entry, or None
+            if the name isn't declared.
+        """
+        entry = self.resolved.get((name, scope_id))
+        if entry is not None: return entry
+        
+        scope = self.scopes[scope_id]
+        while scope is not None and name not in scope.symbols:
+            scope = scope.parent
+        
+        if scope is None: return None
+        entry = self.resolved[(name, scope_id)] = scope.symbols[name]
+        return entry
+
     
     def build_unordered_symbol_table(self):
-        """Uses the tokens list to build an unordered symbol table.
+        """Uses the tokens to build an unordered symbol table in a single
+        pass, the table keys are also the IDs in the order they are declared.
+        The scopes are kept in a stack, and the innermost visible variable
+        of each name is kept in a dict, so each reference is found in O(1)
+        whatever the nesting depth is.
 
         Raises:
             SyntaxError: If a variable is used before declaration, raise a
@@ -92,31 +173,59 @@ class SymbolTable:
         """
         # Used to track the variables types and scope.
         current_data_type = None
-        current_scope = "Global"
-        opened_braces = 0
+        scope = self.global_scope
+        visible: dict[str, SymbolTableEntry] = {}
+        
+        # The variables each open scope hides, to show them again
+        # when the scope is closed.
+        hidden: list[list[tuple[str, SymbolTableEntry]]] = [[]]
 
         for token in self.tokens:
-            if token.token_type == DATA_TYPE:
-                current_data_type = token.lexeme
-            elif token.token_type == ID:
+            token_type = token.token_type
+            
+            if token_type == ID:
                 # If the current token is ID, check if it's declared.
+                name = token.lexeme
+                
                 if current_data_type:
-                    self.insert(name=token.lexeme, data_type=current_data_type, line=token.line_number, scope=current_scope)
+                    entry = self.insert(name=name, data_type=current_data_type, line=token.line_number, scope=scope)
+                    
+                    if visible.get(name) is not entry:
+                        hidden[-1].append((name, visible.get(name)))
+                        visible[name] = entry
+                    
                     current_data_type = None
-                elif token.lexeme in self.unordered_table:
-                    self.insert(name=token.lexeme, data_type=None, line=token.line_number, scope=current_scope)
+                elif name in visible:
+                    visible[name].add_reference_line(token.line_number)
                 else:
-                    raise SyntaxError(f"⚠️  The variable <{token.lexeme}> is used before being declared!")
+                    raise SyntaxError(f"⚠️  The variable <{name}> is used before being declared!")
+            elif token_type == DATA_TYPE:
+                current_data_type = token.lexeme
             
-            # Count opened barces for local variables.
-            elif token.token_type == LEFT_BRACE:
-                opened_braces += 1
-            elif token.token_type == RIGHT_BRACE:
-                opened_braces -= 1
-
-            # Change the current scope according to the braces.
-            if opened_braces == 0: current_scope = "Global"
-            else: current_scope = "Local"
+            # Each opened brace starts a new scope, and its closing
+            # brace goes back to the outer scope.
+            elif token_type == LEFT_BRACE:
+                scope = Scope(len(self.scopes), scope)
+                self.scopes.append(scope)
+                hidden.append([])
+            elif token_type == RIGHT_BRACE and scope.parent is not None:
+                for name, entry in reversed(hidden.pop()):
+                    if entry is None: del visible[name]
+                    else: visible[name] = entry
+                
+                if self.release_scopes:
+                    for entry in scope.symbols.values():
+                        del self.unordered_table[entry.key]
+                    
+                    self.scopes[scope.id] = None
+                
+                scope = scope.parent
+
+
+    def get_ids(self) -> list[str]:
+        """Returns: the keys of the entries in the order they are declared,
+        every ID is declared before its first use."""
+        return list(self.unordered_table)
 
 
     def build_ordered_symbol_table(self):
@@ -127,86 +236,291 @@ class SymbolTable:
 
 class TreeTableNode:
     """Used to present a node in the Tree-Structured symbol
-    table, which is a binary tree."""
-    def __init__(self, value: str):
+    table, which is a balanced binary tree."""
+    def __init__(self, value: str, entry: SymbolTableEntry = None):
         self.value: str = value
+        self.entry: SymbolTableEntry = entry
+        self.height: int = 1
         self.left_child: TreeTableNode = None
         self.right_child: TreeTableNode = None
 
 
+def node_height(node: TreeTableNode) -> int:
+    """Returns: the height of the node, 0 for an empty node."""
+    return node.height if node else 0
+
+
+def update_height(node: TreeTableNode):
+    node.height = 1 + max(node_height(node.left_child), node_height(node.right_child))
+
+
+def rotate_left(node: TreeTableNode) -> TreeTableNode:
+    """Rotate the node left and return the new subtree root."""
+    root = node.right_child
+    node.right_child = root.left_child
+    root.left_child = node
+    update_height(node)
+    update_height(root)
+    return root
+
+
+def rotate_right(node: TreeTableNode) -> TreeTableNode:
+    """Rotate the node right and return the new subtree root."""
+    root = node.left_child
+    node.left_child = root.right_child
+    root.right_child = node
+    update_height(node)
+    update_height(root)
+    return root
+
+
+def rebalance(node: TreeTableNode) -> TreeTableNode:
+    """Update the node height and rotate it if one side is two levels
+    higher than the other, like an AVL tree does.
+
+    Args:
+        node (TreeTableNode): The subtree root.
+
+    Returns:
+        TreeTableNode: The new subtree root.
+    """
+    update_height(node)
+    balance = node_height(node.left_child) - node_height(node.right_child)
+    
+    if balance > 1:
+        if node_height(node.left_child.left_child) < node_height(node.left_child.right_child):
+            node.left_child = rotate_left(node.left_child)
+        return rotate_right(node)
+    
+    if balance < -1:
+        if node_height(node.right_child.right_child) < node_height(node.right_child.left_child):
+            node.right_child = rotate_right(node.right_child)
+        return rotate_left(node)
+    
+    return node
+
+
 class TreeSymbolTable:
-    def __init__(self, ids: list[str]) -> None:
-        """Initialize the table with the tokens list and use it to
+    def __init__(self, ids: list[str], entries: dict[str, SymbolTableEntry] = None) -> None:
+        """Initialize the table with the IDs list and use it to
         build the tree symbol table.
 
         Args:
             ids (list[str]): The list of IDs tokens.
+            entries (dict[str, SymbolTableEntry], optional): The entry of
+            each ID, like the unordered symbol table.
         """
         self.ids: list[str] = ids
+        self.entries: dict[str, SymbolTableEntry] = entries or {}
+        self.size: int = 0
         self.root: TreeTableNode = self.build_tree_symbol_table()
 
 
+    def __len__(self) -> int:
+        return self.size
+
+
+    def __contains__(self, key: str) -> bool:
+        return self.contains(key)
+
+
+    def __iter__(self) -> Iterator[str]:
+        """Yields: the IDs in alphabetical order."""
+        for key, _ in self.items():
+            yield key
+
+
+    @property
+    def height(self) -> int:
+        """Returns: the number of levels in the tree."""
+        return node_height(self.root)
+
+
     def build_tree_symbol_table(self) -> TreeTableNode:
-        """Initialize the root with the first ID and loop over
-        the rest of IDs to insert them as a children to it.
+        """Insert the IDs one by one into an empty tree.
 
         Returns:
             TreeTableNode: The tree root.
         """
-        root = TreeTableNode(self.ids[0])
-    
-        for token in self.ids[1:]:
-            self.insert_node(root, token)
+        self.root = None
         
-        return root
-    
-    
-    def insert_node(self, root: TreeTableNode, token: str) -> TreeTableNode:
-        """Insert children nodes recursively into the root according
-        to their alphabetical order.
+        for token in self.ids:
+            self.insert(token, self.entries.get(token))
+        
+        return self.root
 
-        Args:
-            root (TreeTableNode): The root node.
-            token (str): The ID which will be the node value.
 
-        Returns:
-            TreeTableNode: The root node after adding its children.
+    def insert(self, key: str, entry: SymbolTableEntry = None):
+        """Insert the ID without recursion, then rebalance the nodes on
+        the path back to the root. An existing ID gets the new entry.
+
+        Args:
+            key (str): The ID which will be the node value.
+            entry (SymbolTableEntry, optional): The ID entry.
         """
-        if root is None: return TreeTableNode(token)
+        path = []
+        node = self.root
+        
+        while node is not None:
+            if key == node.value:
+                node.entry = entry
+                return
+            
+            path.append(node)
+            node = node.left_child if key < node.value else node.right_child
+        
+        child = TreeTableNode(key, entry)
+        self.size += 1
+        
+        # Link each rebalanced subtree to its parent, from the bottom up.
+        while path:
+            node = path.pop()
+            
+            if key < node.value: node.left_child = child
+            else: node.right_child = child
+            
+            height = node.height
+            child = rebalance(node)
+            
+            # The heights above don't change, so the rest is balanced.
+            if child is node and node.height == height: return
+        
+        self.root = child
+
+
+    def find_node(self, key: str) -> TreeTableNode:
+        """Returns: the node of the ID, or None if it's not in the tree."""
+        node = self.root
+        
+        while node is not None and node.value != key:
+            node = node.left_child if key < node.value else node.right_child
         
-        if token < root.value:
-            root.left_child = self.insert_node(root.left_child, token)
-        else:
-            root.right_child = self.insert_node(root.right_child, token)
+        return node
+
+
+    def lookup(self, key: str) -> SymbolTableEntry:
+        """Returns: the entry of the ID, or None if it's not in the tree."""
+        node = self.find_node(key)
+        return node.entry if node else None
+
+
+    def contains(self, key: str) -> bool:
+        return self.find_node(key) is not None
+
+
+    def items(self, low: str = None, high: str = None) -> Iterator[tuple[str, SymbolTableEntry]]:
+        """Iterate over the tree in order without recursion, skipping the
+        subtrees out of the range.
+
+        Args:
+            low (str, optional): The first ID to include. Defaults to no limit.
+            high (str, optional): The IDs must be less than it. Defaults to no limit.
+
+        Yields:
+            tuple[str, SymbolTableEntry]: The ID and its entry.
+        """
+        stack = []
+        node = self.root
         
-        return root
+        while stack or node is not None:
+            if node is not None:
+                if low is not None and node.value < low:
+                    node = node.right_child
+                else:
+                    stack.append(node)
+                    node = node.left_child
+                continue
+            
+            node = stack.pop()
+            if high is not None and node.value >= high: return
+            yield node.value, node.entry
+            node = node.right_child
+
+
+    def range_query(self, low: str, high: str) -> list[tuple[str, SymbolTableEntry]]:
+        """Returns: the IDs from low up to but not including high, in order."""
+        return list(self.items(low, high))
+
+
+    def prefix_query(self, prefix: str) -> list[tuple[str, SymbolTableEntry]]:
+        """Returns: the IDs starting with the prefix, in order."""
+        return list(self.items(prefix, prefix + chr(0x10FFFF)))
 
 
     def print_tree_table(self):
-        """Used to print the tree in a pretty way."""
+        """Used to print the tree in a pretty way, it's readable for
+        small trees only."""
+        if self.root is None: return
+        
+        # Only needed for printing, so they aren't imported with the module.
+        from PrettyPrint import PrettyPrintTree
+        from colorama import Back
+        
+        names = display_names(self.items())
         pt = PrettyPrintTree(
             get_children=lambda node: [] if node is None or node.left_child is node.right_child is None else [node.left_child, node.right_child],
-            get_val=lambda node: node.value if node else None,
+            get_val=lambda node: names[node.value] if node else None,
             color=Back.BLUE
         )
         pt(self.root)
 
 
+# Marks a deleted slot in the hash table, so probing goes on after it.
+DELETED = object()
+
+
+def string_hash(key: str) -> int:
+    """Returns: a strong 64 bit hash of the string, it's the same in every
+    run unlike `hash`, so the printed table doesn't change."""
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
 class HashSymbolTable:
-    def __init__(self, ids: list[str]):
-        """Initialize the table using an empty dictionary, and use
-        the list of IDs to build it.
+    def __init__(self, ids: list[str], entries: dict[str, SymbolTableEntry] = None):
+        """Initialize an empty open addressing table sized for the IDs,
+        and use the list of IDs to build it.
 
         Args:
             ids (list[str]): The list of IDs in the tokens.
+            entries (dict[str, SymbolTableEntry], optional): The entry of
+            each ID, like the unordered symbol table.
         """
         self.ids: list[str] = ids
-        self.table: dict[int, list[str]] = {}
+        self.entries: dict[str, SymbolTableEntry] = entries or {}
+        self.size: int = 0 # Number of IDs.
+        self.used: int = 0 # Number of IDs and deleted slots.
+        self.allocate(self.capacity_for(len(ids)))
         self.insert_all()
-        
+
+
+    def __len__(self) -> int:
+        return self.size
+
+
+    def __contains__(self, key: str) -> bool:
+        return self.find_slot(key, string_hash(key))[0] >= 0
+
+
+    @staticmethod
+    def capacity_for(size: int) -> int:
+        """Returns: the smallest power of two that keeps the load factor
+        of the given size under 2/3."""
+        capacity = 8
+        while capacity * 2 < size * 3: capacity *= 2
+        return capacity
+
+
+    def allocate(self, capacity: int):
+        """Replace the slots with empty preallocated ones."""
+        self.capacity: int = capacity
+        self.keys: list[str] = [None] * capacity
+        self.values: list[SymbolTableEntry] = [None] * capacity
+        self.hashes: array = array("Q", bytes(8 * capacity))
+        self.used = self.size
+
 
     def hash_function(self, id: str) -> int:
-        """Get the hash value for the given ID.
+        """Get the home slot of the given ID.
 
         Args:
             id (str): The ID we need to calculate the hash value.
@@ -214,42 +528,168 @@ class HashSymbolTable:
         Returns:
             int: The hash value.
         """
-        return (len(id) + ord(id[0])) % len(self.ids)
-    
-    
-    def get_all_hash_values(self) -> list[int]:
-        """Get all the hash values.
+        return string_hash(id) & (self.capacity - 1)
+
+
+    def probe(self, hash_value: int) -> Iterator[int]:
+        """Yields: the slots to check for the hash value in order. Like
+        CPython dicts, the higher bits of the hash are mixed in, so keys
+        with the same home slot take different paths."""
+        mask = self.capacity - 1
+        perturb = hash_value
+        index = hash_value & mask
+        
+        while True:
+            yield index
+            perturb >>= 5
+            index = (5 * index + 1 + perturb) & mask
+
+
+    def find_slot(self, key: str, hash_value: int) -> tuple[int, int]:
+        """Find the slot of the key.
+
+        Args:
+            key (str): The ID.
+            hash_value (int): Its hash.
 
         Returns:
-            list[int]: List of hash values.
+            tuple[int, int]: The key slot or -1 if it's missing, and the
+            first free slot on its probe path.
         """
-        return [self.hash_function(id) for id in self.ids]
-    
-    
-    def insert_all(self):
-        """Insert all the IDs in the dictionary according to
-        their hash values."""
-        hash_indeces = self.get_all_hash_values()
-        
-        # Loop over the IDs to add each one in its hash
-        # value in the table.
-        for i, id in enumerate(self.ids):
-            index = hash_indeces[i]
+        keys, hashes = self.keys, self.hashes
+        mask = self.capacity - 1
+        perturb = hash_value
+        index = hash_value & mask
+        free = -1
+        
+        # The same order as `probe`, inlined because it's the hot path.
+        while True:
+            slot_key = keys[index]
+            
+            if slot_key is None:
+                return -1, index if free < 0 else free
+            if slot_key is DELETED:
+                if free < 0: free = index
+            elif hashes[index] == hash_value and slot_key == key:
+                return index, free
             
-            # Initialize the hash value with an empty list.
-            if index not in self.table:
-                self.table[index] = []
+            perturb >>= 5
+            index = (5 * index + 1 + perturb) & mask
+
+
+    def insert(self, key: str, entry: SymbolTableEntry = None):
+        """Insert the ID or update its entry, the table grows when the
+        load factor with the deleted slots goes over 2/3.
+
+        Args:
+            key (str): The ID.
+            entry (SymbolTableEntry, optional): The ID entry.
+        """
+        hash_value = string_hash(key)
+        index, free = self.find_slot(key, hash_value)
+        
+        if index >= 0:
+            self.values[index] = entry
+            return
+        
+        if self.keys[free] is None:
+            if (self.used + 1) * 3 > self.capacity * 2:
+                self.resize(self.capacity_for(self.size + 1))
+                index, free = self.find_slot(key, hash_value)
+            self.used += 1
+        
+        self.keys[free] = key
+        self.values[free] = entry
+        self.hashes[free] = hash_value
+        self.size += 1
+
+
+    def lookup(self, key: str) -> SymbolTableEntry:
+        """Returns: the entry of the ID, or None if it's not in the table."""
+        index = self.find_slot(key, string_hash(key))[0]
+        return self.values[index] if index >= 0 else None
+
+
+    def delete(self, key: str) -> bool:
+        """Remove the ID, its slot is marked as deleted.
+
+        Args:
+            key (str): The ID.
+
+        Returns:
+            bool: If the ID was in the table.
+        """
+        index = self.find_slot(key, string_hash(key))[0]
+        if index < 0: return False
+        
+        self.keys[index] = DELETED
+        self.values[index] = None
+        self.size -= 1
+        return True
+
+
+    def resize(self, capacity: int):
+        """Move the IDs into new slots, dropping the deleted ones."""
+        items = [(key, value, hash_value) for key, value, hash_value in zip(self.keys, self.values, self.hashes) if key is not None and key is not DELETED]
+        self.allocate(capacity)
+        
+        for key, value, hash_value in items:
+            index = self.find_slot(key, hash_value)[1]
+            self.keys[index] = key
+            self.values[index] = value
+            self.hashes[index] = hash_value
+
+
+    def insert_all(self):
+        """Insert all the IDs in the table with their entries."""
+        for id in self.ids:
+            self.insert(id, self.entries.get(id))
+
+
+    def items(self) -> Iterator[tuple[int, str, SymbolTableEntry]]:
+        """Yields: the slot, ID and entry of each ID in slot order."""
+        for index, key in enumerate(self.keys):
+            if key is not None and key is not DELETED:
+                yield index, key, self.values[index]
+
+
+    def probe_lengths(self) -> list[int]:
+        """Returns: how many slots a lookup checks for each ID."""
+        lengths = []
+        
+        for index, key, _ in self.items():
+            for length, slot in enumerate(self.probe(self.hashes[index]), start=1):
+                if slot == index: break
+            lengths.append(length)
+        
+        return lengths
+
+
+    def probe_histogram(self) -> dict[int, int]:
+        """Returns: the number of IDs for each probe length."""
+        return dict(sorted(Counter(self.probe_lengths()).items()))
+
+
+    def collision_histogram(self) -> dict[int, int]:
+        """Returns: the number of home slots for each count of IDs
+        sharing that home slot."""
+        homes = Counter(self.hashes[index] & (self.capacity - 1) for index, _, _ in self.items())
+        return dict(sorted(Counter(homes.values()).items()))
+
+
+    @property
+    def max_probe_length(self) -> int:
+        return max(self.probe_lengths(), default=0)
+
 
-            # Add the ID to its hash value list.
-            self.table[index].append(id)
-    
-    
     def print_hash_table(self):
-        """Used to print the hash values with the list of each one of them."""
-        for index, values in self.table.items():
+        """Used to print each home slot with the list of IDs hashed to it."""
+        buckets: dict[int, list[str]] = {}
+        names = display_names((key, entry) for _, key, entry in self.items())
+        
+        for index, key, _ in self.items():
+            buckets.setdefault(self.hashes[index] & (self.capacity - 1), []).append(names[key])
+        
+        for index, values in sorted(buckets.items()):
             print(index, end=" --> ")
-            
-            for value in values:
-                if value != values[-1]: print(value, end=" --> ")
-                else: print(value)
-
+            print(" --> ".join(values))
@@ -0,0 +1,63 @@
+import pytest
+import sys
+from abstract_syntax_tree import ASTBuilder, Assign, BinOp, ConstantFolder, Num, Program, Var, cast
+from benchmarks.generator import deep_parentheses
+from lexer import Lexer
+from ll1_parser import LL1Parser
+from symbol_table import SymbolTable
+
+DEPTH = 1500
+
+
+def lower(code: str) -> Program:
+    """Returns: the folded program of the code, parsed without recursion."""
+    tokens = Lexer(code).get_tokens()
+    parser = LL1Parser(tokens)
+    parser.parse()
+    return ConstantFolder().fold(ASTBuilder(SymbolTable(tokens)).build(parser.parsing_tree_root))
+
+
+def test_deep_parentheses():
+    assert DEPTH > sys.getrecursionlimit()
+    program = lower(deep_parentheses(DEPTH, statements=2))
+    assert len(program.body) == 3
+    
+    # Each level of parentheses adds one to the expression before it.
+    expr, depth = program.body[1].value, 0
+    
+    while isinstance(expr, BinOp):
+        assert expr.operator == "+" and expr.right == Num(1, "int")
+        expr, depth = expr.left, depth + 1
+    
+    assert isinstance(expr, Var) and depth == DEPTH
+
+
+def test_deep_constant_parentheses_fold():
+    program = lower("int x = " + "(" * DEPTH + "1" + " + 1)" * DEPTH + ";")
+    assert program.body[0].value == Num(DEPTH + 1, "int")
+
+
+def test_precedence_inside_parentheses():
+    assignment = lower("int x = 1; x = 2 * (x + 3) - x % 2;").body[1]
+    assert isinstance(assignment, Assign)
+    assert assignment.value.operator == "-" and assignment.value.left.operator == "*" and assignment.value.left.right.operator == "+"
+
+
+def test_infinite_float_stored_in_int_is_left_to_run_time():
+    program = lower("int x = 1" + "0" * 400 + ".0; print(x);")
+    assert program.body[0].value == Num(float("inf"), "float")
+
+
+def test_fold_leaves_overflowing_operations():
+    program = lower("int x = 1" + "0" * 400 + " * 2.5; float y = 1" + "0" * 400 + ".0 - 1" + "0" * 400 + ".0; int z = 7.9;")
+    assert isinstance(program.body[0].value, BinOp)
+    assert isinstance(program.body[1].value, Num) and program.body[1].value.value != program.body[1].value.value
+    assert program.body[2].value == Num(7, "int")
+
+
+def test_cast_of_non_finite_floats():
+    for value in (float("inf"), float("-inf"), float("nan")):
+        with pytest.raises(OverflowError):
+            cast(value, "int")
+    
+    assert cast(3.9, "int") == 3 and cast(2, "float") == 2.0
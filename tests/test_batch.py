@@ -0,0 +1,17 @@
+import pytest
+from batch import compile_batch
+from benchmarks.generator import deep_nesting
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_deeply_nested_file_next_to_valid_files(tmp_path, workers):
+    paths = []
+    
+    for name, code in [("first.abdo", "int x = 1; print(x);"), ("deep.abdo", deep_nesting(1200, statements=1)),
+                       ("broken.abdo", "int x = ;"), ("last.abdo", "float y = 2.5; print(y);")]:
+        (tmp_path / name).write_text(code)
+        paths.append(str(tmp_path / name))
+    
+    results = compile_batch(paths, workers=workers, chunksize=1).results
+    assert [result.error is None for result in results] == [True, True, False, True]
+    assert results[1].tokens > 1200 * 5
@@ -0,0 +1,45 @@
+import io
+import os
+from compile_cache import CACHE_SUFFIX, CompileCache, compile_source
+from tree_serializer import write_text
+
+def text(tree) -> str:
+    """Returns: the text dump of a parsing tree."""
+    file = io.StringIO()
+    write_text(tree, file)
+    return file.getvalue()
+
+
+CODE = "int x = 1; float y = x * 2.5; if (x > 0) { int z = x; } print(y);"
+
+
+def test_hit_matches_fresh_compile(tmp_path):
+    fresh = compile_source(CODE)
+    CompileCache(str(tmp_path)).compile(CODE)
+    cache = CompileCache(str(tmp_path))
+    cached = cache.compile(CODE)
+    assert cache.hits == 1
+    assert cached.tokens == fresh.tokens
+    assert text(cached.tree) == text(fresh.tree)
+    assert cached.symbol_table.unordered_table.keys() == fresh.symbol_table.unordered_table.keys()
+
+
+def test_hit_without_tree(tmp_path):
+    CompileCache(str(tmp_path)).compile(CODE)
+    cached = CompileCache(str(tmp_path)).compile(CODE, tree=False)
+    assert cached.tree is None and cached.tokens == compile_source(CODE).tokens
+
+
+def test_errors_are_cached(tmp_path):
+    CompileCache(str(tmp_path)).compile("int x = ;")
+    cache = CompileCache(str(tmp_path))
+    assert cache.compile("int x = ;").error == compile_source("int x = ;").error
+    assert cache.hits == 1
+
+
+def test_eviction_keeps_the_cap(tmp_path):
+    cache = CompileCache(str(tmp_path), max_bytes=2000)
+    for number in range(50):
+        cache.compile(f"int x = {number}; print(x);")
+    sizes = [entry.stat().st_size for entry in os.scandir(tmp_path) if entry.name.endswith(CACHE_SUFFIX)]
+    assert cache.evictions > 0 and sum(sizes) == cache.size <= 2000
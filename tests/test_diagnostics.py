@@ -0,0 +1,31 @@
+import io
+import json
+from lexer import Diagnostic, Lexer
+from ll1_parser import PARSERS
+from main import compile_to_rows
+from row_writers import CsvWriter, JsonlWriter
+
+# The if statement misses its closing brace, so the error is at the end of the code.
+UNCLOSED = "int x = 1;\nif (x > 0) {\n    print(x);\n"
+
+
+def test_end_of_code_error_has_no_line():
+    for parser_class in PARSERS.values():
+        diagnostics = []
+        parser_class(Lexer(UNCLOSED).get_tokens(), diagnostics=diagnostics).parse()
+        assert diagnostics[-1].line_number is None
+        assert str(diagnostics[-1]).startswith("End of code: ")
+
+
+def test_errors_without_a_line_go_last():
+    diagnostics = [Diagnostic(None, "end"), Diagnostic(3, "three"), Diagnostic(1, "one")]
+    assert [diagnostic.message for diagnostic in sorted(diagnostics, key=Diagnostic.order)] == ["one", "three", "end"]
+
+
+def test_row_writers_write_no_line_the_same_way():
+    for recover in (False, True):
+        jsonl, csv = io.StringIO(), io.StringIO()
+        compile_to_rows(UNCLOSED, JsonlWriter(jsonl), recover)
+        compile_to_rows(UNCLOSED, CsvWriter(csv), recover)
+        assert json.loads(jsonl.getvalue().splitlines()[-1])["line_number"] is None
+        assert csv.getvalue().splitlines()[-1].startswith("diagnostic,,")
@@ -0,0 +1,14 @@
+from lexer import GROUP_TYPES, Lexer, build_master_pattern
+
+CODE = "# comment\nint x = 1;\nfloat y = x * 2.5;\nif (x >= 1) {\n    print(y);\n}\n"
+
+
+def test_building_the_pattern_again_leaves_the_module_state():
+    groups = dict(GROUP_TYPES)
+    pattern, group_types = build_master_pattern()
+    assert group_types == groups and group_types is not GROUP_TYPES and GROUP_TYPES == groups
+    assert set(group_types) <= set(pattern.groupindex)
+
+
+def test_single_pass_matches_line_by_line():
+    assert Lexer(CODE).get_tokens() == Lexer(CODE, single_pass=False).get_tokens()
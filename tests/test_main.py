@@ -0,0 +1,28 @@
+import pytest
+from instrumentation import Stats
+from main import compile_cached, compile_with_recovery, parse_arguments
+
+CODE = "int x = 1; float y = x * 2.5; print(y);"
+
+
+@pytest.mark.parametrize("options", [["--stream", "--tree-format", "json"], ["--stream", "--cache-dir", "cache"], ["--cache-dir", "cache", "--recover"],
+                                     ["--format", "csv", "--tree-format", "binary"]])
+def test_unsupported_option_combinations(options):
+    with pytest.raises(SystemExit):
+        parse_arguments(["compile", *options])
+
+
+def test_cached_compile_records_stats(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    stats = Stats()
+    compile_cached(CODE, str(tmp_path / "cache"), stats, "ll1", "json")
+    assert "cache" in stats.phases and stats.counters["cache_misses"] == 1
+    assert (tmp_path / "output_tree.json").exists()
+
+
+def test_recovery_records_stats(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    stats = Stats()
+    compile_with_recovery("int x = ;\nint y = 2;", stats=stats, tree_format="binary")
+    assert {"lexing", "parsing", "tree_writing"} <= stats.phases.keys() and stats.counters["diagnostics"] == 1
+    assert (tmp_path / "output_tree.bin").exists()
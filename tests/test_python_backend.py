@@ -0,0 +1,43 @@
+import math
+import pytest
+from main import run, transpile
+
+# A float literal product that overflows to inf when it's folded.
+OVERFLOW = " * ".join(["99999999.9"] * 45)
+
+
+def outputs(code: str) -> tuple[list, list]:
+    """Returns: the printed values of the transpiled program, and of the virtual machine."""
+    transpiled, machine = [], []
+    transpile(code)(transpiled.append)
+    run(code, machine.append)
+    return transpiled, machine
+
+
+def test_if_body_without_lines():
+    transpiled, machine = outputs("int x = 1; if (x > 0) { int y; } print(x);")
+    assert transpiled == machine == [1]
+
+
+def test_nested_if_body_without_lines():
+    transpiled, machine = outputs("int x = 1; if (x > 0) { if (x < 5) { float y; } } print(x);")
+    assert transpiled == machine == [1]
+
+
+def test_non_finite_folded_floats():
+    transpiled, machine = outputs(f"float a = {OVERFLOW}; print(a); float b = 0 - ({OVERFLOW}); print(b); float c = ({OVERFLOW}) - ({OVERFLOW}); print(c);")
+    assert transpiled[:2] == machine[:2] == [math.inf, -math.inf]
+    assert math.isnan(transpiled[2]) and math.isnan(machine[2])
+
+
+def test_long_sums_have_no_nested_parentheses():
+    for terms in (400, 5000):
+        values = []
+        transpile("int y = 1; int s = " + " + ".join(["y"] * terms) + "; print(s);")(values.append)
+        assert values == [terms]
+
+
+def test_infinite_float_stored_in_int_is_a_runtime_error():
+    for code in ("int x = 1" + "0" * 400 + ".0; print(x);", f"float f = {OVERFLOW}; int x = f - f; print(x);"):
+        with pytest.raises(OverflowError):
+            transpile(code)(print)
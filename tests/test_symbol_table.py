@@ -0,0 +1,27 @@
+from lexer import Lexer
+from symbol_table import HashSymbolTable, SymbolTable, TreeSymbolTable, display_names
+
+SHADOWED = "int b = 1;\nif (b > 0) {\n    float b = 2.5;\n}\nif (b > 0) {\n    int c = b;\n}\n"
+
+
+def symbol_table(code: str) -> SymbolTable:
+    return SymbolTable(Lexer(code).get_tokens())
+
+
+def test_local_names_print_without_their_scope():
+    table = symbol_table("int x = 1;\nif (x > 0) {\n    float b = 2.5;\n}\n")
+    assert list(table.unordered_table) == ["x", "b@1"]
+    assert display_names(table.unordered_table.items()) == {"x": "x", "b@1": "b"}
+
+
+def test_shadowed_names_print_their_scope():
+    table = symbol_table(SHADOWED)
+    assert display_names(table.unordered_table.items()) == {"b": "b", "b@1": "b@1", "c@2": "c"}
+    assert display_names(TreeSymbolTable(table.get_ids(), table.unordered_table).items())["c@2"] == "c"
+
+
+def test_hash_table_prints_names(capsys):
+    table = symbol_table(SHADOWED)
+    HashSymbolTable(table.get_ids(), table.unordered_table).print_hash_table()
+    printed = capsys.readouterr().out.split()
+    assert "c" in printed and "b@1" in printed and "c@2" not in printed
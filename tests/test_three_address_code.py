@@ -0,0 +1,32 @@
+import pytest
+from main import build_ast, lexical_analysis, run
+from three_address_code import IRBuilder, IRProgram, execute, optimize
+
+INFINITE = "1" + "0" * 400 + ".0"
+
+
+def build(code: str) -> IRProgram:
+    return IRBuilder().build(build_ast(lexical_analysis(code)))
+
+
+def test_long_sum():
+    program = build("int y = 1; int s = " + " + ".join(["y"] * 5000) + "; print(s);")
+    values = []
+    execute(program, values.append)
+    optimize(program)
+    execute(program, values.append)
+    assert values == [5000, 5000]
+
+
+@pytest.mark.parametrize("code", [f"int x = {INFINITE}; print(x);", f"float f = {INFINITE}; int x = f - f; print(x);",
+                                  f"float f = {INFINITE}; int x = f; float y = 1.5; print(y);"])
+def test_non_finite_float_stored_in_int(code):
+    with pytest.raises(OverflowError):
+        run(code, print)
+    
+    program = build(code)
+    optimize(program)
+    
+    # The cast is neither folded nor removed as a dead store.
+    with pytest.raises(OverflowError):
+        execute(program, print)
@@ -0,0 +1,19 @@
+from lexer import Lexer
+from token_buffer import MAX_COMPACT_OFFSET, TokenBuffer, offset_typecode
+
+CODE = "int x = 1;\nfloat y = x * 2.5;\nprint(y);"
+
+
+def test_buffer_tokens_match_lexer():
+    assert list(TokenBuffer(CODE)) == Lexer(CODE).get_tokens()
+
+
+def test_offset_typecode():
+    assert offset_typecode(MAX_COMPACT_OFFSET) == "I"
+    assert offset_typecode(MAX_COMPACT_OFFSET + 1) == "Q"
+
+
+def test_offsets_past_the_compact_limit():
+    buffer = TokenBuffer(CODE, offset=MAX_COMPACT_OFFSET)
+    assert buffer.starts.typecode == buffer.ends.typecode == buffer.lines.typecode == "Q"
+    assert buffer.starts[0] == MAX_COMPACT_OFFSET and buffer.ends[-1] == MAX_COMPACT_OFFSET + len(CODE)
@@ -0,0 +1,23 @@
+import pytest
+from main import main, run
+
+INFINITE = "1" + "0" * 400 + ".0"
+
+
+def test_long_sum():
+    values = []
+    run("int y = 1; int s = " + " + ".join(["y"] * 5000) + "; print(s);", values.append)
+    assert values == [5000]
+
+
+@pytest.mark.parametrize("code", [f"int x = {INFINITE}; print(x);", f"float f = {INFINITE}; int x = f - f; print(x);"])
+def test_non_finite_float_stored_in_int(code):
+    with pytest.raises(OverflowError):
+        run(code)
+
+
+def test_run_reports_the_runtime_error(tmp_path, capsys):
+    path = tmp_path / "overflow.abdo"
+    path.write_text(f"float f = {INFINITE};\nint x = f;\nprint(x);\n")
+    main(["run", str(path)])
+    assert capsys.readouterr().out == "⚠️  Runtime Error, a value doesn't fit in its data type!\n"
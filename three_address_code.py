@@ -0,0 +1,465 @@
+import time
+from abstract_syntax_tree import *
+from dataclasses import dataclass, field
+from itertools import takewhile
+from symbol_table import SymbolTableEntry
+from typing import Callable, Iterable
+
+# Opcodes of the instructions.
+COPY, CAST, BINARY, PRINT, JUMP_IF_FALSE, LABEL = "copy", "cast", "binary", "print", "jump_if_false", "label"
+
+# The operators that give the same value with their operands swapped.
+COMMUTATIVE_OPERATORS = ("+", "*", "==", "!=")
+
+
+@dataclass(frozen=True)
+class Const:
+    """A constant operand."""
+    value: int | float
+    data_type: str
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+# A variable or temporary name, or a constant.
+Operand = str | Const
+
+
+@dataclass
+class Instruction:
+    """A three address instruction, like `x = a + b`. The operands are
+    names or constants, and only the fields of the opcode are set."""
+    opcode: str
+    target: str = None # The assigned variable or temporary.
+    left: Operand = None
+    right: Operand = None
+    operator: str = None
+    data_type: str = None # The type of a binary operation, or of a cast.
+    label: int = None
+
+    def __str__(self) -> str:
+        if self.opcode == COPY: return f"{self.target} = {self.left}"
+        if self.opcode == CAST: return f"{self.target} = ({self.data_type}) {self.left}"
+        if self.opcode == BINARY: return f"{self.target} = {self.left} {self.operator} {self.right}"
+        if self.opcode == PRINT: return f"print {self.left}"
+        if self.opcode == JUMP_IF_FALSE: return f"if not {self.left} goto L{self.label}"
+        return f"L{self.label}:"
+
+    def uses(self) -> list[str]:
+        """Returns: the names the instruction reads."""
+        return [operand for operand in (self.left, self.right) if operand.__class__ is str]
+
+    def may_fail(self) -> bool:
+        """Returns: whether running it can raise an error, a division by a
+        value that isn't a known non zero constant, or a cast of a value that
+        isn't a known constant the data type can hold. It's never removed."""
+        if self.opcode == CAST:
+            if not isinstance(self.left, Const): return True
+            
+            try:
+                cast(self.left.value, self.data_type)
+            except OverflowError:
+                return True
+            
+            return False
+        
+        return self.operator in ("/", "%") and not (isinstance(self.right, Const) and self.right.value != 0)
+
+
+@dataclass
+class IRProgram:
+    """Used to save the instructions of a program, with the data type of
+    each variable and temporary, and the symbol table entry of each variable."""
+    instructions: list[Instruction] = field(default_factory=list)
+    types: dict[str, str] = field(default_factory=dict)
+    variables: dict[str, SymbolTableEntry] = field(default_factory=dict)
+
+    def dump(self) -> str:
+        """Returns: the instructions as text, a line for each one."""
+        return "\n".join(str(instruction) if instruction.opcode == LABEL else f"    {instruction}" for instruction in self.instructions)
+
+
+class IRBuilder:
+    def __init__(self) -> None:
+        """Initialize the counters of the temporaries and the labels."""
+        self.program: IRProgram = IRProgram()
+        self.temporaries: int = 0
+        self.labels: int = 0
+
+
+    def build(self, program: Program) -> IRProgram:
+        """Lower the abstract syntax tree into three address instructions.
+        The variables keep their names from the symbol table, the values in
+        between are stored in temporaries named like `$t1`, which no
+        variable can be named.
+        
+        Args:
+            program (Program): The program, better after constant folding.
+        
+        Returns:
+            IRProgram: The instructions.
+        """
+        for stmt in program.body:
+            self.lower_stmt(stmt)
+        
+        return self.program
+
+
+    def emit(self, instruction: Instruction):
+        self.program.instructions.append(instruction)
+
+
+    def variable(self, var: Var) -> str:
+        """Returns: the name of the variable after recording it."""
+        self.program.variables[var.name] = var.entry
+        self.program.types[var.name] = var.data_type
+        return var.name
+
+
+    def temporary(self, data_type: str) -> str:
+        """Returns: the name of a new temporary."""
+        self.temporaries += 1
+        name = f"$t{self.temporaries}"
+        self.program.types[name] = data_type
+        return name
+
+
+    def lower_stmt(self, stmt: Stmt):
+        """Lower a single statement.
+        
+        Args:
+            stmt (Stmt): The statement.
+        """
+        if isinstance(stmt, (Decl, Assign)):
+            target = self.variable(stmt.target)
+            data_type = stmt.target.data_type
+            
+            # A variable declared without a value is zero.
+            value = stmt.value if stmt.value is not None else Num(cast(0, data_type), data_type)
+            
+            if value.data_type != data_type:
+                self.emit(Instruction(CAST, target, self.lower_expr(value), data_type=data_type))
+            elif isinstance(value, (BinOp, RelOp)):
+                self.lower_binary(value, target)
+            else:
+                self.emit(Instruction(COPY, target, self.lower_expr(value)))
+        elif isinstance(stmt, Print):
+            self.emit(Instruction(PRINT, left=self.variable(stmt.value)))
+        elif isinstance(stmt, If):
+            self.labels += 1
+            label = self.labels
+            self.emit(Instruction(JUMP_IF_FALSE, left=self.lower_expr(stmt.condition), label=label))
+            
+            for body_stmt in stmt.body:
+                self.lower_stmt(body_stmt)
+            
+            self.emit(Instruction(LABEL, label=label))
+
+
+    def lower_expr(self, expr: Expr) -> Operand:
+        """Returns: the operand with the value of the expression, its
+        operations are stored in temporaries."""
+        if isinstance(expr, Num): return Const(expr.value, expr.data_type)
+        if isinstance(expr, Var): return self.variable(expr)
+        return self.lower_binary(expr, self.temporary(expr.data_type))
+
+
+    def lower_binary(self, expr: BinOp | RelOp, target: str) -> str:
+        """Store the operation in the target, and the operations of its
+        operands in new temporaries. They are visited in postorder with an
+        explicit stack, like the constant folder does, so long expressions
+        don't hit the recursion limit. A temporary is made when its
+        operation is first visited, so they are numbered in preorder.
+
+        Returns:
+            str: The target.
+        """
+        operands: list[Operand] = []
+        stack: list[tuple[Expr, str]] = [(expr, None)]
+        
+        while stack:
+            node, holder = stack.pop()
+            
+            if isinstance(node, Num):
+                operands.append(Const(node.value, node.data_type))
+            elif isinstance(node, Var):
+                operands.append(self.variable(node))
+            elif holder is None:
+                holder = target if node is expr else self.temporary(node.data_type)
+                stack.extend(((node, holder), (node.right, None), (node.left, None)))
+            else:
+                right = operands.pop()
+                self.emit(Instruction(BINARY, holder, operands[-1], right, node.operator, node.data_type))
+                operands[-1] = holder
+        
+        return target
+
+
+def eliminate_common_subexpressions(program: IRProgram) -> int:
+    """Replace an operation with a copy of an earlier variable or temporary
+    that holds the same operation of the same operands. The operations are
+    forgotten when an operand or their holder is assigned, and at each
+    label, because another path joins there.
+    
+    Returns:
+        int: The number of replaced operations.
+    """
+    available: dict[tuple, str] = {}
+    dependents: dict[str, list[tuple]] = {} # The operations on each name, or held by it.
+    replaced = 0
+    
+    for index, instruction in enumerate(program.instructions):
+        if instruction.opcode == LABEL:
+            available.clear()
+            dependents.clear()
+            continue
+        
+        target = instruction.target
+        if target is None: continue
+        
+        key = None
+        
+        if instruction.opcode == BINARY:
+            operands = (instruction.left, instruction.right)
+            if instruction.operator in COMMUTATIVE_OPERATORS: operands = tuple(sorted(operands, key=repr))
+            key = (instruction.operator, instruction.data_type, *operands)
+            
+            holder = available.get(key)
+            
+            if holder is not None and holder != target:
+                program.instructions[index] = Instruction(COPY, target, holder)
+                replaced += 1
+        
+        # The assignment changes the value of the operations on the target.
+        for stale in dependents.pop(target, ()):
+            available.pop(stale, None)
+        
+        if key is not None and target not in key[2:]:
+            available[key] = target
+            
+            for name in (target, *key[2:]):
+                if name.__class__ is str: dependents.setdefault(name, []).append(key)
+    
+    return replaced
+
+
+def propagate_copies(program: IRProgram) -> int:
+    """Replace the uses of a copied name with the copied operand, so the
+    copy itself can be removed as a dead store. An operation or a cast of
+    constants becomes a copy of its value, that's propagated too, and a
+    jump on a constant is resolved, a false one removes the code it skips.
+    The copies are forgotten when either side is assigned, and at each label.
+    
+    Returns:
+        int: The number of replaced operands and folded instructions.
+    """
+    copies: dict[str, Operand] = {}
+    copied_to: dict[str, list[str]] = {} # The names copied from each name.
+    kept = []
+    skip_to = None # The label ending the code that never runs.
+    replaced = 0
+    
+    for instruction in program.instructions:
+        if skip_to is not None:
+            if instruction.opcode != LABEL or instruction.label != skip_to: continue
+            skip_to = None
+        
+        if instruction.opcode == LABEL:
+            copies.clear()
+            copied_to.clear()
+            kept.append(instruction)
+            continue
+        
+        if instruction.left in copies:
+            instruction.left = copies[instruction.left]
+            replaced += 1
+        
+        if instruction.right in copies:
+            instruction.right = copies[instruction.right]
+            replaced += 1
+        
+        if instruction.opcode == JUMP_IF_FALSE and isinstance(instruction.left, Const):
+            if not instruction.left.value: skip_to = instruction.label
+            replaced += 1
+            continue
+        
+        kept.append(instruction)
+        target = instruction.target
+        if target is None: continue
+        
+        if instruction.opcode == BINARY and isinstance(instruction.left, Const) and isinstance(instruction.right, Const) and not instruction.may_fail():
+            try:
+                value = apply_operator(instruction.operator, instruction.left.value, instruction.right.value, instruction.data_type)
+            except OverflowError:
+                # An int too large for a float, leave it to fail at run time.
+                pass
+            else:
+                instruction = kept[-1] = Instruction(COPY, target, Const(value, instruction.data_type))
+                replaced += 1
+        elif instruction.opcode == CAST and not instruction.may_fail():
+            instruction = kept[-1] = Instruction(COPY, target, Const(cast(instruction.left.value, instruction.data_type), instruction.data_type))
+            replaced += 1
+        
+        copies.pop(target, None)
+        
+        for name in copied_to.pop(target, ()):
+            if copies.get(name) == target: del copies[name]
+        
+        if instruction.opcode == COPY and instruction.left != target:
+            copies[target] = instruction.left
+            if instruction.left.__class__ is str: copied_to.setdefault(instruction.left, []).append(target)
+    
+    program.instructions = kept
+    return replaced
+
+
+def eliminate_dead_stores(program: IRProgram) -> int:
+    """Remove the assignments whose value is never read, the jumps over no
+    code and the labels without jumps. The values read are found by the
+    liveness of the names in a single backward pass, it's enough because
+    the jumps only go forward, so the names live at a label are known
+    before reaching its jumps. Only the printed values and the failing
+    divisions are observable.
+    
+    Returns:
+        int: The number of removed instructions.
+    """
+    live: set[str] = set()
+    live_at_label: dict[int, set[str]] = {}
+    kept = []
+    
+    for instruction in reversed(program.instructions):
+        opcode = instruction.opcode
+        
+        if opcode == LABEL:
+            live_at_label[instruction.label] = set(live)
+        elif opcode == JUMP_IF_FALSE:
+            # A jump over no code only reads its condition.
+            if any(following.label == instruction.label for following in takewhile(lambda following: following.opcode == LABEL, reversed(kept))): continue
+            live |= live_at_label[instruction.label]
+        elif instruction.target is not None:
+            if instruction.target not in live and not instruction.may_fail(): continue
+            live.discard(instruction.target)
+        
+        live.update(instruction.uses())
+        kept.append(instruction)
+    
+    jumped = {instruction.label for instruction in kept if instruction.opcode == JUMP_IF_FALSE}
+    kept = [instruction for instruction in reversed(kept) if instruction.opcode != LABEL or instruction.label in jumped]
+    
+    removed = len(program.instructions) - len(kept)
+    program.instructions = kept
+    return removed
+
+
+def remove_unused_declarations(program: IRProgram) -> int:
+    """Remove the variables that are never referenced after their
+    declaration, their symbol table entries have no reference lines, and
+    the variables that no instruction mentions anymore.
+    
+    Returns:
+        int: The number of removed variables.
+    """
+    unused = {name for name, entry in program.variables.items() if not entry.reference_lines}
+    program.instructions = [instruction for instruction in program.instructions if instruction.target not in unused or instruction.may_fail()]
+    
+    mentioned = {name for instruction in program.instructions for name in (instruction.target, *instruction.uses())}
+    removed = [name for name in program.variables if name not in mentioned]
+    
+    for name in removed:
+        del program.variables[name]
+    
+    return len(removed)
+
+
+# The passes by their names, each one returns the number of things it changed.
+PASSES: dict[str, Callable[[IRProgram], int]] = {
+    "unused_declarations": remove_unused_declarations,
+    "cse": eliminate_common_subexpressions,
+    "copy_propagation": propagate_copies,
+    "dead_stores": eliminate_dead_stores,
+}
+DEFAULT_PIPELINE = ("unused_declarations", "cse", "copy_propagation", "dead_stores", "unused_declarations")
+
+
+@dataclass
+class PassReport:
+    """Used to save what a pass did."""
+    name: str
+    removed: int # Instructions removed.
+    changed: int # What the pass counts, like the replaced operands.
+    seconds: float
+
+
+def optimize(program: IRProgram, pipeline: Iterable[str] = DEFAULT_PIPELINE) -> list[PassReport]:
+    """Run the passes in order on the program, a pass can run more than
+    once.
+    
+    Args:
+        program (IRProgram): The program, it's changed in place.
+        pipeline (Iterable[str], optional): Names from `PASSES`. Defaults
+        to DEFAULT_PIPELINE.
+    
+    Raises:
+        ValueError: If a pass name isn't in `PASSES`.
+    
+    Returns:
+        list[PassReport]: A report for each pass.
+    """
+    pipeline = list(pipeline)
+    unknown = [name for name in pipeline if name not in PASSES]
+    if unknown: raise ValueError(f"Unknown pass <{unknown[0]}>, expected one of {', '.join(PASSES)}")
+    
+    reports = []
+    
+    for name in pipeline:
+        before = len(program.instructions)
+        start = time.perf_counter()
+        changed = PASSES[name](program)
+        reports.append(PassReport(name, before - len(program.instructions), changed, time.perf_counter() - start))
+    
+    return reports
+
+
+def execute(program: IRProgram, output: Callable[[int | float], None] = print) -> int:
+    """Run the instructions, with the same semantics as the virtual machine.
+    
+    Args:
+        program (IRProgram): The program.
+        output (Callable, optional): Called with each printed value. Defaults to print.
+    
+    Raises:
+        ZeroDivisionError: If dividing by zero.
+        OverflowError: If an infinite or NaN float is stored in an int, or
+        an int too large for a float is used as one.
+    
+    Returns:
+        int: The number of executed instructions.
+    """
+    instructions = program.instructions
+    labels = {instruction.label: index for index, instruction in enumerate(instructions) if instruction.opcode == LABEL}
+    memory = {name: cast(0, data_type) for name, data_type in program.types.items()}
+    value = lambda operand: operand.value if operand.__class__ is Const else memory[operand]
+    index = executed = 0
+    
+    while index < len(instructions):
+        instruction = instructions[index]
+        opcode = instruction.opcode
+        executed += 1
+        index += 1
+        
+        if opcode == BINARY:
+            memory[instruction.target] = apply_operator(instruction.operator, value(instruction.left), value(instruction.right), instruction.data_type)
+        elif opcode == COPY:
+            memory[instruction.target] = value(instruction.left)
+        elif opcode == CAST:
+            memory[instruction.target] = cast(value(instruction.left), instruction.data_type)
+        elif opcode == PRINT:
+            output(value(instruction.left))
+        elif opcode == JUMP_IF_FALSE:
+            if not value(instruction.left): index = labels[instruction.label]
+        else:
+            executed -= 1 # Labels aren't executed.
+    
+    return executed
@@ -0,0 +1,150 @@
+import sys
+from array import array
+from lexer import GROUP_TYPES, MASTER_PATTERN, Diagnostic, Token
+from tokens import *
+from typing import Iterator
+
+# The token type of each kind. The reserved words have a kind each after
+# the token types, so a keyword is told apart without its lexeme.
+KIND_TYPES = (*TOKENS, EOF, *RESERVED_WORDS.values())
+TYPE_KINDS = {token_type: kind for kind, token_type in enumerate(KIND_TYPES[:len(TOKENS) + 1])}
+WORD_KINDS = {word: kind for kind, word in enumerate(RESERVED_WORDS, start=len(TOKENS) + 1)}
+ID_KIND = TYPE_KINDS[ID]
+
+# The kind of each named group in the master pattern.
+GROUP_KINDS = {group: TYPE_KINDS[token_type] for group, token_type in GROUP_TYPES.items()}
+
+# The largest offset or line number of an "I" column, larger sources use "Q" columns.
+MAX_COMPACT_OFFSET = (1 << 8 * array("I").itemsize) - 1
+
+
+def offset_typecode(size: int) -> str:
+    """Returns: the typecode of the offset and line columns of a source,
+    from a bound of its offsets and line numbers."""
+    return "I" if size <= MAX_COMPACT_OFFSET else "Q"
+
+
+class TokenBuffer:
+    def __init__(self, code: str, first_line: int = 1, diagnostics: list[Diagnostic] = None, max_diagnostics: int = 100, offset: int = 0) -> None:
+        """Scan the source code into parallel columns instead of a Token
+        object per lexeme, the token with index i is described by the i-th
+        item of each column. The lexemes are sliced from the code only when
+        they are needed, and the identifiers are interned so the same name
+        is a single string.
+        
+        Iterating the buffer or indexing it gives Token objects, so it can
+        be used wherever a list of tokens is. It saves memory, not time: the
+        parsers build the Token objects of the tree leaves while they parse,
+        so parsing a buffer is slower than parsing a list of tokens.
+        
+        Args:
+            code (str): Source code.
+            first_line (int, optional): Line number of the first line. Defaults to 1.
+            diagnostics (list[Diagnostic], optional): If given, unrecognized
+            lexemes are skipped and added to it instead of raising an error.
+            max_diagnostics (int, optional): Stop adding diagnostics when the
+            list has that many. Defaults to 100.
+            offset (int, optional): Where the code starts in a larger source,
+            the offsets of the tokens are counted from there. Used to scan a
+            chunk of the source, its columns are then joined with `from_columns`.
+            Defaults to 0.
+        
+        Raises:
+            SyntaxError: If there is a lexeme not matched with any token regex.
+        """
+        # The offsets are under the end of the code, and the line numbers
+        # under its first line plus its length.
+        typecode = offset_typecode(offset + first_line + len(code))
+        self.code: str = code
+        self.kinds: array = array("B")
+        self.starts: array = array(typecode)
+        self.ends: array = array(typecode)
+        self.lines: array = array(typecode)
+        self.scan(first_line, offset, diagnostics, max_diagnostics)
+
+
+    @classmethod
+    def from_columns(cls, code: str, kinds: array, starts: array, ends: array, lines: array) -> "TokenBuffer":
+        """Returns: a buffer of already scanned columns, their offsets are
+        in the code."""
+        buffer = cls.__new__(cls)
+        buffer.code, buffer.kinds, buffer.starts, buffer.ends, buffer.lines = code, kinds, starts, ends, lines
+        return buffer
+
+
+    def scan(self, line_number: int, offset: int, diagnostics: list[Diagnostic], max_diagnostics: int):
+        """Fill the columns with a single pass of the master pattern, like
+        `scan_tokens` but without building the lexemes."""
+        append_kind, append_start, append_end, append_line = self.kinds.append, self.starts.append, self.ends.append, self.lines.append
+        
+        for match in MASTER_PATTERN.finditer(self.code):
+            group = match.lastgroup
+            
+            if group == "WORD":
+                kind = WORD_KINDS.get(match.group(), ID_KIND)
+            elif group == "NEWLINE":
+                line_number += 1
+                continue
+            elif group == "MISMATCH":
+                # Found a lexeme that doesn't match with any type.
+                message = f"⚠️  Lexical Error, unrecognized token: <{match.group()}>! Please follow the language rules."
+                if diagnostics is None: raise SyntaxError(message)
+                
+                if len(diagnostics) < max_diagnostics:
+                    diagnostics.append(Diagnostic(line_number, message, found=match.group()))
+                continue
+            elif group == "COMMENT":
+                continue
+            else:
+                kind = GROUP_KINDS[group]
+            
+            start, end = match.span()
+            append_kind(kind)
+            append_start(start + offset)
+            append_end(end + offset)
+            append_line(line_number)
+
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+
+    def __getitem__(self, index: int) -> Token:
+        return Token(self.lexeme(index), KIND_TYPES[self.kinds[index]], self.lines[index])
+
+
+    def __iter__(self) -> Iterator[Token]:
+        code, intern = self.code, sys.intern
+        
+        for kind, start, end, line_number in zip(self.kinds, self.starts, self.ends, self.lines):
+            lexeme = code[start:end]
+            yield Token(intern(lexeme) if kind == ID_KIND else lexeme, KIND_TYPES[kind], line_number)
+
+
+    def lexeme(self, index: int) -> str:
+        """Returns: the lexeme of a token, sliced from the code."""
+        lexeme = self.code[self.starts[index]:self.ends[index]]
+        return sys.intern(lexeme) if self.kinds[index] == ID_KIND else lexeme
+
+
+    def lexemes(self, token_type: str) -> Iterator[str]:
+        """Yields: the lexemes of the tokens of a type in order, without
+        building their tokens. The kinds are searched as bytes, so the
+        reserved words aren't found by their token type."""
+        kinds, kind = self.kinds.tobytes(), TYPE_KINDS[token_type]
+        index = kinds.find(kind)
+        
+        while index != -1:
+            yield self.lexeme(index)
+            index = kinds.find(kind, index + 1)
+
+
+    def token_type(self, index: int) -> str:
+        """Returns: the token type of a token."""
+        return KIND_TYPES[self.kinds[index]]
+
+
+    @property
+    def nbytes(self) -> int:
+        """Returns: the bytes of the columns, without the code."""
+        return sum(column.itemsize * len(column) for column in (self.kinds, self.starts, self.ends, self.lines))
@@ -31,3 +31,12 @@ TOKENS = {
     SEMICOLON: r"\;",
     COMMENT: r"#[^#]*"
 }
+
+
+# Reserved words, they are scanned as IDs and then resolved with a dict lookup.
+RESERVED_WORDS = {
+    "if": KEYWORD,
+    "print": KEYWORD,
+    "int": DATA_TYPE,
+    "float": DATA_TYPE
+}
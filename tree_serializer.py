@@ -0,0 +1,305 @@
+import gc
+import sys
+from array import array
+from itertools import repeat
+from json.encoder import encode_basestring
+from lexer import Token
+from simple_parser import NODE_TITLES, TOKEN_NODE, ParsingTreeNode, TreeBuilder
+from typing import BinaryIO, Iterator, TextIO
+
+# Written first in a binary tree file, the last byte is the format version.
+BINARY_MAGIC = b"ABDT\x01"
+
+# Lines or JSON pieces kept before writing them at once.
+BUFFER_SIZE = 1 << 14
+
+
+def write_text(root: ParsingTreeNode, file: TextIO, level: int = 0, buffer_size: int = BUFFER_SIZE):
+    """Write the tree in the indented text format, each node in a line
+    with a tab for each level. The nodes are visited with an explicit stack,
+    so deep trees don't hit the recursion limit, and the lines are written
+    in large pieces instead of one by one.
+    
+    Args:
+        root (ParsingTreeNode): The tree root, or any node with the same
+        `kind`, `token` and `children`, like an `ArenaNodeView`.
+        file (TextIO): Where the tree is written.
+        level (int, optional): The level of the root. Defaults to 0.
+        buffer_size (int, optional): Lines kept before writing them.
+    """
+    indents = ["\t" * level]
+    lines = [f"{indents[0]}{root.title}\n"]
+    
+    # The children iterators of the open nodes, the depth of a node
+    # is the stack size.
+    stack = [iter(root.children)]
+    
+    while stack:
+        depth = len(stack)
+        
+        if depth >= len(indents):
+            indents.append(indents[-1] + "\t")
+        
+        indent = indents[depth]
+        
+        for node in stack[-1]:
+            if node.kind == TOKEN_NODE:
+                token = node.token
+                lines.append(f"{indent}{token.token_type}({token.lexeme})\n")
+            else:
+                # Go on with the node children, then with its siblings.
+                lines.append(f"{indent}{NODE_TITLES[node.kind]}\n")
+                stack.append(iter(node.children))
+                break
+        else:
+            stack.pop()
+        
+        if len(lines) >= buffer_size:
+            file.write("".join(lines))
+            lines.clear()
+    
+    file.write("".join(lines))
+
+
+def write_json(root: ParsingTreeNode, file: TextIO, buffer_size: int = BUFFER_SIZE):
+    """Write the tree as JSON while walking it, without building it as
+    dicts first. A node is `{"node": title, "children": [...]}` and a token
+    is `{"type": ..., "lexeme": ..., "line": ...}`.
+    
+    Args:
+        root (ParsingTreeNode): The tree root.
+        file (TextIO): Where the tree is written.
+        buffer_size (int, optional): Pieces kept before writing them.
+    """
+    # Each string is escaped only once.
+    strings: dict[str, str] = {}
+    pieces = []
+    
+    # A string item in the stack is written as it is, it closes a node
+    # or separates two children.
+    stack = [root]
+    pop, push = stack.pop, stack.extend
+    
+    while stack:
+        node = pop()
+        
+        if isinstance(node, str):
+            pieces.append(node)
+        elif node.kind == TOKEN_NODE:
+            token = node.token
+            token_type = strings.get(token.token_type) or strings.setdefault(token.token_type, encode_basestring(token.token_type))
+            lexeme = strings.get(token.lexeme) or strings.setdefault(token.lexeme, encode_basestring(token.lexeme))
+            pieces.append(f'{{"type": {token_type}, "lexeme": {lexeme}, "line": {token.line_number}}}')
+        else:
+            pieces.append(f'{{"node": "{NODE_TITLES[node.kind]}", "children": [')
+            children = node.children
+            items = ["]}"]
+            
+            for child in reversed(children):
+                items.append(child)
+                items.append(", ")
+            
+            items.pop()
+            push(items if children else ["]}"])
+        
+        if len(pieces) >= buffer_size:
+            file.write("".join(pieces))
+            pieces.clear()
+    
+    pieces.append("\n")
+    file.write("".join(pieces))
+
+
+def write_section(file: BinaryIO, column: array | bytes):
+    """Write a column prefixed with its length in items, the arrays are
+    written in little endian."""
+    if isinstance(column, array) and sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    
+    file.write(len(column).to_bytes(4, "little"))
+    file.write(column if isinstance(column, bytes) else column.tobytes())
+
+
+def write_binary(root: ParsingTreeNode, file: BinaryIO):
+    """Write the tree in the compact binary format. The nodes are stored
+    in preorder as columns: the kinds, the number of children of each node,
+    and for the token nodes the token type, lexeme and line. The types and
+    lexemes are indices in a string table, so each string is stored once.
+    
+    Args:
+        root (ParsingTreeNode): The tree root.
+        file (BinaryIO): Where the tree is written.
+    """
+    strings: dict[str, int] = {}
+    kinds, child_counts = array("B"), array("I")
+    types, lexemes, lines = array("I"), array("I"), array("I")
+    stack = [root]
+    pop, push = stack.pop, stack.extend
+    
+    while stack:
+        node = pop()
+        kinds.append(node.kind)
+        
+        if node.kind == TOKEN_NODE:
+            token = node.token
+            child_counts.append(0)
+            types.append(strings.setdefault(token.token_type, len(strings)))
+            lexemes.append(strings.setdefault(token.lexeme, len(strings)))
+            lines.append(token.line_number)
+        else:
+            children = node.children
+            child_counts.append(len(children))
+            push(reversed(children))
+    
+    # The string table is the length of each string and then all of
+    # them encoded together.
+    file.write(BINARY_MAGIC)
+    write_section(file, array("I", map(len, strings)))
+    write_section(file, "".join(strings).encode())
+    
+    for column in (kinds, child_counts, types, lexemes, lines):
+        write_section(file, column)
+
+
+def read_section(data: memoryview, offset: int, typecode: str = None) -> tuple[array | bytes, int]:
+    """Read a column written by `write_section`.
+    
+    Returns:
+        tuple[array | bytes, int]: The column, and the offset after it.
+    """
+    count = int.from_bytes(data[offset:offset + 4], "little")
+    offset += 4
+    
+    if typecode is None:
+        return bytes(data[offset:offset + count]), offset + count
+    
+    column = array(typecode)
+    size = count * column.itemsize
+    column.frombytes(data[offset:offset + size])
+    if sys.byteorder == "big": column.byteswap()
+    return column, offset + size
+
+
+def read_binary(file: BinaryIO) -> tuple[array, array, Iterator[Token]]:
+    """Read the columns of a tree written by `write_binary`.
+    
+    Raises:
+        ValueError: If the file isn't a binary tree file.
+    
+    Returns:
+        tuple[array, array, Iterator[Token]]: The kinds and the number of
+        children of the nodes in preorder, and the tokens of the leaves.
+    """
+    data = memoryview(file.read())
+    
+    if data[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise ValueError("Not a binary parsing tree file")
+    
+    offset = len(BINARY_MAGIC)
+    lengths, offset = read_section(data, offset, "I")
+    encoded, offset = read_section(data, offset)
+    kinds, offset = read_section(data, offset, "B")
+    child_counts, offset = read_section(data, offset, "I")
+    types, offset = read_section(data, offset, "I")
+    lexemes, offset = read_section(data, offset, "I")
+    lines, offset = read_section(data, offset, "I")
+    
+    # Split the string table.
+    text = encoded.decode()
+    strings, start = [], 0
+    
+    for length in lengths:
+        strings.append(text[start:start + length])
+        start += length
+    
+    return kinds, child_counts, map(Token, map(strings.__getitem__, lexemes), map(strings.__getitem__, types), lines)
+
+
+def load_tokens(file: BinaryIO) -> list[Token]:
+    """Returns: the tokens of the leaves of a binary tree file in order,
+    they are all the tokens of the code, without building the tree."""
+    return list(read_binary(file)[2])
+
+
+def load_binary(file: BinaryIO, builder: TreeBuilder = None, tokens: list[Token] = None) -> ParsingTreeNode:
+    """Rebuild a tree written by `write_binary`, the columns are read at
+    once so no token is lexed or parsed again.
+    
+    Args:
+        file (BinaryIO): The binary tree file.
+        builder (TreeBuilder, optional): Where the tree nodes are stored.
+        Defaults to ParsingTreeNode objects.
+        tokens (list[Token], optional): If given, the tokens of the leaves
+        are added to it in order, they are all the tokens of the code.
+    
+    Raises:
+        ValueError: If the file isn't a binary tree file.
+    
+    Returns:
+        ParsingTreeNode: The tree root.
+    """
+    kinds, child_counts, leaf_tokens = read_binary(file)
+    
+    if tokens is not None:
+        first = len(tokens)
+        tokens.extend(leaf_tokens)
+        leaf_tokens = iter(tokens[first:])
+    
+    if builder is None:
+        # The garbage collector would scan the new nodes again and again
+        # while millions of them are created, and they have no cycles.
+        enabled = gc.isenabled()
+        gc.disable()
+        
+        try:
+            return build_objects(kinds, child_counts, leaf_tokens)
+        finally:
+            if enabled: gc.enable()
+    
+    new_node, new_leaf, add_child = builder.node, builder.leaf, builder.add_child
+    
+    # The open nodes, with the number of children they still miss.
+    root = parent = new_node(kinds[0])
+    missing = child_counts[0]
+    stack = []
+    
+    for kind, child_count in zip(kinds[1:], child_counts[1:]):
+        while not missing:
+            parent, missing = stack.pop()
+        
+        child = new_leaf(next(leaf_tokens)) if kind == TOKEN_NODE else new_node(kind)
+        add_child(parent, child)
+        missing -= 1
+        
+        if child_count:
+            stack.append((parent, missing))
+            parent, missing = child, child_count
+    
+    return builder.tree(root)
+
+
+def build_objects(kinds: array, child_counts: array, tokens: Iterator[Token]) -> ParsingTreeNode:
+    """Build the ParsingTreeNode objects of the preorder columns, the
+    children lists are sliced at once from the nodes after them.
+
+    Returns:
+        ParsingTreeNode: The tree root.
+    """
+    leaves = map(ParsingTreeNode, repeat(TOKEN_NODE), tokens)
+    nodes = [next(leaves) if kind == TOKEN_NODE else ParsingTreeNode(kind) for kind in kinds]
+    
+    # Going backward, the children of a node are on top of the stack,
+    # the first child is the last one pushed.
+    stack = []
+    
+    for node, child_count in zip(reversed(nodes), reversed(child_counts)):
+        if child_count:
+            children = stack[-child_count:]
+            del stack[-child_count:]
+            children.reverse()
+            node.children = children
+        
+        stack.append(node)
+    
+    return stack[0]
@@ -0,0 +1,266 @@
+from array import array
+from dataclasses import dataclass
+from abstract_syntax_tree import *
+from memory_layout import MemoryLayout
+from typing import Callable
+
+# Opcodes, the ones in the second group take one operand after them.
+ADD, SUB, MUL, INT_DIV, INT_MOD, FLOAT_DIV, FLOAT_MOD, LT, GT, LE, GE, EQ, NE = range(13)
+PUSH, LOAD, STORE, STORE_INT, STORE_FLOAT, PRINT, JUMP_IF_FALSE = range(13, 20)
+
+OPCODE_NAMES = (
+    "ADD", "SUB", "MUL", "INT_DIV", "INT_MOD", "FLOAT_DIV", "FLOAT_MOD", "LT", "GT", "LE", "GE", "EQ", "NE",
+    "PUSH", "LOAD", "STORE", "STORE_INT", "STORE_FLOAT", "PRINT", "JUMP_IF_FALSE"
+)
+
+ARITHMETIC_OPCODES = {
+    (INT, "+"): ADD, (INT, "-"): SUB, (INT, "*"): MUL, (INT, "/"): INT_DIV, (INT, "%"): INT_MOD,
+    (FLOAT, "+"): ADD, (FLOAT, "-"): SUB, (FLOAT, "*"): MUL, (FLOAT, "/"): FLOAT_DIV, (FLOAT, "%"): FLOAT_MOD
+}
+RELATIONAL_OPCODES = {"<": LT, ">": GT, "<=": LE, ">=": GE, "==": EQ, "!=": NE}
+
+
+@dataclass
+class Bytecode:
+    """Used to save a compiled program."""
+    code: array
+    constants: list[int | float]
+    memory: list[int | float] # The initial value of each address.
+    names: dict[int, str] # The variable name of each used address.
+
+    def disassemble(self) -> list[str]:
+        """Returns: a readable line for each instruction."""
+        lines = []
+        pc = 0
+        
+        while pc < len(self.code):
+            opcode = self.code[pc]
+            
+            if opcode < PUSH:
+                lines.append(f"{pc:>6} {OPCODE_NAMES[opcode]}")
+                pc += 1
+            else:
+                operand = self.code[pc + 1]
+                detail = self.constants[operand] if opcode == PUSH else self.names.get(operand, operand)
+                lines.append(f"{pc:>6} {OPCODE_NAMES[opcode]:<13} {operand} ({detail})")
+                pc += 2
+        
+        return lines
+
+
+class BytecodeCompiler:
+    def __init__(self, layout: MemoryLayout = None) -> None:
+        """Initialize an empty code array and constant pool.
+
+        Args:
+            layout (MemoryLayout, optional): Put each variable in the index
+            of its slot, so the variables that are never alive at once share
+            a memory cell. Defaults to the symbol table addresses.
+        """
+        self.layout: MemoryLayout = layout
+        self.declared: set[str] = set() # The variables whose first declaration is compiled.
+        self.code: array = array("i")
+        self.constants: list[int | float] = []
+        self.constant_indices: dict[tuple[str, int | float], int] = {}
+        self.names: dict[int, str] = {}
+        self.types: dict[int, str] = {}
+
+
+    def compile(self, program: Program) -> Bytecode:
+        """Compile the program into bytecode. Each variable lives in
+        the address given to it in the symbol table, or in its slot of
+        the layout.
+
+        Args:
+            program (Program): The program, better after constant folding.
+
+        Returns:
+            Bytecode: The compiled program.
+        """
+        for stmt in program.body:
+            self.compile_stmt(stmt)
+        
+        memory = [0] * (max(self.types, default=-1) + 1)
+        
+        for address, data_type in self.types.items():
+            memory[address] = cast(0, data_type)
+        
+        return Bytecode(self.code, self.constants, memory, self.names)
+
+
+    def emit(self, opcode: int, operand: int = None):
+        self.code.append(opcode)
+        if operand is not None: self.code.append(operand)
+
+
+    def address(self, var: Var) -> int:
+        """Returns: the variable address after recording its type."""
+        address = var.entry.address if self.layout is None else self.layout.slot(var.entry).index
+        self.names[address] = var.name
+        self.types[address] = var.data_type
+        return address
+
+
+    def compile_stmt(self, stmt: Stmt):
+        """Compile a single statement.
+
+        Args:
+            stmt (Stmt): The statement.
+        """
+        if isinstance(stmt, (Decl, Assign)):
+            address = self.address(stmt.target)
+            
+            # A shared cell holds the value of another variable before, and
+            # a declaration can read its own variable, so the first one
+            # stores the zero.
+            if self.layout is not None and stmt.target.name not in self.declared and self.layout.shared(stmt.target.entry):
+                self.compile_expr(Num(cast(0, stmt.target.data_type), stmt.target.data_type))
+                self.emit(STORE, address)
+            
+            self.declared.add(stmt.target.name)
+            if stmt.value is None: return
+            
+            self.compile_expr(stmt.value)
+            
+            # Convert the value only if its type isn't the variable type.
+            if stmt.value.data_type == stmt.target.data_type:
+                self.emit(STORE, address)
+            else:
+                self.emit(STORE_INT if stmt.target.data_type == INT else STORE_FLOAT, address)
+        elif isinstance(stmt, Print):
+            self.emit(PRINT, self.address(stmt.value))
+        elif isinstance(stmt, If):
+            self.compile_expr(stmt.condition)
+            self.emit(JUMP_IF_FALSE, 0)
+            jump = len(self.code) - 1
+            
+            for body_stmt in stmt.body:
+                self.compile_stmt(body_stmt)
+            
+            # Patch the jump target to be after the body.
+            self.code[jump] = len(self.code)
+
+
+    def compile_expr(self, expr: Expr):
+        """Compile an expression, its value is left on the stack. The
+        operations are visited in postorder with an explicit stack, like
+        the constant folder does, so long expressions don't hit the
+        recursion limit.
+
+        Args:
+            expr (Expr): The expression.
+        """
+        stack: list[tuple[Expr, bool]] = [(expr, False)]
+        
+        while stack:
+            node, operands_done = stack.pop()
+            
+            if isinstance(node, Num):
+                key = (node.data_type, node.value)
+                
+                if key not in self.constant_indices:
+                    self.constant_indices[key] = len(self.constants)
+                    self.constants.append(node.value)
+                
+                self.emit(PUSH, self.constant_indices[key])
+            elif isinstance(node, Var):
+                self.emit(LOAD, self.address(node))
+            elif not operands_done:
+                stack.extend(((node, True), (node.right, False), (node.left, False)))
+            elif isinstance(node, RelOp):
+                self.emit(RELATIONAL_OPCODES[node.operator])
+            else:
+                self.emit(ARITHMETIC_OPCODES[node.data_type, node.operator])
+
+
+class VirtualMachine:
+    def __init__(self, bytecode: Bytecode, output: Callable[[int | float], None] = print):
+        """Initialize the machine with the program.
+
+        Args:
+            bytecode (Bytecode): The compiled program.
+            output (Callable, optional): Called with each printed value. Defaults to print.
+        """
+        self.bytecode: Bytecode = bytecode
+        self.output: Callable[[int | float], None] = output
+        self.memory: list[int | float] = []
+        self.executed: int = 0 # Number of executed instructions.
+
+
+    def run(self, initial_values: dict[int, int | float] = None) -> list[int | float]:
+        """Execute the program with a dispatch loop over the opcodes.
+
+        Args:
+            initial_values (dict[int, int | float], optional): Values to
+            put in some addresses before running.
+
+        Raises:
+            ZeroDivisionError: If dividing by zero.
+            OverflowError: If an infinite or NaN float is stored in an int,
+            or an int too large for a float is used as one.
+
+        Returns:
+            list[int | float]: The memory after running.
+        """
+        code = self.bytecode.code
+        constants = self.bytecode.constants
+        memory = self.memory = list(self.bytecode.memory)
+        output = self.output
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        size = len(code)
+        pc = 0
+        executed = 0
+        
+        for address, value in (initial_values or {}).items():
+            memory[address] = type(memory[address])(value)
+        
+        while pc < size:
+            opcode = code[pc]
+            executed += 1
+            
+            # The most common opcodes are checked first.
+            if opcode == LOAD:
+                push(memory[code[pc + 1]])
+                pc += 2
+            elif opcode == PUSH:
+                push(constants[code[pc + 1]])
+                pc += 2
+            elif opcode == STORE:
+                memory[code[pc + 1]] = pop()
+                pc += 2
+            elif opcode < PUSH:
+                right = pop()
+                left = stack[-1]
+                
+                if opcode == ADD: left = left + right
+                elif opcode == SUB: left = left - right
+                elif opcode == MUL: left = left * right
+                elif opcode == FLOAT_DIV: left = left / right
+                elif opcode == INT_DIV: left = int_div(left, right)
+                elif opcode == INT_MOD: left = int_mod(left, right)
+                elif opcode == FLOAT_MOD: left = float_mod(left, right)
+                elif opcode == LT: left = int(left < right)
+                elif opcode == GT: left = int(left > right)
+                elif opcode == LE: left = int(left <= right)
+                elif opcode == GE: left = int(left >= right)
+                elif opcode == EQ: left = int(left == right)
+                else: left = int(left != right)
+                
+                stack[-1] = left
+                pc += 1
+            elif opcode == JUMP_IF_FALSE:
+                pc = pc + 2 if pop() else code[pc + 1]
+            elif opcode == STORE_INT:
+                memory[code[pc + 1]] = cast(pop(), INT)
+                pc += 2
+            elif opcode == STORE_FLOAT:
+                memory[code[pc + 1]] = float(pop())
+                pc += 2
+            else:
+                output(memory[code[pc + 1]])
+                pc += 2
+        
+        self.executed = executed
+        return memory